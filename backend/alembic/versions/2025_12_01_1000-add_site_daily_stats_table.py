@@ -0,0 +1,46 @@
+"""Add site_daily_stats rollup table
+
+Populate it after upgrading by running the rebuild_site_daily_stats Celery task.
+
+Revision ID: 2025_12_01_1000
+Revises: add_blog_posts_table
+Create Date: 2025-12-01 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_01_1000'
+down_revision = 'add_blog_posts_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'site_daily_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('stats_date', sa.Date(), nullable=False),
+        sa.Column('site_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('checklist_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed_checklist_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('item_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed_item_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('defect_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['site_id'], ['sites.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('site_id', 'category_id', 'stats_date', name='uq_site_daily_stats_site_category_date')
+    )
+    op.create_index('ix_site_daily_stats_id', 'site_daily_stats', ['id'])
+    op.create_index('ix_site_daily_stats_site_date', 'site_daily_stats', ['site_id', 'stats_date'])
+
+
+def downgrade():
+    op.drop_index('ix_site_daily_stats_site_date', table_name='site_daily_stats')
+    op.drop_index('ix_site_daily_stats_id', table_name='site_daily_stats')
+    op.drop_table('site_daily_stats')
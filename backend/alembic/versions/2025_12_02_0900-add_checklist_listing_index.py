@@ -0,0 +1,27 @@
+"""Add composite index for checklist listing
+
+Revision ID: 2025_12_02_0900
+Revises: 2025_12_01_1000
+Create Date: 2025-12-02 09:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_02_0900'
+down_revision = '2025_12_01_1000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_checklists_site_date_status',
+        'checklists',
+        ['site_id', 'checklist_date', 'status']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_checklists_site_date_status', table_name='checklists')
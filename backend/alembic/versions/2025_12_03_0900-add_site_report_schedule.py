@@ -0,0 +1,42 @@
+"""Add site timezone and report schedule indexes
+
+Report times (daily_report_time, weekly_report_time) are interpreted in the
+site's timezone by the report scheduler tick.
+
+Revision ID: 2025_12_03_0900
+Revises: 2025_12_02_0900
+Create Date: 2025-12-03 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_03_0900'
+down_revision = '2025_12_02_0900'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'sites',
+        sa.Column('timezone', sa.String(), nullable=False, server_default='Europe/London')
+    )
+    op.create_index(
+        'ix_sites_daily_report_schedule',
+        'sites',
+        ['daily_report_enabled', 'timezone', 'daily_report_time']
+    )
+    op.create_index(
+        'ix_sites_weekly_report_schedule',
+        'sites',
+        ['weekly_report_enabled', 'timezone', 'weekly_report_day', 'weekly_report_time']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_sites_weekly_report_schedule', table_name='sites')
+    op.drop_index('ix_sites_daily_report_schedule', table_name='sites')
+    op.drop_column('sites', 'timezone')
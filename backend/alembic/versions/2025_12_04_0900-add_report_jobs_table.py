@@ -0,0 +1,54 @@
+"""Add report_jobs table for background PDF reports
+
+Revision ID: 2025_12_04_0900
+Revises: 2025_12_03_0900
+Create Date: 2025-12-04 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_04_0900'
+down_revision = '2025_12_03_0900'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    report_job_status = sa.Enum('PENDING', 'RUNNING', 'COMPLETED', 'FAILED', name='reportjobstatus')
+
+    op.create_table(
+        'report_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('status', report_job_status, nullable=False, server_default='PENDING'),
+        sa.Column('site_id', sa.Integer(), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=False),
+        sa.Column('requested_by_id', sa.Integer(), nullable=True),
+        sa.Column('fingerprint', sa.String(length=64), nullable=False),
+        sa.Column('file_path', sa.Text(), nullable=True),
+        sa.Column('filename', sa.String(), nullable=True),
+        sa.Column('content_type', sa.String(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['site_id'], ['sites.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['requested_by_id'], ['users.id'], ondelete='SET NULL')
+    )
+    op.create_index('ix_report_jobs_id', 'report_jobs', ['id'])
+    op.create_index(
+        'ix_report_jobs_site_range_fingerprint',
+        'report_jobs',
+        ['site_id', 'start_date', 'end_date', 'fingerprint']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_report_jobs_site_range_fingerprint', table_name='report_jobs')
+    op.drop_index('ix_report_jobs_id', table_name='report_jobs')
+    op.drop_table('report_jobs')
+    sa.Enum(name='reportjobstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,30 @@
+"""Add user token version
+
+Access tokens carry the user's token_version ("tv" claim); bumping it
+revokes every token issued before, e.g. on password reset.
+
+Revision ID: 2025_12_05_0900
+Revises: 2025_12_04_0900
+Create Date: 2025-12-05 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_05_0900'
+down_revision = '2025_12_04_0900'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'users',
+        sa.Column('token_version', sa.Integer(), nullable=False, server_default='0')
+    )
+
+
+def downgrade():
+    op.drop_column('users', 'token_version')
@@ -0,0 +1,59 @@
+"""Normalize site report times
+
+The report scheduler matches daily_report_time and weekly_report_time as
+exact HH:MM strings, so rewrite stored values like "9:00" or "09:00:00"
+to HH:MM, and NULL or unparseable ones to the 09:00 default.
+
+Revision ID: 2025_12_06_0900
+Revises: 2025_12_05_0900
+Create Date: 2025-12-06 09:00:00.000000
+
+"""
+from datetime import time
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2025_12_06_0900'
+down_revision = '2025_12_05_0900'
+branch_labels = None
+depends_on = None
+
+DEFAULT_REPORT_TIME = '09:00'
+
+
+def _normalize(value):
+    if value is None:
+        return DEFAULT_REPORT_TIME
+    parts = value.strip().split(':')
+    if len(parts) not in (2, 3) or not all(part.isdigit() for part in parts):
+        return DEFAULT_REPORT_TIME
+    try:
+        return time(*(int(part) for part in parts)).strftime('%H:%M')
+    except ValueError:
+        return DEFAULT_REPORT_TIME
+
+
+def upgrade():
+    connection = op.get_bind()
+    sites = connection.execute(
+        sa.text('SELECT id, daily_report_time, weekly_report_time FROM sites')
+    ).fetchall()
+    for site_id, daily_report_time, weekly_report_time in sites:
+        daily = _normalize(daily_report_time)
+        weekly = _normalize(weekly_report_time)
+        if (daily, weekly) != (daily_report_time, weekly_report_time):
+            connection.execute(
+                sa.text(
+                    'UPDATE sites SET daily_report_time = :daily, weekly_report_time = :weekly '
+                    'WHERE id = :id'
+                ),
+                {'daily': daily, 'weekly': weekly, 'id': site_id}
+            )
+
+
+def downgrade():
+    # Normalized values are valid in the previous schema too
+    pass
@@ -10,6 +10,7 @@ from app.core.dependencies import get_current_super_admin
 from app.models.activity_log import ActivityLog, LogType
 from app.models.user import User
 from app.models.checklist import Checklist, ChecklistStatus
+from app.services.activity_log_writer import activity_log_writer
 
 router = APIRouter()
 
@@ -173,18 +174,20 @@ def log_activity(
     ip_address: Optional[str] = None,
     user_agent: Optional[str] = None
 ):
-    """Helper function to create activity log entries."""
-    log = ActivityLog(
-        log_type=log_type.value,
-        message=message,
-        user_id=user_id,
-        user_email=user_email,
-        organization_id=organization_id,
-        organization_name=organization_name,
-        details=details,
-        ip_address=ip_address,
-        user_agent=user_agent
-    )
-    db.add(log)
-    db.commit()
-    return log
+    """
+    Helper function to create activity log entries.
+
+    The entry is queued and written in a batch by the activity log writer,
+    so logging adds no transaction to the request.
+    """
+    activity_log_writer.write(db, {
+        "log_type": log_type.value,
+        "message": message,
+        "user_id": user_id,
+        "user_email": user_email,
+        "organization_id": organization_id,
+        "organization_name": organization_name,
+        "details": details,
+        "ip_address": ip_address,
+        "user_agent": user_agent
+    })
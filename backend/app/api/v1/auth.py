@@ -9,11 +9,12 @@ from app.models.organization import Organization
 from app.models.password_reset_token import PasswordResetToken
 from app.schemas.auth import LoginRequest, Token, PasswordResetRequest, PasswordReset, PasswordChange, RegistrationRequest
 from app.schemas.user import UserResponse
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_super_admin, get_current_user
 from app.models.user import UserRole
 from app.api.v1.activity_logs import log_activity
 from app.models.activity_log import LogType
 from app.core.email import send_org_admin_welcome_email, send_password_reset_email
+from app.services.principal_cache import principal_cache
 import logging
 import os
 
@@ -82,7 +83,8 @@ def login(
             "user_id": user.id,
             "email": user.email,
             "role": user.role.value,
-            "organization_id": user.organization_id
+            "organization_id": user.organization_id,
+            "tv": user.token_version or 0
         }
     )
 
@@ -125,6 +127,14 @@ def logout():
     return {"message": "Successfully logged out"}
 
 
+@router.get("/principal-cache-stats")
+def get_principal_cache_stats(
+    current_user: User = Depends(get_current_super_admin)
+):
+    """Get hit/miss counters of this process's authenticated principal cache (Super Admin only)."""
+    return principal_cache.stats()
+
+
 @router.post("/change-password")
 def change_password(
     password_data: PasswordChange,
@@ -270,8 +280,9 @@ def reset_password(
             detail="User not found"
         )
 
-    # Update user's password
+    # Update user's password and revoke the tokens issued before the reset
     user.hashed_password = get_password_hash(reset_data.new_password)
+    user.token_version = (user.token_version or 0) + 1
 
     # Mark token as used
     token_record.used = 1  # SQLite uses 1 for True
@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+import base64
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import Interval, and_, case, literal, tuple_
+from sqlalchemy.orm import Session, contains_eager, joinedload
 from typing import List, Optional
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
+from collections import defaultdict
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.user import User, UserRole
 from app.api.v1.activity_logs import log_activity
 from app.models.activity_log import LogType
+from app.models.category import Category
 from app.models.checklist import Checklist, ChecklistStatus
 from app.models.checklist_item import ChecklistItem
+from app.models.site import Site
+from app.services.task_field_cache import task_field_cache
+from app.services.site_stats_service import refresh_for_checklist, refresh_site_day, rebuild_site_daily_stats
 from app.schemas.checklist import (
     ChecklistCreate, ChecklistUpdate, ChecklistResponse,
     ChecklistWithItems, ChecklistItemUpdate
@@ -79,6 +86,8 @@ def create_checklist(
     new_checklist.total_items = len(tasks)
     new_checklist.completed_items = 0
 
+    refresh_for_checklist(db, new_checklist)
+
     db.commit()
     db.refresh(new_checklist)
 
@@ -199,6 +208,9 @@ def generate_checklists_bulk(
         # Move to next day
         current_date += timedelta(days=1)
 
+    if created_count:
+        rebuild_site_daily_stats(db, request.start_date, end_date, [site.id for site in sites])
+
     db.commit()
 
     return {
@@ -211,30 +223,138 @@ def generate_checklists_bulk(
     }
 
 
+def _dynamic_status(now: datetime):
+    """
+    SQL expression for a checklist's status as seen at `now` (PostgreSQL).
+
+    Completed and future checklists keep their stored status. Otherwise a
+    checklist is OVERDUE once its category's closing time has passed
+    (overnight windows, where closes_at < opens_at, close on the next day),
+    IN_PROGRESS once any item is done, and PENDING before that.
+
+    Adding a time and an interval to a date is PostgreSQL date arithmetic;
+    other databases use _checklist_status instead.
+    """
+    closes_at = Checklist.checklist_date + Category.closes_at
+    closes_at = closes_at + case(
+        (Category.closes_at < Category.opens_at, literal(timedelta(days=1), Interval)),
+        else_=literal(timedelta(0), Interval)
+    )
+    status_type = Checklist.status.type
+    return case(
+        (Checklist.status == ChecklistStatus.COMPLETED, Checklist.status),
+        (Checklist.checklist_date > now.date(), Checklist.status),
+        (
+            and_(Category.closes_at.isnot(None), closes_at < now),
+            literal(ChecklistStatus.OVERDUE, status_type)
+        ),
+        (Checklist.completed_items > 0, literal(ChecklistStatus.IN_PROGRESS, status_type)),
+        else_=literal(ChecklistStatus.PENDING, status_type)
+    )
+
+
+def _checklist_status(checklist: Checklist, now: datetime) -> ChecklistStatus:
+    """The status _dynamic_status computes in SQL, for one loaded checklist."""
+    if checklist.status == ChecklistStatus.COMPLETED or checklist.checklist_date > now.date():
+        return checklist.status
+
+    category = checklist.category
+    if category and category.closes_at:
+        closes_at = datetime.combine(checklist.checklist_date, category.closes_at)
+        if category.opens_at and category.closes_at < category.opens_at:
+            closes_at += timedelta(days=1)
+        if closes_at < now:
+            return ChecklistStatus.OVERDUE
+
+    if checklist.completed_items > 0:
+        return ChecklistStatus.IN_PROGRESS
+    return ChecklistStatus.PENDING
+
+
+def _rows_with_status(query, now: datetime, status_filter: Optional[ChecklistStatus], skip: int, count: int):
+    """
+    Up to `count` (checklist, status) rows from an ordered checklist query,
+    computing the status in Python and applying status_filter and skip to
+    the result. Reads the query in batches until enough rows match.
+    """
+    rows = []
+    offset = 0
+    while len(rows) < count:
+        batch = query.offset(offset).limit(count).all()
+        for checklist in batch:
+            checklist_status = _checklist_status(checklist, now)
+            if status_filter and checklist_status != status_filter:
+                continue
+            if skip:
+                skip -= 1
+                continue
+            rows.append((checklist, checklist_status))
+        if len(batch) < count:
+            break
+        offset += len(batch)
+    return rows[:count]
+
+
+def _encode_cursor(checklist_date: date, checklist_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{checklist_date.isoformat()}|{checklist_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str):
+    try:
+        checklist_date, checklist_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return date.fromisoformat(checklist_date), int(checklist_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
 @router.get("/checklists", response_model=List[ChecklistResponse])
 def list_checklists(
+    response: Response,
     site_id: int = None,
+    category_id: int = None,
     status_filter: ChecklistStatus = None,
     start_date: date = None,
     end_date: date = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List checklists with filters."""
-    from app.models.category import Category
-    from datetime import datetime, time as dt_time
+    """
+    List checklists with filters, newest first.
+
+    status_filter matches the dynamic status (e.g. overdue), evaluated in SQL
+    on PostgreSQL and in Python elsewhere.
+    Results are ordered by (checklist_date, id) descending; when more rows
+    remain, the X-Next-Cursor response header holds the cursor for the next
+    page. Pass it back as `cursor` instead of using `skip`, which is kept for
+    existing clients.
+    """
+    now = datetime.now()
+    status_in_sql = db.get_bind().dialect.name == "postgresql"
 
-    query = db.query(Checklist).options(joinedload(Checklist.category))
+    if status_in_sql:
+        dynamic_status = _dynamic_status(now).label("dynamic_status")
+        query = db.query(Checklist, dynamic_status)
+    else:
+        query = db.query(Checklist)
+    query = query.outerjoin(
+        Category, Category.id == Checklist.category_id
+    ).options(contains_eager(Checklist.category))
 
-    # Filter by site
+    # Filter by site / category
     if site_id:
         query = query.filter(Checklist.site_id == site_id)
+    if category_id:
+        query = query.filter(Checklist.category_id == category_id)
 
-    # Filter by status
-    if status_filter:
-        query = query.filter(Checklist.status == status_filter)
+    # Filter by dynamic status
+    if status_filter and status_in_sql:
+        query = query.filter(dynamic_status == status_filter)
 
     # Filter by date range
     if start_date:
@@ -248,91 +368,68 @@ def list_checklists(
         pass
     elif current_user.role == UserRole.ORG_ADMIN:
         # Org admins see all checklists in their organization
-        from app.models.site import Site
-        query = query.join(Site).filter(Site.organization_id == current_user.organization_id)
+        org_site_ids = db.query(Site.id).filter(Site.organization_id == current_user.organization_id)
+        query = query.filter(Checklist.site_id.in_(org_site_ids))
     elif current_user.role == UserRole.SITE_USER:
         # Site users only see checklists for their assigned sites
-        from app.models.user_site import UserSite
-        assigned_site_ids = [us.site_id for us in current_user.user_sites]
+        assigned_site_ids = current_user.site_ids
         if not assigned_site_ids:
             # Return empty list if user has no assigned sites
             return []
         query = query.filter(Checklist.site_id.in_(assigned_site_ids))
 
-    checklists = query.order_by(Checklist.checklist_date.desc()).offset(skip).limit(limit).all()
+    # Keyset pagination on (checklist_date, id)
+    if cursor:
+        cursor_date, cursor_id = _decode_cursor(cursor)
+        query = query.filter(tuple_(Checklist.checklist_date, Checklist.id) < tuple_(cursor_date, cursor_id))
+        skip = 0
 
-    # Get current date and time
-    now = datetime.now()
-    today = now.date()
-
-    # Manually build response to handle time field serialization and dynamic status
-    result = []
-    for checklist in checklists:
-        # Calculate dynamic status based on current time and category settings
-        dynamic_status = checklist.status
-
-        # Only recalculate status if not already completed
-        if checklist.status != ChecklistStatus.COMPLETED:
-            # Check if checklist is for today or in the past
-            if checklist.checklist_date <= today:
-                # Check if closing time has passed
-                if checklist.category and checklist.category.closes_at:
-                    # Combine checklist date with closing time
-                    closes_datetime = datetime.combine(checklist.checklist_date, checklist.category.closes_at)
-
-                    # Handle overnight time windows (e.g., opens 20:00, closes 03:00)
-                    # If closes_at is earlier than opens_at, it means the window spans midnight
-                    if checklist.category.opens_at and checklist.category.closes_at < checklist.category.opens_at:
-                        # Overnight window - closing time is on the next day
-                        closes_datetime = closes_datetime + timedelta(days=1)
-
-                    # If current time has passed the closing time, mark as OVERDUE
-                    if now > closes_datetime:
-                        dynamic_status = ChecklistStatus.OVERDUE
-                    elif checklist.completed_items > 0:
-                        dynamic_status = ChecklistStatus.IN_PROGRESS
-                    else:
-                        dynamic_status = ChecklistStatus.PENDING
-                else:
-                    # No closing time - check if in progress or pending
-                    if checklist.completed_items > 0:
-                        dynamic_status = ChecklistStatus.IN_PROGRESS
-                    else:
-                        dynamic_status = ChecklistStatus.PENDING
-
-        checklist_dict = {
-            "id": checklist.id,
-            "checklist_date": checklist.checklist_date,
-            "category_id": checklist.category_id,
-            "site_id": checklist.site_id,
-            "status": dynamic_status,  # Use dynamic status
-            "total_items": checklist.total_items,
-            "completed_items": checklist.completed_items,
-            "completion_percentage": checklist.completion_percentage,
-            "completed_by_id": checklist.completed_by_id,
-            "created_at": checklist.created_at,
-            "completed_at": checklist.completed_at,
-            "updated_at": checklist.updated_at,
-            "category": {
-                "id": checklist.category.id,
-                "name": checklist.category.name,
-                "closes_at": checklist.category.closes_at.strftime('%H:%M:%S') if checklist.category.closes_at else None,
-                "opens_at": checklist.category.opens_at.strftime("%H:%M:%S") if checklist.category.opens_at else None,
-            } if checklist.category else None
-        }
-        result.append(checklist_dict)
+    query = query.order_by(
+        Checklist.checklist_date.desc(),
+        Checklist.id.desc()
+    )
+    if status_in_sql:
+        rows = query.offset(skip).limit(limit + 1).all()
+    else:
+        rows = _rows_with_status(query, now, status_filter, skip, limit + 1)
+
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        response.headers["X-Next-Cursor"] = _encode_cursor(last.checklist_date, last.id)
 
-    return result
+    return [
+        ChecklistResponse.model_validate(checklist).model_copy(update={"status": checklist_status})
+        for checklist, checklist_status in rows
+    ]
 
 
 @router.get("/checklists/{checklist_id}", response_model=ChecklistWithItems)
 def get_checklist(
     checklist_id: int,
+    include: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get checklist by ID with all items."""
-    checklist = db.query(Checklist).filter(Checklist.id == checklist_id).first()
+    """
+    Get checklist by ID with all items.
+
+    Loads the checklist with its items in one query, their tasks in a second
+    and the task fields of dynamic forms in a third, however many items the
+    checklist has. Pass include=responses to also get each item's existing
+    field responses (one more query).
+
+    Task fields come from the schema cache; the third query only loads misses.
+    """
+    from app.models.task import Task
+    from app.models.task_field_response import TaskFieldResponse
+
+    includes = {part.strip() for part in include.split(",")} if include else set()
+
+    checklist = db.query(Checklist).options(
+        joinedload(Checklist.site),
+        joinedload(Checklist.items)
+    ).filter(Checklist.id == checklist_id).first()
 
     if not checklist:
         raise HTTPException(
@@ -348,29 +445,60 @@ def get_checklist(
                 detail="Not enough permissions"
             )
 
-    # Get all items with task fields
+    checklist_items = checklist.items
+
+    # Tasks for all items in one query
+    task_ids = {item.task_id for item in checklist_items}
+    tasks = {
+        task.id: task
+        for task in db.query(Task).filter(Task.id.in_(task_ids)).all()
+    } if task_ids else {}
+
+    # Task fields for every dynamic-form task from the schema cache
+    # (misses are loaded with one TaskField IN query)
+    fields_by_task = {
+        task_id: [
+            {
+                "id": field.id,
+                "field_type": field.field_type,
+                "field_label": field.field_label,
+                "field_order": field.field_order,
+                "is_required": field.is_required,
+                "validation_rules": field.validation_rules,
+                "show_if": field.show_if
+            }
+            for field in task_fields
+        ]
+        for task_id, task_fields in task_field_cache.get_fields(
+            db, [task_id for task_id, task in tasks.items() if task.has_dynamic_form]
+        ).items()
+    }
+
+    # Existing responses for all items in one query, grouped by item
+    responses_by_item = defaultdict(list)
+    if "responses" in includes and checklist_items:
+        responses = db.query(TaskFieldResponse).filter(
+            TaskFieldResponse.checklist_item_id.in_([item.id for item in checklist_items])
+        ).order_by(TaskFieldResponse.checklist_item_id, TaskFieldResponse.id).all()
+        for response in responses:
+            responses_by_item[response.checklist_item_id].append({
+                "id": response.id,
+                "task_field_id": response.task_field_id,
+                "text_value": response.text_value,
+                "number_value": response.number_value,
+                "boolean_value": response.boolean_value,
+                "json_value": response.json_value,
+                "file_url": response.file_url,
+                "auto_defect_id": response.auto_defect_id,
+                "completed_at": response.completed_at,
+                "completed_by": response.completed_by
+            })
+
     items = []
-    for item in checklist.items:
-        # Get task fields if task has dynamic form
-        task_fields = []
-        if item.task and item.task.has_dynamic_form:
-            from app.models.task_field import TaskField
-            fields = db.query(TaskField).filter(
-                TaskField.task_id == item.task_id
-            ).order_by(TaskField.field_order).all()
-
-            for field in fields:
-                task_fields.append({
-                    "id": field.id,
-                    "field_type": field.field_type,
-                    "field_label": field.field_label,
-                    "field_order": field.field_order,
-                    "is_required": field.is_required,
-                    "validation_rules": field.validation_rules,
-                    "show_if": field.show_if
-                })
-
-        items.append({
+    for item in checklist_items:
+        task = tasks.get(item.task_id)
+        has_dynamic_form = bool(task and task.has_dynamic_form)
+        item_dict = {
             "id": item.id,
             "item_name": item.item_name,
             "is_completed": item.is_completed,
@@ -379,9 +507,12 @@ def get_checklist(
             "photo_url": item.photo_url,
             "task_id": item.task_id,
             "completed_at": item.completed_at,
-            "has_dynamic_form": item.task.has_dynamic_form if item.task else False,
-            "fields": task_fields
-        })
+            "has_dynamic_form": has_dynamic_form,
+            "fields": fields_by_task.get(item.task_id, []) if has_dynamic_form else []
+        }
+        if "responses" in includes:
+            item_dict["responses"] = responses_by_item.get(item.id, [])
+        items.append(item_dict)
 
     checklist_dict = {
         **checklist.__dict__,
@@ -415,6 +546,8 @@ def update_checklist(
     # Recalculate completion
     checklist.calculate_completion()
 
+    refresh_for_checklist(db, checklist)
+
     db.commit()
     db.refresh(checklist)
 
@@ -484,6 +617,8 @@ def update_checklist_item(
     elif checklist.completion_percentage > 0:
         checklist.status = ChecklistStatus.IN_PROGRESS
 
+    refresh_for_checklist(db, checklist)
+
     db.commit()
 
     return {"message": "Checklist item updated successfully"}
@@ -504,7 +639,9 @@ def delete_checklist(
             detail="Checklist not found"
         )
 
+    site_id, checklist_date = checklist.site_id, checklist.checklist_date
     db.delete(checklist)
+    refresh_site_day(db, site_id, checklist_date)
     db.commit()
 
     return None
@@ -592,6 +729,8 @@ def create_event_based_checklist(
     # Set totals
     new_checklist.total_items = len(tasks)
     new_checklist.completed_items = 0
+
+    refresh_for_checklist(db, new_checklist)
     
     db.commit()
     db.refresh(new_checklist)
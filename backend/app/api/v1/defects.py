@@ -6,6 +6,7 @@ from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.user import User, UserRole
 from app.models.defect import Defect, DefectStatus, DefectSeverity
+from app.services.site_stats_service import defect_stats_date, refresh_for_defect, refresh_site_day
 from app.schemas.defect import (
     DefectCreate, DefectUpdate, DefectResponse,
     DefectWithDetails, DefectClose
@@ -33,6 +34,7 @@ def create_defect(
     )
 
     db.add(new_defect)
+    refresh_for_defect(db, new_defect)
     db.commit()
     db.refresh(new_defect)
 
@@ -74,7 +76,7 @@ def list_defects(
         query = query.join(Site).filter(Site.organization_id == current_user.organization_id)
     elif current_user.role == UserRole.SITE_USER:
         # Site users only see defects for their assigned sites
-        assigned_site_ids = [us.site_id for us in current_user.user_sites]
+        assigned_site_ids = current_user.site_ids
         if not assigned_site_ids:
             # Return empty list if user has no assigned sites
             return []
@@ -206,7 +208,11 @@ def delete_defect(
             detail="Defect not found"
         )
 
+    site_id = defect.site_id
+    created_date = defect_stats_date(db, defect.id)
     db.delete(defect)
+    if created_date:
+        refresh_site_day(db, site_id, created_date)
     db.commit()
 
     return None
@@ -2,15 +2,19 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_principal, get_current_super_admin, get_current_user
 from app.models.user import User
 from app.models.course_enrollment import CourseEnrollment
 from app.schemas.module_progress import (
     ModuleProgressResponse,
     ModuleProgressUpdate,
-    CompleteModuleRequest
+    CompleteModuleRequest,
+    ProgressHeartbeatBatch,
+    ProgressHeartbeatResponse
 )
 from app.services.module_progress_service import ModuleProgressService
+from app.services.principal_cache import Principal
+from app.services.progress_heartbeat_buffer import progress_heartbeat_buffer
 
 router = APIRouter()
 
@@ -42,6 +46,37 @@ def get_enrollment_module_progress(
     return ModuleProgressService.get_enrollment_progress(db, enrollment_id)
 
 
+@router.post("/heartbeat", response_model=ProgressHeartbeatResponse, status_code=status.HTTP_202_ACCEPTED)
+def record_progress_heartbeat(
+    batch: ProgressHeartbeatBatch,
+    principal: Principal = Depends(get_current_principal)
+):
+    """
+    Record playback positions from the course player.
+
+    Heartbeats are coalesced per enrollment and module and written in bulk
+    every few seconds; enrollments not owned by the user are dropped then.
+    Completing a module still goes through the complete endpoint.
+    """
+    for heartbeat in batch.heartbeats:
+        progress_heartbeat_buffer.record(
+            principal.id,
+            heartbeat.enrollment_id,
+            heartbeat.module_id,
+            heartbeat.last_position_seconds,
+            heartbeat.time_spent_seconds
+        )
+    return ProgressHeartbeatResponse(accepted=len(batch.heartbeats))
+
+
+@router.get("/heartbeat/stats")
+def get_progress_heartbeat_stats(
+    current_user: User = Depends(get_current_super_admin)
+):
+    """Heartbeat buffer counters for this process (super admin only)."""
+    return progress_heartbeat_buffer.stats()
+
+
 @router.put("/enrollments/{enrollment_id}/modules/{module_id}/progress", response_model=ModuleProgressResponse)
 def update_module_progress(
     enrollment_id: int,
@@ -1,19 +1,38 @@
 """
 Notifications API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Tuple
 from datetime import datetime
+import asyncio
+import json
+import time
 
-from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core.database import SessionLocal, get_db
+from app.core.dependencies import get_current_user, get_principal_for_token, security
+from app.core.security import decode_access_token
 from app.models.user import User
 from app.models.notification import Notification
 from app.schemas.notification import NotificationResponse, NotificationMarkRead
+from app.services.notification_stream import EVENT_UNREAD_COUNT, notification_broker
 
 router = APIRouter()
 
+# Comment line sent to idle streams so proxies keep the connection open
+STREAM_KEEPALIVE_SECONDS = 25
+LONG_POLL_MAX_SECONDS = 55
+
+
+def _unread_count(db: Session, user_id: int) -> int:
+    return db.query(Notification).filter(
+        Notification.user_id == user_id,
+        Notification.is_read == False
+    ).count()
+
 
 @router.get("", response_model=List[NotificationResponse])
 def get_notifications(
@@ -38,11 +57,7 @@ def get_unread_count(
     current_user: User = Depends(get_current_user)
 ):
     """Get count of unread notifications"""
-    count = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.is_read == False
-    ).count()
-    return {"count": count}
+    return {"count": _unread_count(db, current_user.id)}
 
 
 @router.post("/mark-read")
@@ -61,6 +76,7 @@ def mark_notifications_read(
         notification.mark_as_read()
 
     db.commit()
+    notification_broker.publish_unread_count(current_user.id, _unread_count(db, current_user.id))
     return {"success": True, "marked_count": len(notifications)}
 
 
@@ -78,6 +94,7 @@ def mark_all_read(
         "read_at": datetime.utcnow()
     })
     db.commit()
+    notification_broker.publish_unread_count(current_user.id, 0)
     return {"success": True, "marked_count": count}
 
 
@@ -96,6 +113,118 @@ def delete_notification(
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
 
+    was_unread = not notification.is_read
     db.delete(notification)
     db.commit()
+    if was_unread:
+        notification_broker.publish_unread_count(current_user.id, _unread_count(db, current_user.id))
     return {"success": True}
+
+
+def _open_stream(token: str) -> Tuple[int, int, Optional[float]]:
+    """Authenticate a stream and read the initial unread count, without holding a session open."""
+    db = SessionLocal()
+    try:
+        principal = get_principal_for_token(token, db)
+        payload = decode_access_token(token) or {}
+        return principal.id, _unread_count(db, principal.id), payload.get("exp")
+    finally:
+        db.close()
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    token: str = Query(..., description="Access token (EventSource cannot send headers)")
+):
+    """
+    Stream new notifications and unread-count changes as Server-Sent Events.
+
+    Sends the current unread count first, then "notification" and
+    "unread_count" events as they happen. The stream ends when the token
+    expires; the client reconnects with a fresh one.
+    """
+    user_id, count, expires_at = await run_in_threadpool(_open_stream, token)
+    queue = notification_broker.subscribe(user_id)
+
+    async def event_stream():
+        try:
+            yield "retry: 10000\n\n"
+            yield _sse(EVENT_UNREAD_COUNT, {"type": EVENT_UNREAD_COUNT, "user_id": user_id, "count": count})
+            while True:
+                timeout = STREAM_KEEPALIVE_SECONDS
+                if expires_at is not None:
+                    remaining = expires_at - time.time()
+                    if remaining <= 0:
+                        break
+                    timeout = min(timeout, remaining)
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+                yield _sse(item["type"], item)
+        finally:
+            notification_broker.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _notifications_since(user_id: int, since_id: int, with_count: bool) -> dict:
+    db = SessionLocal()
+    try:
+        notifications = db.query(Notification).filter(
+            Notification.user_id == user_id,
+            Notification.id > since_id
+        ).order_by(Notification.id).limit(50).all()
+        return {
+            "notifications": [NotificationResponse.model_validate(n) for n in notifications],
+            "unread_count": _unread_count(db, user_id) if with_count or notifications else None
+        }
+    finally:
+        db.close()
+
+
+@router.get("/poll")
+async def poll_notifications(
+    since_id: int = Query(0, ge=0, description="Highest notification id the client has seen"),
+    timeout: int = Query(25, ge=1, le=LONG_POLL_MAX_SECONDS),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Long-poll fallback for clients that cannot use the event stream.
+
+    Returns notifications newer than since_id as soon as there are any, or
+    an empty list after timeout seconds. unread_count is only set when
+    something changed.
+    """
+    def authenticate() -> int:
+        db = SessionLocal()
+        try:
+            return get_principal_for_token(credentials.credentials, db).id
+        finally:
+            db.close()
+
+    user_id = await run_in_threadpool(authenticate)
+    queue = notification_broker.subscribe(user_id)
+    try:
+        result = await run_in_threadpool(_notifications_since, user_id, since_id, False)
+        if result["notifications"]:
+            return result
+        try:
+            await asyncio.wait_for(queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return result
+        return await run_in_threadpool(_notifications_since, user_id, since_id, True)
+    finally:
+        notification_broker.unsubscribe(user_id, queue)
@@ -16,6 +16,7 @@ from app.models.site import Site
 from app.models.checklist import Checklist, ChecklistStatus
 from app.models.checklist_item import ChecklistItem
 from app.models.task import Task
+from app.services.site_stats_service import refresh_site_days
 from app.schemas.organization import (
     OrganizationCreate,
     OrganizationUpdate,
@@ -444,6 +445,7 @@ def regenerate_organization_checklists(
         today = date.today()
         created_count = 0
         skipped_count = 0
+        stats_keys = set()
 
         # Get all active sites for this organization
         sites = db.query(Site).filter(
@@ -531,8 +533,10 @@ def regenerate_organization_checklists(
                 new_checklist.total_items = len(tasks)
                 new_checklist.completed_items = 0
 
+                stats_keys.add((site.id, checklist_date))
                 created_count += 1
 
+        refresh_site_days(db, stats_keys)
         db.commit()
 
         return {
@@ -1,19 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from app.celery_app import celery_app
+from app.core.config import settings
 from app.core.email import email_service
 from app.core.dependencies import get_current_super_admin, get_current_user
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.models.user import User, UserRole
-from app.models.checklist import ChecklistStatus
 from app.models.site import Site
 from app.models.organization import Organization
 from app.models.organization_module import OrganizationModule
+from app.models.report_job import ReportJob, ReportJobStatus
+from app.schemas.report_job import ReportJobCreate, ReportJobResponse
+from app.services.report_job_service import get_or_create_job
+from app.services.site_stats_service import get_site_stats_summary
 from sqlalchemy.orm import Session
 from datetime import date, timedelta
 from typing import List, Optional
-from io import BytesIO
-import zipfile
 import logging
+import os
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -136,9 +140,7 @@ def send_weekly_report_for_site(
     """Generate and send weekly performance report for a specific site"""
     
     from app.models.site import Site
-    from app.models.checklist import Checklist
     from app.models.defect import Defect
-    from app.models.category import Category
     from sqlalchemy.orm import Session
     from app.core.database import SessionLocal
     from datetime import datetime
@@ -158,15 +160,11 @@ def send_weekly_report_for_site(
         week_end = date.today()
         week_start = week_end - timedelta(days=6)
         
-        # Get checklists for the week
-        checklists = db.query(Checklist).filter(
-            Checklist.site_id == site_id,
-            Checklist.checklist_date >= week_start,
-            Checklist.checklist_date <= week_end
-        ).all()
+        # Get the week's totals from the site_daily_stats rollup
+        stats = get_site_stats_summary(db, [site_id], week_start, week_end)[site_id]
         
-        total_checklists = len(checklists)
-        completed_checklists = len([c for c in checklists if c.status == ChecklistStatus.COMPLETED])
+        total_checklists = stats['checklist_count']
+        completed_checklists = stats['completed_checklist_count']
         completion_rate = (completed_checklists / total_checklists * 100) if total_checklists > 0 else 0
         
         # Get defects
@@ -183,16 +181,14 @@ def send_weekly_report_for_site(
         } for d in defects]
         
         # Get category stats
-        categories = db.query(Category).filter(Category.organization_id == site.organization_id).all()
         category_stats = []
-        for cat in categories:
-            cat_checklists = [c for c in checklists if c.category_id == cat.id]
-            cat_total = len(cat_checklists)
-            cat_completed = len([c for c in cat_checklists if c.status == ChecklistStatus.COMPLETED])
+        for cat in stats['categories'].values():
+            cat_total = cat['checklist_count']
+            cat_completed = cat['completed_checklist_count']
             cat_rate = (cat_completed / cat_total * 100) if cat_total > 0 else 0
-            if cat_total > 0:
+            if cat['organization_id'] == site.organization_id and cat_total > 0:
                 category_stats.append({
-                    'category_name': cat.name,
+                    'category_name': cat['category_name'],
                     'completion_rate': round(cat_rate, 1)
                 })
         
@@ -256,7 +252,6 @@ def send_org_wide_report(
 
     from app.models.organization import Organization
     from app.models.site import Site
-    from app.models.checklist import Checklist
     from app.models.defect import Defect
     from app.models.category import Category
     from sqlalchemy.orm import Session
@@ -293,16 +288,12 @@ def send_org_wide_report(
         all_defects = []
         site_stats = []
 
-        for site in sites:
-            # Get checklists for the week for this site
-            site_checklists = db.query(Checklist).filter(
-                Checklist.site_id == site.id,
-                Checklist.checklist_date >= week_start,
-                Checklist.checklist_date <= week_end
-            ).all()
+        # Week totals for every site from the site_daily_stats rollup
+        stats_by_site = get_site_stats_summary(db, [s.id for s in sites], week_start, week_end)
 
-            site_total = len(site_checklists)
-            site_completed = len([c for c in site_checklists if c.status == ChecklistStatus.COMPLETED])
+        for site in sites:
+            site_total = stats_by_site[site.id]['checklist_count']
+            site_completed = stats_by_site[site.id]['completed_checklist_count']
             site_rate = (site_completed / site_total * 100) if site_total > 0 else 0
 
             total_checklists += site_total
@@ -355,14 +346,13 @@ def send_org_wide_report(
 
         category_stats = []
         for cat in categories:
-            cat_checklists = db.query(Checklist).filter(
-                Checklist.category_id == cat.id,
-                Checklist.site_id.in_([s.id for s in sites]),
-                Checklist.checklist_date >= week_start,
-                Checklist.checklist_date <= week_end
-            ).all()
-            cat_total = len(cat_checklists)
-            cat_completed = len([c for c in cat_checklists if c.status == ChecklistStatus.COMPLETED])
+            cat_rows = [
+                site_stats['categories'][cat.id]
+                for site_stats in stats_by_site.values()
+                if cat.id in site_stats['categories']
+            ]
+            cat_total = sum(row['checklist_count'] for row in cat_rows)
+            cat_completed = sum(row['completed_checklist_count'] for row in cat_rows)
             cat_rate = (cat_completed / cat_total * 100) if cat_total > 0 else 0
             if cat_total > 0:
                 category_stats.append({
@@ -442,9 +432,7 @@ def send_daily_report_for_site(
     """Generate and send daily performance report for a specific site"""
 
     from app.models.site import Site
-    from app.models.checklist import Checklist
     from app.models.defect import Defect
-    from app.models.category import Category
     from sqlalchemy.orm import Session
     from app.core.database import SessionLocal
     from datetime import datetime
@@ -463,14 +451,11 @@ def send_daily_report_for_site(
         # Yesterday's date for daily report
         yesterday = date.today() - timedelta(days=1)
 
-        # Get yesterday's checklists
-        checklists = db.query(Checklist).filter(
-            Checklist.site_id == site_id,
-            Checklist.checklist_date == yesterday
-        ).all()
+        # Get yesterday's totals from the site_daily_stats rollup
+        stats = get_site_stats_summary(db, [site_id], yesterday, yesterday)[site_id]
 
-        total_checklists = len(checklists)
-        completed_checklists = len([c for c in checklists if c.status == ChecklistStatus.COMPLETED])
+        total_checklists = stats['checklist_count']
+        completed_checklists = stats['completed_checklist_count']
         completion_rate = (completed_checklists / total_checklists * 100) if total_checklists > 0 else 0
 
         # Get yesterday's defects
@@ -488,16 +473,14 @@ def send_daily_report_for_site(
         } for d in defects]
         
         # Get category stats for yesterday
-        categories = db.query(Category).filter(Category.organization_id == site.organization_id).all()
         category_stats = []
-        for cat in categories:
-            cat_checklists = [c for c in checklists if c.category_id == cat.id]
-            cat_total = len(cat_checklists)
-            cat_completed = len([c for c in cat_checklists if c.status == ChecklistStatus.COMPLETED])
+        for cat in stats['categories'].values():
+            cat_total = cat['checklist_count']
+            cat_completed = cat['completed_checklist_count']
             cat_rate = (cat_completed / cat_total * 100) if cat_total > 0 else 0
-            if cat_total > 0:
+            if cat['organization_id'] == site.organization_id and cat_total > 0:
                 category_stats.append({
-                    'category_name': cat.name,
+                    'category_name': cat['category_name'],
                     'completion_rate': round(cat_rate, 1)
                 })
 
@@ -564,20 +547,11 @@ def check_reporting_module_enabled(db: Session, organization_id: int) -> bool:
     return module.is_enabled if module else False
 
 
-@router.get("/reports/pdf/checklist")
-def generate_checklist_pdf(
-    site_id: int,
-    report_date: date,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
+def get_report_site(db: Session, site_id: int, current_user: User):
     """
-    Generate a PDF report for a single day's checklists at a site.
-
-    All user roles can access this endpoint for sites they have access to.
+    Load a site for PDF reporting, checking the user's access and that the
+    reporting module is enabled. Returns (site, organization name).
     """
-    from app.services.pdf_service import pdf_service
-
     # Get site and verify access
     site = db.query(Site).filter(Site.id == site_id).first()
     if not site:
@@ -585,7 +559,7 @@ def generate_checklist_pdf(
 
     # Check user has access to this site
     if current_user.role == UserRole.SITE_USER:
-        user_site_ids = [us.site_id for us in current_user.user_sites]
+        user_site_ids = current_user.site_ids
         if site_id not in user_site_ids:
             raise HTTPException(status_code=403, detail="You don't have access to this site")
     elif current_user.role == UserRole.ORG_ADMIN:
@@ -603,6 +577,24 @@ def generate_checklist_pdf(
     # Get organization name
     organization = db.query(Organization).filter(Organization.id == site.organization_id).first()
     org_name = organization.name if organization else "Unknown"
+    return site, org_name
+
+
+@router.get("/reports/pdf/checklist")
+def generate_checklist_pdf(
+    site_id: int,
+    report_date: date,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Generate a PDF report for a single day's checklists at a site.
+
+    All user roles can access this endpoint for sites they have access to.
+    """
+    from app.services.pdf_service import pdf_service
+
+    site, org_name = get_report_site(db, site_id, current_user)
 
     # Generate PDF
     try:
@@ -633,7 +625,7 @@ def generate_checklist_pdf_range(
     site_id: int,
     start_date: date,
     end_date: date,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -651,31 +643,7 @@ def generate_checklist_pdf_range(
     if (end_date - start_date).days > 31:
         raise HTTPException(status_code=400, detail="Date range cannot exceed 31 days")
 
-    # Get site and verify access
-    site = db.query(Site).filter(Site.id == site_id).first()
-    if not site:
-        raise HTTPException(status_code=404, detail="Site not found")
-
-    # Check user has access to this site
-    if current_user.role == UserRole.SITE_USER:
-        user_site_ids = [us.site_id for us in current_user.user_sites]
-        if site_id not in user_site_ids:
-            raise HTTPException(status_code=403, detail="You don't have access to this site")
-    elif current_user.role == UserRole.ORG_ADMIN:
-        if site.organization_id != current_user.organization_id:
-            raise HTTPException(status_code=403, detail="You don't have access to this site")
-
-    # Check if reporting module is enabled (skip for super admins)
-    if current_user.role != UserRole.SUPER_ADMIN:
-        if not check_reporting_module_enabled(db, site.organization_id):
-            raise HTTPException(
-                status_code=403,
-                detail="Reporting module is not enabled for your organization"
-            )
-
-    # Get organization name
-    organization = db.query(Organization).filter(Organization.id == site.organization_id).first()
-    org_name = organization.name if organization else "Unknown"
+    site, org_name = get_report_site(db, site_id, current_user)
 
     try:
         # If single day, return single PDF
@@ -694,27 +662,14 @@ def generate_checklist_pdf_range(
                 headers={"Content-Disposition": f"attachment; filename={filename}"}
             )
 
-        # Multiple days - create ZIP file
-        zip_buffer = BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            current_date = start_date
-            while current_date <= end_date:
-                pdf_buffer = pdf_service.generate_daily_checklist_report(
-                    db=db,
-                    site_id=site_id,
-                    report_date=current_date,
-                    organization_name=org_name,
-                    site_name=site.name
-                )
-                filename = pdf_service.generate_filename(org_name, site.name, current_date)
-                zip_file.writestr(filename, pdf_buffer.getvalue())
-                current_date += timedelta(days=1)
+        # Multiple days - render in parallel worker processes and stream the ZIP as days finish
+        from app.services.pdf_render_pool import stream_daily_reports_zip
 
-        zip_buffer.seek(0)
+        report_dates = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
         zip_filename = pdf_service.generate_filename(org_name, site.name, start_date, end_date).replace('.pdf', '.zip')
 
         return StreamingResponse(
-            zip_buffer,
+            stream_daily_reports_zip(site_id, report_dates, org_name, site.name),
             media_type="application/zip",
             headers={"Content-Disposition": f"attachment; filename={zip_filename}"}
         )
@@ -722,3 +677,74 @@ def generate_checklist_pdf_range(
     except Exception as e:
         logger.error(f"Error generating PDF reports: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to generate PDFs: {str(e)}")
+
+
+def _job_response(job: ReportJob) -> ReportJobResponse:
+    response = ReportJobResponse.model_validate(job)
+    if job.status == ReportJobStatus.COMPLETED:
+        response.download_url = f"{settings.API_V1_PREFIX}/reports/pdf/jobs/{job.id}/download"
+    return response
+
+
+def _get_report_job(db: Session, job_id: int, current_user: User) -> ReportJob:
+    job = db.query(ReportJob).filter(ReportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    # Same access rules as the site the report is for
+    get_report_site(db, job.site_id, current_user)
+    return job
+
+
+@router.post("/reports/pdf/jobs", response_model=ReportJobResponse, status_code=202)
+def create_checklist_pdf_job(
+    request: ReportJobCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Request checklist PDF reports for a site and date range, rendered in the background.
+
+    Poll GET /reports/pdf/jobs/{job_id} until the status is "completed",
+    then fetch download_url (a PDF for one day, a ZIP for a range). Repeat
+    requests for data that has not changed return the existing job.
+    """
+    if request.end_date < request.start_date:
+        raise HTTPException(status_code=400, detail="End date must be after start date")
+
+    if (request.end_date - request.start_date).days > 31:
+        raise HTTPException(status_code=400, detail="Date range cannot exceed 31 days")
+
+    site, org_name = get_report_site(db, request.site_id, current_user)
+
+    job, created = get_or_create_job(db, site, org_name, request.start_date, request.end_date, current_user)
+    if created:
+        celery_app.send_task('app.celery_tasks.render_report_job', args=[job.id])
+
+    return _job_response(job)
+
+
+@router.get("/reports/pdf/jobs/{job_id}", response_model=ReportJobResponse)
+def get_checklist_pdf_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the status of a PDF report job."""
+    return _job_response(_get_report_job(db, job_id, current_user))
+
+
+@router.get("/reports/pdf/jobs/{job_id}/download")
+def download_checklist_pdf_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Download the PDF or ZIP produced by a completed report job."""
+    job = _get_report_job(db, job_id, current_user)
+
+    if job.status != ReportJobStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Report job is {job.status.value}")
+    if not job.file_path or not os.path.exists(job.file_path):
+        raise HTTPException(status_code=410, detail="Report file is no longer available, please request it again")
+
+    return FileResponse(job.file_path, media_type=job.content_type, filename=job.filename)
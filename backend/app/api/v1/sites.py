@@ -12,6 +12,7 @@ from app.models.category import Category, ChecklistFrequency
 from app.models.checklist import Checklist, ChecklistStatus
 from app.models.checklist_item import ChecklistItem
 from app.models.task import Task
+from app.services.site_stats_service import refresh_site_days
 from app.schemas.site import SiteCreate, SiteUpdate, SiteResponse
 
 router = APIRouter()
@@ -88,7 +89,7 @@ def list_sites(
             query = query.filter(Site.organization_id == organization_id)
     elif current_user.role == UserRole.SITE_USER:
         # Site users can only see their assigned sites
-        user_site_ids = [us.site_id for us in current_user.user_sites]
+        user_site_ids = current_user.site_ids
         query = query.filter(Site.id.in_(user_site_ids))
     else:
         # ORG_ADMINs can see all their org's sites
@@ -221,6 +222,7 @@ def regenerate_site_checklists(
         today = date.today()
         created_count = 0
         skipped_count = 0
+        stats_keys = set()
 
         # Get active categories (global + organization-specific)
         categories = db.query(Category).filter(
@@ -292,8 +294,10 @@ def regenerate_site_checklists(
             new_checklist.total_items = len(tasks)
             new_checklist.completed_items = 0
 
+            stats_keys.add((site.id, checklist_date))
             created_count += 1
 
+        refresh_site_days(db, stats_keys)
         db.commit()
 
         return {
@@ -1,15 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-from datetime import datetime
 from app.core.database import get_db
-from app.core.dependencies import get_current_org_admin, get_current_user
+from app.core.dependencies import get_current_org_admin, get_current_user, get_current_super_admin
 from app.models.user import User, UserRole
 from app.models.task import Task
 from app.models.task_field import TaskField
 from app.models.task_field_response import TaskFieldResponse
-from app.models.checklist_item import ChecklistItem
-from app.models.checklist import Checklist, ChecklistStatus
+from app.services.field_response_service import submit_responses
+from app.services.task_field_cache import task_field_cache
 from app.schemas.task_field import (
     TaskFieldCreate,
     TaskFieldUpdate,
@@ -17,7 +16,8 @@ from app.schemas.task_field import (
     TaskFieldBulkCreate,
     TaskFieldResponseCreate,
     TaskFieldResponseSchema as TaskFieldResponseSchemaResponse,
-    TaskFieldResponseSubmission
+    TaskFieldResponseSubmission,
+    TaskFieldResponseBatchSubmission
 )
 
 router = APIRouter()
@@ -65,6 +65,8 @@ def create_task_field(
     db.commit()
     db.refresh(new_field)
 
+    task_field_cache.bump_version([new_field.task_id])
+
     return new_field
 
 
@@ -116,6 +118,8 @@ def create_task_fields_bulk(
     for field in created_fields:
         db.refresh(field)
 
+    task_field_cache.bump_version([bulk_data.task_id])
+
     return created_fields
 
 
@@ -135,6 +139,14 @@ def list_task_fields(
     return fields
 
 
+@router.get("/task-fields/cache-stats")
+def get_task_field_cache_stats(
+    current_user: User = Depends(get_current_super_admin)
+):
+    """Get hit/miss counters of this process's task field schema cache (Super Admin only)."""
+    return task_field_cache.stats()
+
+
 @router.get("/task-fields/{field_id}", response_model=TaskFieldResponseSchema)
 def get_task_field(
     field_id: int,
@@ -187,6 +199,8 @@ def update_task_field(
     db.commit()
     db.refresh(field)
 
+    task_field_cache.bump_version([field.task_id])
+
     return field
 
 
@@ -215,9 +229,12 @@ def delete_task_field(
                 detail="Not enough permissions"
             )
 
+    task_id = field.task_id
     db.delete(field)
     db.commit()
 
+    task_field_cache.bump_version([task_id])
+
     return None
 
 
@@ -230,186 +247,22 @@ def submit_field_responses(
     current_user: User = Depends(get_current_user)
 ):
     """Submit field responses for a checklist item."""
-    from app.models.defect import Defect, DefectSeverity, DefectStatus
+    return submit_responses(db, [submission], current_user)
 
-    # Verify checklist item exists
-    checklist_item = db.query(ChecklistItem).filter(ChecklistItem.id == submission.checklist_item_id).first()
 
-    if not checklist_item:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Checklist item not found"
-        )
-
-    # Get checklist for site_id
-    checklist = db.query(Checklist).filter(Checklist.id == checklist_item.checklist_id).first()
-    site_id = checklist.site_id if checklist else None
-    
-    # Check if checklist is overdue - prevent completion of overdue checklists
-    if checklist:
-        from datetime import date, datetime, time as dt_time
-        from app.models.category import Category
-        
-        category = db.query(Category).filter(Category.id == checklist.category_id).first()
-        today = date.today()
-        now = datetime.now()
-        
-        # If checklist date is in the past, it's overdue
-        if checklist.checklist_date < today:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot complete overdue checklist. This checklist was due on " + str(checklist.checklist_date)
-            )
-        
-        # If checklist is for today but past closing time, it's overdue
-        if checklist.checklist_date == today and category and category.closes_at:
-            closes_at_time = category.closes_at
-            current_time = now.time()
-            if current_time > closes_at_time:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Cannot complete checklist after closing time (" + str(closes_at_time) + ")"
-                )
-
-    # Create all responses
-    created_responses = []
-    for response_data in submission.responses:
-        new_response = TaskFieldResponse(
-            checklist_item_id=submission.checklist_item_id,
-            task_field_id=response_data.task_field_id,
-            text_value=response_data.text_value,
-            number_value=response_data.number_value,
-            boolean_value=response_data.boolean_value,
-            json_value=response_data.json_value,
-            file_url=response_data.file_url,
-            completed_by=current_user.id
-        )
-        db.add(new_response)
-        db.flush()  # Flush to get response ID for defect linking
-
-        # Temperature validation and automatic defect creation
-        task_field = db.query(TaskField).filter(TaskField.id == response_data.task_field_id).first()
-
-        if task_field:
-            # Check regular temperature fields
-            if response_data.number_value is not None and task_field.field_type in ["TEMPERATURE", "NUMBER"]:
-                temperature = response_data.number_value
-                field_label_lower = task_field.field_label.lower()
-
-                # Determine if it's a fridge or freezer based on field label
-                is_fridge = any(keyword in field_label_lower for keyword in ["fridge", "refrigerator", "chiller"])
-                is_freezer = any(keyword in field_label_lower for keyword in ["freezer", "frozen"])
-
-                # Legal limits
-                FRIDGE_MAX = 8  # Fridges must be below 8°C
-                FREEZER_MAX = -18  # Freezers must be at or below -18°C
-
-                violation = None
-                if is_fridge and temperature >= FRIDGE_MAX:
-                    violation = f"Fridge temperature {temperature}°C exceeds legal limit (must be < {FRIDGE_MAX}°C)"
-                elif is_freezer and temperature > FREEZER_MAX:
-                    violation = f"Freezer temperature {temperature}°C exceeds legal limit (must be ≤ {FREEZER_MAX}°C)"
-
-                if violation and site_id:
-                    # Create defect automatically
-                    defect = Defect(
-                        title=f"Temperature Violation: {task_field.field_label}",
-                        description=violation,
-                        severity=DefectSeverity.HIGH,
-                        status=DefectStatus.OPEN,
-                        site_id=site_id,
-                        checklist_item_id=checklist_item.id,
-                        reported_by_id=current_user.id
-                    )
-                    db.add(defect)
-                    db.flush()  # Get defect ID
-
-                    # Link defect to response
-                    new_response.auto_defect_id = defect.id
-
-            # Check repeating group temperature fields (JSON)
-            elif response_data.json_value and isinstance(response_data.json_value, list):
-                field_label_lower = task_field.field_label.lower()
-                is_fridge = any(keyword in field_label_lower for keyword in ["fridge", "refrigerator", "chiller"])
-                is_freezer = any(keyword in field_label_lower for keyword in ["freezer", "frozen"])
-
-                # Legal limits
-                FRIDGE_MAX = 8
-                FREEZER_MAX = -18
-
-                violations = []
-                for idx, instance in enumerate(response_data.json_value):
-                    if isinstance(instance, dict) and "temperature" in instance:
-                        temperature = instance.get("temperature")
-                        if temperature is not None:
-                            try:
-                                temp_value = float(temperature)
-                                item_number = idx + 1
-
-                                if is_fridge and temp_value >= FRIDGE_MAX:
-                                    violations.append(f"Item {item_number}: {temp_value}°C exceeds limit (must be < {FRIDGE_MAX}°C)")
-                                elif is_freezer and temp_value > FREEZER_MAX:
-                                    violations.append(f"Item {item_number}: {temp_value}°C exceeds limit (must be ≤ {FREEZER_MAX}°C)")
-                            except (ValueError, TypeError):
-                                pass  # Skip invalid temperature values
-
-                if violations and site_id:
-                    # Create single defect for all violations in this group
-                    violation_text = "\n".join(violations)
-                    defect = Defect(
-                        title=f"Temperature Violation: {task_field.field_label}",
-                        description=f"Multiple temperature readings outside legal limits:\n{violation_text}",
-                        severity=DefectSeverity.HIGH,
-                        status=DefectStatus.OPEN,
-                        site_id=site_id,
-                        checklist_item_id=checklist_item.id,
-                        reported_by_id=current_user.id
-                    )
-                    db.add(defect)
-                    db.flush()
-
-                    # Link defect to response
-                    new_response.auto_defect_id = defect.id
-
-        created_responses.append(new_response)
-
-    # Mark checklist item as completed
-    checklist_item.is_completed = True
-    checklist_item.completed_at = datetime.utcnow()
-
-    # Flush changes to database so the count query can see the updated item
-    db.flush()
-
-    # Update parent checklist completion statistics with row-level locking to prevent race conditions
-    checklist = db.query(Checklist).filter(
-        Checklist.id == checklist_item.checklist_id
-    ).with_for_update().first()
-
-    if checklist:
-        # Count completed items
-        completed_count = db.query(ChecklistItem).filter(
-            ChecklistItem.checklist_id == checklist.id,
-            ChecklistItem.is_completed == True
-        ).count()
-
-        checklist.completed_items = completed_count
-        checklist.calculate_completion()
-
-        # Update checklist status to in_progress
-        if checklist.status == ChecklistStatus.PENDING:
-            checklist.status = ChecklistStatus.IN_PROGRESS
-
-        # If all items are completed, mark checklist as completed
-        if checklist.completed_items == checklist.total_items and checklist.total_items > 0:
-            checklist.status = ChecklistStatus.COMPLETED
-            checklist.completed_at = datetime.utcnow()
-            checklist.completed_by_id = current_user.id
-
-    db.commit()
-    for response in created_responses:
-        db.refresh(response)
+@router.post("/task-field-responses/batch", response_model=List[TaskFieldResponseSchemaResponse], status_code=status.HTTP_201_CREATED)
+def submit_field_responses_batch(
+    batch: TaskFieldResponseBatchSubmission,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Submit field responses for several checklist items at once.
 
-    return created_responses
+    Lets offline clients sync a whole round of checks in one request. The
+    batch is all-or-nothing: if any item is missing or overdue nothing is saved.
+    """
+    return submit_responses(db, batch.submissions, current_user)
 
 
 @router.get("/task-field-responses", response_model=List[TaskFieldResponseSchemaResponse])
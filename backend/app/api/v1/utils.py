@@ -100,11 +100,12 @@ async def upload_photo(
     Upload a photo file.
     
     This endpoint handles photo uploads for checklist items, defects, etc.
-    The file is optimized and stored, and a URL is returned.
+    The file is stored as resized derivatives; file_url is the medium size
+    and derivatives has the thumbnail, medium and original URLs.
     """
     try:
         # Upload and optimize the file
-        file_url = await storage_service.upload_file(
+        derivatives = await storage_service.upload_image(
             file=file,
             subfolder="photos",
             optimize=True
@@ -112,7 +113,8 @@ async def upload_photo(
         
         return {
             "success": True,
-            "file_url": file_url,
+            "file_url": derivatives.get("medium", derivatives["original"]),
+            "derivatives": derivatives,
             "message": "Photo uploaded successfully"
         }
     
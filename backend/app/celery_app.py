@@ -27,16 +27,22 @@ celery_app.conf.update(
 
 # Celery Beat schedule for periodic tasks
 celery_app.conf.beat_schedule = {
-    'send-daily-reports': {
-        'task': 'app.celery_tasks.send_daily_reports',
-        'schedule': crontab(hour=9, minute=0),  # Run at 9:00 AM every day
-    },
-    'send-weekly-reports': {
-        'task': 'app.celery_tasks.send_weekly_reports',
-        'schedule': crontab(hour=9, minute=15),  # Run at 9:15 AM every day, check which sites need weekly reports
+    'dispatch-scheduled-reports': {
+        'task': 'app.celery_tasks.dispatch_scheduled_reports',
+        # Every few minutes: sends the reports whose site-local time falls in the window
+        'schedule': crontab(minute=f'*/{settings.REPORT_SCHEDULER_INTERVAL_MINUTES}'),
     },
     'generate-daily-checklists': {
         'task': 'app.celery_tasks.generate_daily_checklists',
         'schedule': crontab(hour=0, minute=1),  # Run at 00:01 every day
     },
+    'rebuild-site-daily-stats': {
+        'task': 'app.celery_tasks.rebuild_site_daily_stats',
+        'schedule': crontab(hour=0, minute=30),  # Run at 00:30 every day, repairs yesterday's and today's rollup
+        'kwargs': {'days': 2},
+    },
+    'refresh-super-admin-dashboard': {
+        'task': 'app.celery_tasks.refresh_super_admin_dashboard',
+        'schedule': crontab(minute='*/5'),  # Run every 5 minutes
+    },
 }
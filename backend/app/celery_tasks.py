@@ -2,17 +2,30 @@
 Celery Background Tasks
 """
 import logging
-from datetime import date, timedelta
-from calendar import monthrange
-from sqlalchemy.orm import Session
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from celery import chord, group
+from sqlalchemy.orm import Session, joinedload
 
 from app.celery_app import celery_app
+from app.core.config import settings
 from app.core.database import SessionLocal
-from app.models.category import Category, ChecklistFrequency
+from app.core.email import email_service
+from app.core.redis import get_redis
+from app.models.report_job import ReportJob, ReportJobStatus
 from app.models.site import Site
-from app.models.checklist import Checklist, ChecklistStatus
-from app.models.checklist_item import ChecklistItem
-from app.models.task import Task
+from app.models.user import UserRole
+from app.services.checklist_generation_service import build_site_shards, generate_checklists
+from app.services.dashboard_service import refresh_super_admin_snapshot
+from app.services.notification_service import notification_service
+from app.services.report_job_service import render_job
+from app.services.site_report_service import (
+    REPORT_DAILY,
+    REPORT_WEEKLY,
+    build_site_report_emails,
+    due_site_reports,
+    report_recipients
+)
+from app.services.site_stats_service import rebuild_site_daily_stats as _rebuild_site_daily_stats
 
 logger = logging.getLogger(__name__)
 
@@ -22,126 +35,242 @@ def generate_daily_checklists():
     """
     Scheduled task to generate checklists for all sites and categories
     Runs daily at midnight (00:01) via Celery Beat
+
+    Acts as a coordinator: active sites are split into shards and each shard
+    is generated by its own generate_checklists_shard task, so generation
+    scales with worker count and a failing site only retries its own shard.
+    The shard results are summed by aggregate_checklist_generation.
     """
     db: Session = SessionLocal()
     try:
         today = date.today()
-        logger.info(f"Starting daily checklist generation for {today}")
-
-        created_count = 0
-        skipped_count = 0
-
-        # Get all active sites
-        sites = db.query(Site).filter(Site.is_active == True).all()
-        logger.info(f"Found {len(sites)} active sites")
-
-        for site in sites:
-            # Get active categories (global + organization-specific)
-            categories = db.query(Category).filter(
-                ((Category.is_global == True) | (Category.organization_id == site.organization_id)),
-                Category.is_active == True
-            ).all()
-
-            for category in categories:
-                # Determine if we should create a checklist based on frequency
-                should_create = False
-                checklist_date = today
-
-                if category.frequency == ChecklistFrequency.DAILY:
-                    # Daily categories: create every day, due today
-                    should_create = True
-                    checklist_date = today
-                elif category.frequency == ChecklistFrequency.MONTHLY:
-                    # Monthly categories: only create on the 1st of the month
-                    # Due date is the last day of the month
-                    if today.day == 1:
-                        should_create = True
-                        # Calculate last day of current month
-                        _, last_day = monthrange(today.year, today.month)
-                        checklist_date = date(today.year, today.month, last_day)
-                    else:
-                        logger.debug(f"Skipping monthly category {category.name} - not the 1st of month")
-                elif category.frequency == ChecklistFrequency.WEEKLY:
-                    # Weekly categories: create on Monday (day 0), due same day
-                    if today.weekday() == 0:
-                        should_create = True
-                        checklist_date = today
-                    else:
-                        logger.debug(f"Skipping weekly category {category.name} - not Monday")
-                else:
-                    # For other frequencies (six_monthly, yearly), skip for now
-                    logger.debug(f"Skipping category {category.name} with frequency {category.frequency}")
-                    continue
-
-                if not should_create:
-                    skipped_count += 1
-                    continue
-
-                # Check if checklist already exists for this date
-                existing = db.query(Checklist).filter(
-                    Checklist.checklist_date == checklist_date,
-                    Checklist.category_id == category.id,
-                    Checklist.site_id == site.id
-                ).first()
-
-                if existing:
-                    skipped_count += 1
-                    logger.debug(f"Checklist already exists for site {site.name}, category {category.name}, date {checklist_date}")
-                    continue
-
-                # Create new checklist
-                new_checklist = Checklist(
-                    checklist_date=checklist_date,
-                    category_id=category.id,
-                    site_id=site.id,
-                    status=ChecklistStatus.PENDING
-                )
-                db.add(new_checklist)
-                db.flush()
-
-                # Get all active tasks for this category
-                tasks = db.query(Task).filter(
-                    Task.category_id == category.id,
-                    Task.is_active == True
-                ).order_by(Task.order_index).all()
-
-                # Create checklist items for each task
-                for task in tasks:
-                    checklist_item = ChecklistItem(
-                        checklist_id=new_checklist.id,
-                        task_id=task.id,
-                        item_name=task.name,
-                        is_completed=False
-                    )
-                    db.add(checklist_item)
-
-                # Set totals
-                new_checklist.total_items = len(tasks)
-                new_checklist.completed_items = 0
-
-                created_count += 1
-                logger.info(f"Created {category.frequency} checklist for site {site.name}, category {category.name}, due {checklist_date}, with {len(tasks)} items")
+        shards = build_site_shards(db, settings.CHECKLIST_GENERATION_SHARD_SIZE)
+        logger.info(f"Starting daily checklist generation for {today}: {len(shards)} shards")
+    finally:
+        db.close()
 
-        db.commit()
+    if not shards:
+        return {"status": "success", "date": str(today), "created": 0, "skipped": 0, "total_sites": 0, "shards": 0}
+
+    header = group(
+        generate_checklists_shard.s(site_ids, today.isoformat(), shard_index)
+        for shard_index, site_ids in enumerate(shards)
+    )
+    result = chord(header)(aggregate_checklist_generation.s(today.isoformat()))
+
+    return {
+        "status": "dispatched",
+        "date": str(today),
+        "shards": len(shards),
+        "chord_id": result.id
+    }
+
+
+@celery_app.task(
+    bind=True,
+    name='app.celery_tasks.generate_checklists_shard',
+    max_retries=3,
+    acks_late=True
+)
+def generate_checklists_shard(self, site_ids: list, checklist_date: str, shard_index: int = 0):
+    """
+    Generate checklists for one shard of sites.
 
-        logger.info(f"Daily checklist generation complete: {created_count} created, {skipped_count} skipped")
+    Idempotent: checklists that already exist are skipped, so a retry after a
+    partial failure only creates what is still missing. Once retries are
+    exhausted the error is returned as a result rather than raised, so the
+    other shards still reach the aggregation callback.
+    """
+    db: Session = SessionLocal()
+    try:
+        result = generate_checklists(
+            db,
+            today=date.fromisoformat(checklist_date),
+            site_ids=site_ids,
+            chunk_size=settings.CHECKLIST_GENERATION_CHUNK_SIZE
+        )
+        logger.info(f"Checklist shard {shard_index}: {result['created']} created, {result['skipped']} skipped")
+        return {
+            "status": "success",
+            "shard": shard_index,
+            "created": result["created"],
+            "skipped": result["skipped"],
+            "items_created": result["items_created"],
+            "total_sites": result["total_sites"]
+        }
+
+    except Exception as e:
+        db.rollback()
+        if self.request.retries < self.max_retries:
+            logger.warning(f"Checklist shard {shard_index} failed, retrying: {str(e)}")
+            raise self.retry(exc=e, countdown=30 * (2 ** self.request.retries))
+        logger.error(f"Checklist shard {shard_index} failed after retries: {str(e)}", exc_info=True)
+        return {
+            "status": "error",
+            "shard": shard_index,
+            "site_ids": site_ids,
+            "error": str(e),
+            "created": 0,
+            "skipped": 0,
+            "items_created": 0,
+            "total_sites": len(site_ids)
+        }
+    finally:
+        db.close()
+
+
+@celery_app.task(name='app.celery_tasks.aggregate_checklist_generation')
+def aggregate_checklist_generation(shard_results: list, checklist_date: str):
+    """
+    Chord callback summing the created/skipped counts of every shard
+    """
+    failed = [r for r in shard_results if r.get("status") != "success"]
+    summary = {
+        "status": "success" if not failed else "partial",
+        "date": checklist_date,
+        "created": sum(r.get("created", 0) for r in shard_results),
+        "skipped": sum(r.get("skipped", 0) for r in shard_results),
+        "items_created": sum(r.get("items_created", 0) for r in shard_results),
+        "total_sites": sum(r.get("total_sites", 0) for r in shard_results),
+        "shards": len(shard_results),
+        "failed_shards": [r.get("shard") for r in failed]
+    }
+
+    logger.info(
+        f"Daily checklist generation complete for {checklist_date}: {summary['created']} created, "
+        f"{summary['skipped']} skipped, {len(failed)} of {len(shard_results)} shards failed"
+    )
+
+    return summary
+
+
+@celery_app.task(name='app.celery_tasks.rebuild_site_daily_stats')
+def rebuild_site_daily_stats(start_date: str = None, end_date: str = None, days: int = 30):
+    """
+    Rebuild the site_daily_stats rollup from the raw checklist, item and defect tables.
+
+    Rebuilds start_date..end_date (ISO dates) when given, otherwise the last
+    `days` days up to today. Each day is committed separately per chunk of
+    sites, so a long backfill neither holds one huge transaction nor keeps
+    every site's rollup lock at once.
+    """
+    db: Session = SessionLocal()
+    try:
+        end = date.fromisoformat(end_date) if end_date else date.today()
+        start = date.fromisoformat(start_date) if start_date else end - timedelta(days=days - 1)
+        logger.info(f"Rebuilding site daily stats from {start} to {end}")
+
+        site_ids = [row.id for row in db.query(Site.id).order_by(Site.id).all()]
+        chunk_size = settings.CHECKLIST_GENERATION_SHARD_SIZE
+
+        rows_written = 0
+        current_date = start
+        while current_date <= end:
+            for offset in range(0, len(site_ids), chunk_size):
+                rows_written += _rebuild_site_daily_stats(
+                    db, current_date, current_date, site_ids[offset:offset + chunk_size]
+                )
+                db.commit()
+            current_date += timedelta(days=1)
+
+        logger.info(f"Site daily stats rebuild complete: {rows_written} rows for {start} to {end}")
 
         return {
             "status": "success",
-            "date": str(today),
-            "created": created_count,
-            "skipped": skipped_count,
-            "total_sites": len(sites)
+            "start_date": str(start),
+            "end_date": str(end),
+            "rows": rows_written
         }
 
     except Exception as e:
         db.rollback()
-        logger.error(f"Error generating daily checklists: {str(e)}", exc_info=True)
+        logger.error(f"Error rebuilding site daily stats: {str(e)}", exc_info=True)
         raise
     finally:
         db.close()
 
 
+@celery_app.task(name='app.celery_tasks.refresh_super_admin_dashboard')
+def refresh_super_admin_dashboard():
+    """
+    Recompute the super admin dashboard snapshot served by GET /dashboards/super-admin
+    Runs every 5 minutes via Celery Beat
+    """
+    db: Session = SessionLocal()
+    try:
+        snapshot = refresh_super_admin_snapshot(db)
+        logger.info(f"Super admin dashboard snapshot refreshed at {snapshot['generated_at']}")
+        return {"status": "success", "generated_at": snapshot["generated_at"]}
+    except Exception as e:
+        logger.error(f"Error refreshing super admin dashboard snapshot: {str(e)}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+@celery_app.task(name='app.celery_tasks.render_report_job', acks_late=True)
+def render_report_job(job_id: int):
+    """
+    Render a checklist PDF report job requested via POST /reports/pdf/jobs
+    """
+    db: Session = SessionLocal()
+    try:
+        job = db.query(ReportJob).filter(ReportJob.id == job_id).first()
+        if not job:
+            logger.warning(f"Report job {job_id} not found")
+            return {"status": "skipped", "job_id": job_id}
+        if job.status == ReportJobStatus.COMPLETED:
+            return {"status": "success", "job_id": job_id}
+
+        render_job(db, job)
+        return {"status": "success", "job_id": job_id}
+
+    except Exception as e:
+        logger.error(f"Error rendering report job {job_id}: {str(e)}", exc_info=True)
+        return {"status": "error", "job_id": job_id, "error": str(e)}
+    finally:
+        db.close()
+
+
+@celery_app.task(name='app.celery_tasks.fan_out_notifications', acks_late=True)
+def fan_out_notifications(
+    title: str,
+    message: str,
+    notification_type: str,
+    related_id: int = None,
+    related_url: str = None,
+    user_ids: list = None,
+    role: str = None
+):
+    """
+    Create a notification for a list of users or every user with a role,
+    deferred from a request by NotificationService.fan_out
+    """
+    db: Session = SessionLocal()
+    try:
+        created = notification_service.fan_out(
+            db=db,
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            related_id=related_id,
+            related_url=related_url,
+            user_ids=user_ids,
+            role=UserRole(role) if role else None,
+            defer=False
+        )
+        db.commit()
+        logger.info(f"Created {created} '{notification_type}' notifications")
+        return {"status": "success", "created": created}
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error fanning out '{notification_type}' notifications: {str(e)}", exc_info=True)
+        return {"status": "error", "error": str(e)}
+    finally:
+        db.close()
+
+
 @celery_app.task(name='app.celery_tasks.test_task')
 def test_task():
     """
@@ -151,325 +280,266 @@ def test_task():
     return {"status": "success", "message": "Test task completed"}
 
 
+def _dispatch_site_reports(site_ids: list, report_type: str, start_date: date, end_date: date) -> dict:
+    """Enqueue one send_site_report task per site with a summary chord callback."""
+    if not site_ids:
+        return {
+            "status": "success",
+            "report_type": report_type,
+            "start_date": str(start_date),
+            "end_date": str(end_date),
+            "sent": 0,
+            "skipped": 0,
+            "errors": 0,
+            "total_sites": 0
+        }
+
+    header = group(
+        send_site_report.s(site_id, report_type, start_date.isoformat(), end_date.isoformat())
+        for site_id in site_ids
+    )
+    result = chord(header)(summarize_site_reports.s(report_type, start_date.isoformat(), end_date.isoformat()))
+
+    return {
+        "status": "dispatched",
+        "report_type": report_type,
+        "start_date": str(start_date),
+        "end_date": str(end_date),
+        "total_sites": len(site_ids),
+        "chord_id": result.id
+    }
+
+
+SCHEDULER_WATERMARK_KEY = "reports:scheduler:watermark"
+SCHEDULER_LOCK_KEY = "reports:scheduler:lock"
+
+
+@celery_app.task(name='app.celery_tasks.dispatch_scheduled_reports')
+def dispatch_scheduled_reports():
+    """
+    Scheduler tick for daily and weekly report emails
+    Runs every REPORT_SCHEDULER_INTERVAL_MINUTES via Celery Beat
+
+    Sends the reports of sites whose configured report time (in the site's
+    timezone) falls in [watermark, now), where the watermark in Redis is
+    the minute the previous tick dispatched up to. A late or skipped tick
+    therefore catches up on the minutes it missed (at most
+    REPORT_SCHEDULER_MAX_CATCHUP_MINUTES), and a lock in Redis stops a
+    duplicated tick from sending reports twice. Without Redis the last
+    interval is dispatched.
+    """
+    interval = settings.REPORT_SCHEDULER_INTERVAL_MINUTES
+    window_end = datetime.now(dt_timezone.utc).replace(second=0, microsecond=0)
+    earliest = window_end - timedelta(minutes=settings.REPORT_SCHEDULER_MAX_CATCHUP_MINUTES)
+    window_start = window_end - timedelta(minutes=interval)
+
+    client = None
+    try:
+        client = get_redis()
+        if not client.set(SCHEDULER_LOCK_KEY, "1", nx=True, ex=interval * 60):
+            logger.info("Report scheduler already running, skipping tick")
+            return {"status": "skipped", "window_end": window_end.isoformat()}
+        watermark = client.get(SCHEDULER_WATERMARK_KEY)
+        if watermark:
+            window_start = datetime.fromisoformat(watermark)
+    except Exception as e:
+        client = None
+        logger.warning(f"Could not read report scheduler watermark in Redis, dispatching last interval: {str(e)}")
+
+    try:
+        if window_start < earliest:
+            logger.warning(f"Report scheduler is behind since {window_start}, catching up from {earliest}")
+            window_start = earliest
+        minutes = int((window_end - window_start).total_seconds() // 60)
+        if minutes <= 0:
+            return {"status": "skipped", "window_start": window_start.isoformat(), "window_end": window_end.isoformat()}
+
+        db: Session = SessionLocal()
+        try:
+            due = due_site_reports(db, window_start, minutes)
+        finally:
+            db.close()
+
+        dispatched = [
+            _dispatch_site_reports(site_ids, report_type, start_date, end_date)
+            for report_type, start_date, end_date, site_ids in due
+        ]
+
+        if client is not None:
+            client.set(SCHEDULER_WATERMARK_KEY, window_end.isoformat())
+    finally:
+        if client is not None:
+            try:
+                client.delete(SCHEDULER_LOCK_KEY)
+            except Exception as e:
+                logger.warning(f"Could not release report scheduler lock: {str(e)}")
+
+    logger.info(
+        f"Report window {window_start} to {window_end}: dispatched {sum(d['total_sites'] for d in dispatched)} "
+        f"site reports in {len(dispatched)} groups"
+    )
+
+    return {
+        "status": "success",
+        "window_start": window_start.isoformat(),
+        "window_end": window_end.isoformat(),
+        "groups": dispatched
+    }
+
+
 @celery_app.task(name='app.celery_tasks.send_daily_reports')
 def send_daily_reports():
     """
-    Scheduled task to send daily reports for all sites with daily_report_enabled=True
-    Runs daily at 9am via Celery Beat
+    Send yesterday's daily report to every site with daily_report_enabled=True
+    now, regardless of configured report times (manual/backfill trigger;
+    scheduled sends go through dispatch_scheduled_reports)
+
+    Enqueues one send_site_report task per site; summarize_site_reports
+    collects the sent/skipped/error counts.
     """
-    import logging
-    from datetime import datetime, timedelta, date
-    from sqlalchemy.orm import Session
-    from app.core.database import SessionLocal
-    from app.models.site import Site
-    from app.models.checklist import Checklist, ChecklistStatus
-    from app.models.defect import Defect
-    from app.models.category import Category
-    from app.core.email import email_service
-    
-    logger = logging.getLogger(__name__)
     db: Session = SessionLocal()
-    
     try:
-        today = datetime.utcnow().date()
-        yesterday = today - timedelta(days=1)
-        logger.info(f"Starting daily report generation for {yesterday}")
-        
-        sent_count = 0
-        skipped_count = 0
-        error_count = 0
-        
-        # Get all sites with daily reports enabled
-        sites = db.query(Site).filter(
+        yesterday = datetime.utcnow().date() - timedelta(days=1)
+        site_ids = [row.id for row in db.query(Site.id).filter(
             Site.is_active == True,
             Site.daily_report_enabled == True
-        ).all()
-        
-        logger.info(f"Found {len(sites)} sites with daily reports enabled")
-        
-        for site in sites:
-            try:
-                if not site.report_recipients:
-                    logger.warning(f"Site {site.name} (ID: {site.id}) has no report recipients configured")
-                    skipped_count += 1
-                    continue
-                
-                # Get yesterday's checklists for this site
-                checklists = db.query(Checklist).filter(
-                    Checklist.site_id == site.id,
-                    Checklist.checklist_date == yesterday
-                ).all()
-                
-                if not checklists:
-                    logger.info(f"No checklists found for site {site.name} on {yesterday}")
-                    skipped_count += 1
-                    continue
-                
-                # Calculate completion stats
-                total_checklists = len(checklists)
-                completed_checklists = len([c for c in checklists if c.status == ChecklistStatus.COMPLETED])
-                completion_rate = (completed_checklists / total_checklists * 100) if total_checklists > 0 else 0
-                
-                # Count total items and completed items
-                total_items = sum(len(c.items) for c in checklists)
-                completed_items = sum(len([item for item in c.items if item.is_completed]) for c in checklists)
-
-                # Calculate item completion rate
-                item_completion_rate = (completed_items / total_items * 100) if total_items > 0 else 0
-                
-                # Get yesterday's defects
-                defects = db.query(Defect).filter(
-                    Defect.site_id == site.id,
-                    Defect.created_at >= datetime.combine(yesterday, datetime.min.time()),
-                    Defect.created_at < datetime.combine(yesterday + timedelta(days=1), datetime.min.time())
-                ).all()
-                
-                defects_data = [{
-                    'title': d.title,
-                    'severity': d.severity,
-                    'description': d.description
-                } for d in defects]
-                
-                # Category performance
-                category_stats = []
-                categories = db.query(Category).filter(
-                    Category.organization_id == site.organization_id
-                ).all()
-                
-                for category in categories:
-                    cat_checklists = [c for c in checklists if c.category_id == category.id]
-                    if cat_checklists:
-                        cat_completed = len([c for c in cat_checklists if c.status == ChecklistStatus.COMPLETED])
-                        cat_rate = (cat_completed / len(cat_checklists) * 100) if cat_checklists else 0
-                        category_stats.append({
-                            'category_name': category.name,
-                            'completion_rate': round(cat_rate, 1)
-                        })
-                
-                # Build report data
-                report_data = {
-                    'completion_rate': round(completion_rate, 1),
-                    'tasks_completed': completed_checklists,
-                    'total_tasks': total_checklists,
-                    'items_completed': completed_items,
-                    'total_items': total_items,
-                    'item_completion_rate': round(item_completion_rate, 1),
-                    'defects': defects_data,
-                    'category_stats': category_stats,
-                    'recommendations': [],
-                    'is_daily': True
-                }
-                
-                # Send email to all recipients
-                recipients = [email.strip() for email in site.report_recipients.split(',') if email.strip()]
-                
-                for recipient in recipients:
-                    try:
-                        success = email_service.send_daily_report_email(
-                            recipient_email=recipient,
-                            recipient_name=recipient.split('@')[0],
-                            organization_name=site.organization.name if site.organization else "Organization",
-                            site_name=site.name,
-                            report_date=str(yesterday),
-                            report_data=report_data
-                        )
-                        
-                        if success:
-                            logger.info(f"Daily report sent to {recipient} for site {site.name}")
-                            sent_count += 1
-                        else:
-                            logger.error(f"Failed to send daily report to {recipient} for site {site.name}")
-                            error_count += 1
-                    except Exception as e:
-                        logger.error(f"Error sending email to {recipient}: {str(e)}")
-                        error_count += 1
-                        
-            except Exception as e:
-                logger.error(f"Error processing site {site.name}: {str(e)}", exc_info=True)
-                error_count += 1
-        
-        db.commit()
-        
-        logger.info(f"Daily report generation complete: {sent_count} sent, {skipped_count} skipped, {error_count} errors")
-        
-        return {
-            "status": "success",
-            "date": str(yesterday),
-            "sent": sent_count,
-            "skipped": skipped_count,
-            "errors": error_count,
-            "total_sites": len(sites)
-        }
-        
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Error in send_daily_reports task: {str(e)}", exc_info=True)
-        raise
+        ).order_by(Site.id).all()]
     finally:
         db.close()
 
+    logger.info(f"Dispatching daily reports for {yesterday} to {len(site_ids)} sites")
+    return _dispatch_site_reports(site_ids, REPORT_DAILY, yesterday, yesterday)
 
 
 @celery_app.task(name='app.celery_tasks.send_weekly_reports')
 def send_weekly_reports():
     """
-    Scheduled task to send weekly reports for sites based on their configured day/time
-    Runs daily and checks which sites need their weekly report sent today
+    Send weekly reports to the sites whose configured weekly_report_day is
+    today (UTC), regardless of report time (manual trigger; scheduled sends
+    go through dispatch_scheduled_reports)
+
+    Enqueues one send_site_report task per site; summarize_site_reports
+    collects the sent/skipped/error counts.
     """
-    import logging
-    from datetime import datetime, timedelta, date
-    from sqlalchemy.orm import Session
-    from app.core.database import SessionLocal
-    from app.models.site import Site
-    from app.models.checklist import Checklist, ChecklistStatus
-    from app.models.defect import Defect
-    from app.models.category import Category
-    from app.core.email import email_service
-
-    logger = logging.getLogger(__name__)
     db: Session = SessionLocal()
-
     try:
         today = datetime.utcnow()
         current_weekday = today.isoweekday()  # 1=Monday, 7=Sunday
-        logger.info(f"Starting weekly report check for weekday {current_weekday}")
-
-        sent_count = 0
-        skipped_count = 0
-        error_count = 0
-
-        # Get all sites with weekly reports enabled for today's weekday
-        sites = db.query(Site).filter(
+        site_ids = [row.id for row in db.query(Site.id).filter(
             Site.is_active == True,
             Site.weekly_report_enabled == True,
             Site.weekly_report_day == current_weekday
-        ).all()
-
-        logger.info(f"Found {len(sites)} sites configured for weekly reports on weekday {current_weekday}")
-
-        # Calculate week range (last 7 days ending yesterday)
-        end_date = today.date() - timedelta(days=1)
-        start_date = end_date - timedelta(days=6)
-
-        for site in sites:
-            try:
-                if not site.report_recipients:
-                    logger.warning(f"Site {site.name} (ID: {site.id}) has no report recipients configured")
-                    skipped_count += 1
-                    continue
-
-                # Get this week's checklists for this site
-                checklists = db.query(Checklist).filter(
-                    Checklist.site_id == site.id,
-                    Checklist.checklist_date >= start_date,
-                    Checklist.checklist_date <= end_date
-                ).all()
-
-                if not checklists:
-                    logger.info(f"No checklists found for site {site.name} in week {start_date} to {end_date}")
-                    skipped_count += 1
-                    continue
-
-                # Calculate completion stats
-                total_checklists = len(checklists)
-                completed_checklists = len([c for c in checklists if c.status == ChecklistStatus.COMPLETED])
-                completion_rate = (completed_checklists / total_checklists * 100) if total_checklists > 0 else 0
-
-                # Count total items and completed items
-                total_items = sum(len(c.items) for c in checklists)
-                completed_items = sum(len([item for item in c.items if item.is_completed]) for c in checklists)
-
-                # Calculate item completion rate
-                item_completion_rate = (completed_items / total_items * 100) if total_items > 0 else 0
-
-                # Get week's defects
-                defects = db.query(Defect).filter(
-                    Defect.site_id == site.id,
-                    Defect.created_at >= datetime.combine(start_date, datetime.min.time()),
-                    Defect.created_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
-                ).all()
-
-                defects_data = [{
-                    'title': d.title,
-                    'severity': d.severity,
-                    'description': d.description
-                } for d in defects]
-
-                # Category performance
-                category_stats = []
-                categories = db.query(Category).filter(
-                    Category.organization_id == site.organization_id
-                ).all()
-
-                for category in categories:
-                    cat_checklists = [c for c in checklists if c.category_id == category.id]
-                    if cat_checklists:
-                        cat_completed = len([c for c in cat_checklists if c.status == ChecklistStatus.COMPLETED])
-                        cat_rate = (cat_completed / len(cat_checklists) * 100) if cat_checklists else 0
-                        category_stats.append({
-                            'category_name': category.name,
-                            'completion_rate': round(cat_rate, 1)
-                        })
-
-                # Build report data
-                report_data = {
-                    'completion_rate': round(completion_rate, 1),
-                    'tasks_completed': completed_checklists,
-                    'total_tasks': total_checklists,
-                    'items_completed': completed_items,
-                    'total_items': total_items,
-                    'defects': defects_data,
-                    'category_stats': category_stats,
-                    'recommendations': [],
-                    'is_daily': False
-                }
-
-                # Send email to all recipients
-                recipients = [email.strip() for email in site.report_recipients.split(',') if email.strip()]
-
-                for recipient in recipients:
-                    try:
-                        success = email_service.send_weekly_report_email(
-                            recipient_email=recipient,
-                            recipient_name=recipient.split('@')[0],
-                            organization_name=site.organization.name if site.organization else "Organization",
-                            site_name=site.name,
-                            week_start=str(start_date),
-                            week_end=str(end_date),
-                            report_data=report_data
-                        )
-
-                        if success:
-                            logger.info(f"Weekly report sent to {recipient} for site {site.name}")
-                            sent_count += 1
-                        else:
-                            logger.error(f"Failed to send weekly report to {recipient} for site {site.name}")
-                            error_count += 1
-                    except Exception as e:
-                        logger.error(f"Error sending email to {recipient}: {str(e)}")
-                        error_count += 1
-
-            except Exception as e:
-                logger.error(f"Error processing site {site.name}: {str(e)}", exc_info=True)
-                error_count += 1
-
-        db.commit()
-
-        logger.info(f"Weekly report generation complete for weekday {current_weekday}: {sent_count} sent, {skipped_count} skipped, {error_count} errors")
+        ).order_by(Site.id).all()]
+    finally:
+        db.close()
 
-        return {
-            "status": "success",
-            "weekday": current_weekday,
-            "week_range": f"{start_date} to {end_date}",
-            "sent": sent_count,
-            "skipped": skipped_count,
-            "errors": error_count,
-            "total_sites": len(sites)
-        }
+    # Calculate week range (last 7 days ending yesterday)
+    end_date = today.date() - timedelta(days=1)
+    start_date = end_date - timedelta(days=6)
+
+    logger.info(f"Dispatching weekly reports for weekday {current_weekday} to {len(site_ids)} sites")
+    return _dispatch_site_reports(site_ids, REPORT_WEEKLY, start_date, end_date)
+
+
+@celery_app.task(
+    bind=True,
+    name='app.celery_tasks.send_site_report',
+    max_retries=3,
+    acks_late=True,
+    rate_limit=settings.REPORT_TASK_RATE_LIMIT
+)
+def send_site_report(
+    self,
+    site_id: int,
+    report_type: str,
+    start_date: str,
+    end_date: str,
+    recipients: list = None,
+    sent: int = 0
+):
+    """
+    Build and send one site's daily or weekly report.
 
+    Failed deliveries are retried with exponential backoff, for the failed
+    recipients only (`sent` carries the count already delivered). Once
+    retries are exhausted the failure is returned rather than raised so the
+    summary chord still runs.
+    """
+    db: Session = SessionLocal()
+    try:
+        site = db.query(Site).options(joinedload(Site.organization)).filter(Site.id == site_id).first()
+        if not site:
+            return {"status": "skipped", "site_id": site_id, "sent": sent, "skipped": 1, "errors": 0}
+
+        if recipients is None:
+            recipients = report_recipients(site)
+        if not recipients:
+            logger.warning(f"Site {site.name} (ID: {site.id}) has no report recipients configured")
+            return {"status": "skipped", "site_id": site_id, "sent": sent, "skipped": 1, "errors": 0}
+
+        messages = build_site_report_emails(
+            db, site, report_type, date.fromisoformat(start_date), date.fromisoformat(end_date), recipients
+        )
+        if messages is None:
+            logger.info(f"No checklists found for site {site.name} from {start_date} to {end_date}")
+            return {"status": "skipped", "site_id": site_id, "sent": sent, "skipped": 1, "errors": 0}
     except Exception as e:
         db.rollback()
-        logger.error(f"Error in send_weekly_reports task: {str(e)}", exc_info=True)
-        raise
+        if self.request.retries < self.max_retries:
+            logger.warning(f"Building {report_type} report for site {site_id} failed, retrying: {str(e)}")
+            raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+        logger.error(f"Error processing site {site_id}: {str(e)}", exc_info=True)
+        return {"status": "error", "site_id": site_id, "sent": sent, "skipped": 0, "errors": 1, "error": str(e)}
     finally:
         db.close()
+
+    results = email_service.send_batch(messages)
+    sent += sum(1 for result in results if result.success)
+    failed = [result for result in results if not result.success]
+
+    if failed and self.request.retries < self.max_retries:
+        logger.warning(
+            f"{len(failed)} {report_type} report emails for site {site_id} failed, retrying: "
+            f"{', '.join(result.to_email for result in failed)}"
+        )
+        raise self.retry(
+            kwargs={"recipients": [result.to_email for result in failed], "sent": sent},
+            countdown=60 * (2 ** self.request.retries)
+        )
+
+    for result in failed:
+        logger.error(f"Failed to send {report_type} report to {result.to_email} for site {site_id}: {result.error}")
+    logger.info(f"{report_type.capitalize()} report for site {site_id}: {sent} sent, {len(failed)} failed")
+
+    return {
+        "status": "success" if not failed else "error",
+        "site_id": site_id,
+        "sent": sent,
+        "skipped": 0,
+        "errors": len(failed)
+    }
+
+
+@celery_app.task(name='app.celery_tasks.summarize_site_reports')
+def summarize_site_reports(site_results: list, report_type: str, start_date: str, end_date: str):
+    """
+    Chord callback summing the sent/skipped/error counts of every site report
+    """
+    summary = {
+        "status": "success",
+        "report_type": report_type,
+        "start_date": start_date,
+        "end_date": end_date,
+        "sent": sum(r.get("sent", 0) for r in site_results),
+        "skipped": sum(r.get("skipped", 0) for r in site_results),
+        "errors": sum(r.get("errors", 0) for r in site_results),
+        "total_sites": len(site_results),
+        "failed_sites": [r.get("site_id") for r in site_results if r.get("status") == "error"]
+    }
+
+    logger.info(
+        f"{report_type.capitalize()} report generation complete for {start_date} to {end_date}: "
+        f"{summary['sent']} sent, {summary['skipped']} skipped, {summary['errors']} errors"
+    )
+
+    return summary
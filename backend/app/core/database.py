@@ -1,26 +1,225 @@
-from sqlalchemy import create_engine
+"""
+Database engines and sessions
+
+Engines are built by create_db_engine from the DATABASE_* settings: pool
+sizing is per process (every uvicorn and Celery worker has its own pool) and
+connections are pre-pinged. DATABASE_PGBOUNCER leaves pooling to PgBouncer
+(transaction pooling): no client-side pool.
+
+PostgreSQL statement timeouts are set per transaction (SET LOCAL) from the
+session's statement_timeout_ms, so they follow the caller rather than the
+engine: API request sessions (get_db) use DATABASE_STATEMENT_TIMEOUT_MS,
+reporting reads (get_read_db) DATABASE_READ_STATEMENT_TIMEOUT_MS, and
+sessions opened directly from SessionLocal (Celery tasks, background
+writers) DATABASE_TASK_STATEMENT_TIMEOUT_MS.
+
+When DATABASE_READ_REPLICA_URL is set, reporting and dashboard reads go to a
+separate replica engine through get_read_db / ReadSessionLocal.
+
+Pool checkout waits and statements per request are recorded in db_metrics.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Depends
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 from .config import settings
 
+TIMEOUT_INFO_KEY = "statement_timeout_ms"
+
+
+class DatabaseMetrics:
+    """Process-wide pool checkout wait and per-request statement counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.slow_checkouts = 0  # Waited longer than 100ms
+        self.requests = 0
+        self.statements_total = 0
+        self.statements_max = 0
+
+    def record_checkout(self, wait: Optional[float]) -> None:
+        with self._lock:
+            self.checkouts += 1
+            if wait is None:
+                return
+            self.checkout_wait_total += wait
+            self.checkout_wait_max = max(self.checkout_wait_max, wait)
+            if wait > 0.1:
+                self.slow_checkouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_request(self, statements: int) -> None:
+        with self._lock:
+            self.requests += 1
+            self.statements_total += statements
+            self.statements_max = max(self.statements_max, statements)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "checkout_wait_avg_ms": round(self.checkout_wait_total / self.checkouts * 1000, 2) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 2),
+                "slow_checkouts": self.slow_checkouts,
+                "requests": self.requests,
+                "statements_per_request_avg": round(self.statements_total / self.requests, 2) if self.requests else 0.0,
+                "statements_per_request_max": self.statements_max,
+            }
+
+
+db_metrics = DatabaseMetrics()
+
+# Statement counter of the current request (a one-item list, shared with threadpool copies of the context)
+_request_statements: ContextVar[Optional[list]] = ContextVar("request_statements", default=None)
+
+# When the current session started needing a connection (see _mark_checkout_start)
+_checkout_started: ContextVar[Optional[float]] = ContextVar("checkout_started", default=None)
+
+
+def start_request_metrics() -> list:
+    """Start counting the statements of the current request."""
+    counter = [0]
+    _request_statements.set(counter)
+    return counter
+
+
+def create_db_engine(url: str) -> Engine:
+    """Create an engine for the given URL from the DATABASE_* settings."""
+    options = {
+        "echo": settings.DATABASE_ECHO,
+        "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    }
+
+    if "sqlite" in url:
+        options["connect_args"] = {"check_same_thread": False}
+    elif settings.DATABASE_PGBOUNCER:
+        # PgBouncer pools the server connections; keep none open client-side
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        )
+
+    new_engine = create_engine(url, **options)
+
+    @event.listens_for(new_engine, "checkout")
+    def record_checkout(dbapi_connection, connection_record, connection_proxy):
+        started = _checkout_started.get()
+        _checkout_started.set(None)
+        db_metrics.record_checkout(time.perf_counter() - started if started is not None else None)
+
+    @event.listens_for(new_engine, "connect")
+    def record_connect(dbapi_connection, connection_record):
+        db_metrics.record_connect()
+
+    @event.listens_for(new_engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        counter = _request_statements.get()
+        if counter is not None:
+            counter[0] += 1
+
+    return new_engine
+
+
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=True  # Set to False in production
+engine = create_db_engine(settings.DATABASE_URL)
+
+# Read replica for reporting and dashboards (the primary if not configured)
+read_engine = (
+    create_db_engine(settings.DATABASE_READ_REPLICA_URL)
+    if settings.DATABASE_READ_REPLICA_URL else engine
+)
+
+# Create session factories
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine,
+    info={TIMEOUT_INFO_KEY: settings.DATABASE_TASK_STATEMENT_TIMEOUT_MS}
 )
+ReadSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=read_engine,
+    info={TIMEOUT_INFO_KEY: settings.DATABASE_READ_STATEMENT_TIMEOUT_MS}
+)
+
+
+def _apply_statement_timeout(connection, timeout_ms) -> None:
+    if timeout_ms is not None and connection.dialect.name == "postgresql":
+        # SET LOCAL only lasts for the transaction, so it is safe behind PgBouncer
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+
+
+def set_statement_timeout(session: Session, timeout_ms: int) -> None:
+    """Change a session's statement timeout (0 disables), including its open transaction."""
+    session.info[TIMEOUT_INFO_KEY] = timeout_ms
+    if session.in_transaction():
+        _apply_statement_timeout(session.connection(), timeout_ms)
+
+
+def _set_statement_timeout(session, transaction, connection):
+    _checkout_started.set(None)
+    timeout_ms = session.info.get(TIMEOUT_INFO_KEY)
+    if timeout_ms:
+        _apply_statement_timeout(connection, timeout_ms)
+
+
+def _mark_checkout_start(*args):
+    """Checkout wait is measured from the statement or flush that needs the connection."""
+    _checkout_started.set(time.perf_counter())
+
+
+for _factory in (SessionLocal, ReadSessionLocal):
+    event.listen(_factory, "after_begin", _set_statement_timeout)
+    event.listen(_factory, "do_orm_execute", _mark_checkout_start)
+    event.listen(_factory, "before_flush", _mark_checkout_start)
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create base class for models
 Base = declarative_base()
 
 
+def pool_status() -> dict:
+    """Current pool state of the engines."""
+    status = {"primary": engine.pool.status()}
+    if read_engine is not engine:
+        status["read_replica"] = read_engine.pool.status()
+    return status
+
+
 # Dependency to get database session
 def get_db():
-    db = SessionLocal()
+    db = SessionLocal(info={TIMEOUT_INFO_KEY: settings.DATABASE_STATEMENT_TIMEOUT_MS})
     try:
         yield db
     finally:
         db.close()
+
+
+# Dependency to get a read-only session for reporting and dashboards
+def get_read_db(db: Session = Depends(get_db)):
+    if read_engine is engine:
+        # No replica: share the request's primary session, with the reporting timeout
+        set_statement_timeout(db, settings.DATABASE_READ_STATEMENT_TIMEOUT_MS)
+        yield db
+        return
+    read_db = ReadSessionLocal()
+    try:
+        yield read_db
+    finally:
+        read_db.close()
@@ -5,17 +5,25 @@ from typing import Optional
 from app.core.database import get_db
 from app.core.security import decode_access_token
 from app.models.user import User, UserRole
+from app.services.principal_cache import Principal, principal_cache
 
 security = HTTPBearer()
 
 
-def get_current_user(
+def get_current_principal(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token."""
-    token = credentials.credentials
+) -> Principal:
+    """Get the cached principal of the authenticated user from the JWT token."""
+    return get_principal_for_token(credentials.credentials, db)
+
+
+def get_principal_for_token(token: str, db: Session) -> Principal:
+    """
+    Validate an access token and return its user's principal.
 
+    For endpoints that cannot send an Authorization header (e.g. EventSource).
+    """
     # Decode token
     payload = decode_access_token(token)
     if payload is None:
@@ -25,7 +33,7 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Get user from database
+    # Get user from the principal cache (database on a miss)
     user_id: Optional[int] = payload.get("user_id")
     if user_id is None:
         raise HTTPException(
@@ -34,21 +42,37 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
+    principal = principal_cache.get(db, user_id)
+    if principal is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not user.is_active:
+    # Tokens issued before the user's token version was bumped are revoked
+    if payload.get("tv", 0) != (principal.token_version or 0):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if not principal.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user"
         )
 
-    return user
+    return principal
+
+
+def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get current authenticated user, attached to the request's session without a query."""
+    return principal.attach_user(db)
 
 
 def get_current_super_admin(
@@ -1,14 +1,30 @@
 """
 Email Service with SMTP and SendGrid Support
 Handles email sending with HTML templates
+
+Templates are compiled once per process by a shared Jinja2 environment
+(with an on-disk bytecode cache; templates are only re-checked for changes
+in development). Report emails are rendered once per site and personalised
+per recipient by substituting the recipient name.
+
+Messages go through a pooled transport: SMTP connections are logged in once
+and reused for many messages (kept for SMTP_POOL_IDLE_TIMEOUT seconds), and
+a single SendGrid client is shared. send_batch() delivers a list of messages
+over the pool in parallel and reports a result per message.
 """
+import queue
 import smtplib
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-from jinja2 import Template
+from typing import List, Optional, Dict, Any, Tuple
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, TemplateNotFound
 from sendgrid import SendGridAPIClient
 from sendgrid.helpers.mail import Mail, Email, To, Content
 
@@ -16,6 +32,125 @@ from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Rendered in place of the recipient name, then replaced per recipient
+RECIPIENT_NAME_PLACEHOLDER = "__recipient_name__"
+
+# Idle connections older than this are checked with NOOP before reuse
+SMTP_NOOP_AFTER = 10  # seconds
+
+
+@dataclass
+class OutgoingEmail:
+    """A rendered email ready to send."""
+    to_email: str
+    subject: str
+    html_content: str
+    to_name: Optional[str] = None
+
+
+@dataclass
+class EmailResult:
+    """Delivery outcome of one message in a batch."""
+    to_email: str
+    success: bool
+    error: Optional[str] = None
+
+
+class _PooledConnection:
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.server.quit()
+        except Exception:
+            pass
+
+
+class SMTPConnectionPool:
+    """Bounded pool of logged-in SMTP connections shared by all senders in a process."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        use_tls: bool,
+        use_ssl: bool,
+        size: int,
+        idle_timeout: int,
+        max_messages: int
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.use_ssl = use_ssl
+        self.size = max(size, 1)
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self._idle: "queue.LifoQueue[_PooledConnection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+
+    def _connect(self) -> _PooledConnection:
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=30)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=30)
+            if self.use_tls:
+                server.starttls()
+        server.login(self.user, self.password)
+        return _PooledConnection(server)
+
+    def _checkout(self) -> _PooledConnection:
+        """Reuse a healthy idle connection, or open a new one."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+
+            idle_for = time.monotonic() - conn.last_used
+            if idle_for > self.idle_timeout or conn.sent >= self.max_messages:
+                conn.close()
+                continue
+            if idle_for > SMTP_NOOP_AFTER:
+                try:
+                    if conn.server.noop()[0] != 250:
+                        raise smtplib.SMTPServerDisconnected("NOOP failed")
+                except Exception:
+                    conn.close()
+                    continue
+            return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; it is returned to the pool unless an error occurred."""
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn
+            conn.last_used = time.monotonic()
+            self._idle.put(conn)
+        except Exception:
+            if conn is not None:
+                conn.close()
+            raise
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
 
 class EmailService:
     """Email service supporting SMTP and SendGrid"""
@@ -30,20 +165,173 @@ class EmailService:
         self.from_email = settings.FROM_EMAIL
         self.from_name = settings.FROM_NAME
         self.templates_dir = Path(settings.EMAIL_TEMPLATES_DIR)
-
-    def _load_template(self, template_name: str) -> str:
-        """Load HTML email template from file"""
-        template_path = self.templates_dir / f"{template_name}.html"
-        if not template_path.exists():
+        self._smtp_pool: Optional[SMTPConnectionPool] = None
+        self._sendgrid_client: Optional[SendGridAPIClient] = None
+        self._lock = threading.Lock()
+        self._jinja_env: Optional[Environment] = None
+
+    def _get_jinja_env(self) -> Environment:
+        """Shared template environment; compiled templates are cached per process."""
+        with self._lock:
+            if self._jinja_env is None:
+                cache_dir = settings.EMAIL_TEMPLATE_CACHE_DIR
+                if cache_dir:
+                    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+                self._jinja_env = Environment(
+                    loader=FileSystemLoader(str(self.templates_dir), encoding='utf-8'),
+                    bytecode_cache=FileSystemBytecodeCache(cache_dir) if cache_dir else FileSystemBytecodeCache(),
+                    auto_reload=settings.ENVIRONMENT == "development",
+                    cache_size=100
+                )
+            return self._jinja_env
+
+    def _render_template(self, template_name: str, context: Dict[str, Any]) -> str:
+        """Render a Jinja2 template from the templates directory with context"""
+        try:
+            template = self._get_jinja_env().get_template(f"{template_name}.html")
+        except TemplateNotFound:
             raise FileNotFoundError(f"Email template not found: {template_name}")
+        return template.render(**context)
 
-        with open(template_path, 'r', encoding='utf-8') as f:
-            return f.read()
+    # ========== Transport ==========
+
+    def _get_smtp_pool(self) -> SMTPConnectionPool:
+        with self._lock:
+            if self._smtp_pool is None:
+                self._smtp_pool = SMTPConnectionPool(
+                    host=self.smtp_host,
+                    port=self.smtp_port,
+                    user=self.smtp_user,
+                    password=self.smtp_password,
+                    use_tls=self.smtp_tls,
+                    use_ssl=self.smtp_ssl,
+                    size=settings.SMTP_POOL_SIZE,
+                    idle_timeout=settings.SMTP_POOL_IDLE_TIMEOUT,
+                    max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+                )
+            return self._smtp_pool
+
+    def _get_sendgrid_client(self, api_key: str) -> SendGridAPIClient:
+        with self._lock:
+            if self._sendgrid_client is None or self._sendgrid_client.api_key != api_key:
+                self._sendgrid_client = SendGridAPIClient(api_key)
+            return self._sendgrid_client
+
+    def _build_mime(self, message: OutgoingEmail) -> MIMEMultipart:
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = message.subject
+        msg['From'] = f"{self.from_name} <{self.from_email}>"
+        msg['To'] = f"{message.to_name} <{message.to_email}>" if message.to_name else message.to_email
+
+        # Attach HTML content
+        msg.attach(MIMEText(message.html_content, 'html'))
+        return msg
+
+    def _smtp_worker(self, batch: List[Tuple[int, OutgoingEmail]]) -> List[Tuple[int, EmailResult]]:
+        """Send a share of a batch over pooled connections, one message after another."""
+        results = []
+        pending = list(batch)
+        retried = set()
+        pool = self._get_smtp_pool()
+
+        while pending:
+            connected = False
+            try:
+                with pool.connection() as conn:
+                    connected = True
+                    while pending:
+                        index, message = pending[0]
+                        try:
+                            conn.server.send_message(self._build_mime(message))
+                        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                            # Rejected message; the connection is still usable
+                            logger.error(f"Failed to send email to {message.to_email}: {str(e)}")
+                            results.append((index, EmailResult(message.to_email, False, str(e))))
+                        else:
+                            logger.info(f"Email sent successfully to {message.to_email}")
+                            results.append((index, EmailResult(message.to_email, True)))
+                        pending.pop(0)
+                        conn.sent += 1
+            except Exception as e:
+                if not connected:
+                    # Could not connect or log in: fail the rest of this share
+                    for index, message in pending:
+                        logger.error(f"Failed to send email to {message.to_email}: {str(e)}")
+                        results.append((index, EmailResult(message.to_email, False, str(e))))
+                    return results
+                index, message = pending[0]
+                if index in retried:
+                    logger.error(f"Failed to send email to {message.to_email}: {str(e)}")
+                    results.append((index, EmailResult(message.to_email, False, str(e))))
+                    pending.pop(0)
+                else:
+                    # Connection dropped mid-batch: retry this message on a fresh connection
+                    retried.add(index)
+
+        return results
+
+    def _send_batch_smtp(self, messages: List[OutgoingEmail]) -> List[EmailResult]:
+        if not self.smtp_host or not self.smtp_user or not self.smtp_password:
+            logger.warning("SMTP credentials not configured. Email not sent.")
+            return [EmailResult(m.to_email, False, "SMTP not configured") for m in messages]
 
-    def _render_template(self, template_content: str, context: Dict[str, Any]) -> str:
-        """Render Jinja2 template with context"""
-        template = Template(template_content)
-        return template.render(**context)
+        indexed = list(enumerate(messages))
+        workers = min(settings.SMTP_POOL_SIZE, len(indexed)) or 1
+        shares = [indexed[i::workers] for i in range(workers)]
+
+        results: List[Optional[EmailResult]] = [None] * len(messages)
+        if workers == 1:
+            outcomes = [self._smtp_worker(shares[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                outcomes = list(executor.map(self._smtp_worker, shares))
+        for outcome in outcomes:
+            for index, result in outcome:
+                results[index] = result
+        return results
+
+    def _send_one_sendgrid(self, client: SendGridAPIClient, message: OutgoingEmail) -> EmailResult:
+        try:
+            mail = Mail(
+                from_email=Email(self.from_email, self.from_name),
+                to_emails=To(message.to_email, message.to_name),
+                subject=message.subject,
+                html_content=Content("text/html", message.html_content)
+            )
+            response = client.send(mail)
+
+            logger.info(f"Email sent successfully via SendGrid to {message.to_email} (status: {response.status_code})")
+            return EmailResult(message.to_email, True)
+
+        except Exception as e:
+            logger.error(f"Failed to send email via SendGrid to {message.to_email}: {str(e)}")
+            return EmailResult(message.to_email, False, str(e))
+
+    def _send_batch_sendgrid(self, messages: List[OutgoingEmail]) -> List[EmailResult]:
+        sendgrid_api_key = getattr(settings, 'SENDGRID_API_KEY', None)
+
+        if not sendgrid_api_key:
+            logger.warning("SendGrid API key not configured. Email not sent.")
+            return [EmailResult(m.to_email, False, "SendGrid not configured") for m in messages]
+
+        client = self._get_sendgrid_client(sendgrid_api_key)
+        if len(messages) == 1:
+            return [self._send_one_sendgrid(client, messages[0])]
+        with ThreadPoolExecutor(max_workers=min(settings.SENDGRID_CONCURRENCY, len(messages))) as executor:
+            return list(executor.map(lambda message: self._send_one_sendgrid(client, message), messages))
+
+    def send_batch(self, messages: List[OutgoingEmail]) -> List[EmailResult]:
+        """
+        Send many messages, reusing connections, and return one result per
+        message in the same order.
+
+        Uses SendGrid when configured, SMTP otherwise.
+        """
+        if not messages:
+            return []
+        if getattr(settings, 'SENDGRID_API_KEY', None):
+            return self._send_batch_sendgrid(messages)
+        return self._send_batch_smtp(messages)
 
     def send_email_smtp(
         self,
@@ -53,40 +341,7 @@ class EmailService:
         to_name: Optional[str] = None
     ) -> bool:
         """Send email using SMTP"""
-        if not self.smtp_host or not self.smtp_user or not self.smtp_password:
-            logger.warning("SMTP credentials not configured. Email not sent.")
-            return False
-
-        try:
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{self.from_name} <{self.from_email}>"
-            msg['To'] = f"{to_name} <{to_email}>" if to_name else to_email
-
-            # Attach HTML content
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
-
-            # Connect to SMTP server
-            if self.smtp_ssl:
-                server = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port)
-            else:
-                server = smtplib.SMTP(self.smtp_host, self.smtp_port)
-                if self.smtp_tls:
-                    server.starttls()
-
-            # Login and send
-            server.login(self.smtp_user, self.smtp_password)
-            server.send_message(msg)
-            server.quit()
-
-            logger.info(f"Email sent successfully to {to_email}")
-            return True
-
-        except Exception as e:
-            logger.error(f"Failed to send email to {to_email}: {str(e)}")
-            return False
+        return self._send_batch_smtp([OutgoingEmail(to_email, subject, html_content, to_name)])[0].success
 
     def send_email_sendgrid(
         self,
@@ -96,35 +351,47 @@ class EmailService:
         to_name: Optional[str] = None
     ) -> bool:
         """Send email using SendGrid API"""
-        sendgrid_api_key = getattr(settings, 'SENDGRID_API_KEY', None)
+        return self._send_batch_sendgrid([OutgoingEmail(to_email, subject, html_content, to_name)])[0].success
 
-        if not sendgrid_api_key:
-            logger.warning("SendGrid API key not configured. Email not sent.")
-            return False
-
-        try:
-            # Create SendGrid message
-            from_email_obj = Email(self.from_email, self.from_name)
-            to_email_obj = To(to_email, to_name)
-            content = Content("text/html", html_content)
+    def build_template_email(
+        self,
+        to_email: str,
+        subject: str,
+        template_name: str,
+        context: Dict[str, Any],
+        to_name: Optional[str] = None
+    ) -> OutgoingEmail:
+        """Render an HTML template into a message for send_batch"""
+        html_content = self._render_template(template_name, context)
+        return OutgoingEmail(to_email, subject, html_content, to_name)
 
-            mail = Mail(
-                from_email=from_email_obj,
-                to_emails=to_email_obj,
-                subject=subject,
-                html_content=content
+    def build_template_emails(
+        self,
+        recipients: List[Tuple[str, str]],
+        subject: str,
+        template_name: str,
+        context: Dict[str, Any]
+    ) -> List[OutgoingEmail]:
+        """
+        Render a template once for several (email, name) recipients.
+
+        The only per-recipient difference is recipient_name, which is
+        substituted into the rendered HTML.
+        """
+        if not recipients:
+            return []
+        html_content = self._render_template(
+            template_name, {**context, 'recipient_name': RECIPIENT_NAME_PLACEHOLDER}
+        )
+        return [
+            OutgoingEmail(
+                to_email,
+                subject,
+                html_content.replace(RECIPIENT_NAME_PLACEHOLDER, to_name or ''),
+                to_name
             )
-
-            # Send email via SendGrid
-            sg = SendGridAPIClient(sendgrid_api_key)
-            response = sg.send(mail)
-
-            logger.info(f"Email sent successfully via SendGrid to {to_email} (status: {response.status_code})")
-            return True
-
-        except Exception as e:
-            logger.error(f"Failed to send email via SendGrid to {to_email}: {str(e)}")
-            return False
+            for to_email, to_name in recipients
+        ]
 
     def send_template_email(
         self,
@@ -136,16 +403,10 @@ class EmailService:
     ) -> bool:
         """Send email using HTML template"""
         try:
-            # Load and render template
-            template_content = self._load_template(template_name)
-            html_content = self._render_template(template_content, context)
+            message = self.build_template_email(to_email, subject, template_name, context, to_name)
 
             # Try SendGrid first, fall back to SMTP if not configured
-            sendgrid_api_key = getattr(settings, 'SENDGRID_API_KEY', None)
-            if sendgrid_api_key:
-                return self.send_email_sendgrid(to_email, subject, html_content, to_name)
-            else:
-                return self.send_email_smtp(to_email, subject, html_content, to_name)
+            return self.send_batch([message])[0].success
 
         except Exception as e:
             logger.error(f"Failed to send template email: {str(e)}")
@@ -283,16 +544,15 @@ class EmailService:
             to_name=recipient_name
         )
 
-    def send_daily_report_email(
+    def build_daily_report_emails(
         self,
-        recipient_email: str,
-        recipient_name: str,
+        recipients: List[Tuple[str, str]],
         organization_name: str,
         site_name: str,
         report_date: str,
         report_data: Dict[str, Any]
-    ) -> bool:
-        """Send daily performance report email with site name"""
+    ) -> List[OutgoingEmail]:
+        """Render the daily performance report with site name once for all (email, name) recipients"""
         from datetime import datetime
 
         # Format the date nicely
@@ -303,7 +563,6 @@ class EmailService:
         subject = f"Daily Report: {site_name} - {formatted_date}"
 
         context = {
-            'recipient_name': recipient_name,
             'organization_name': organization_name,
             'site_name': site_name,
             'report_date': report_date,
@@ -312,25 +571,45 @@ class EmailService:
             **report_data
         }
 
-        return self.send_template_email(
-            to_email=recipient_email,
+        return self.build_template_emails(
+            recipients=recipients,
             subject=subject,
             template_name='daily_report',
-            context=context,
-            to_name=recipient_name
+            context=context
         )
 
-    def send_weekly_report_email(
+    def build_daily_report_email(
         self,
         recipient_email: str,
         recipient_name: str,
         organization_name: str,
         site_name: str,
+        report_date: str,
+        report_data: Dict[str, Any]
+    ) -> OutgoingEmail:
+        """Render the daily performance report email with site name"""
+        return self.build_daily_report_emails(
+            [(recipient_email, recipient_name)], organization_name, site_name, report_date, report_data
+        )[0]
+
+    def send_daily_report_email(self, *args, **kwargs) -> bool:
+        """Send daily performance report email with site name"""
+        try:
+            return self.send_batch([self.build_daily_report_email(*args, **kwargs)])[0].success
+        except Exception as e:
+            logger.error(f"Failed to send template email: {str(e)}")
+            return False
+
+    def build_weekly_report_emails(
+        self,
+        recipients: List[Tuple[str, str]],
+        organization_name: str,
+        site_name: str,
         week_start: str,
         week_end: str,
         report_data: Dict[str, Any]
-    ) -> bool:
-        """Send weekly performance report email with site name"""
+    ) -> List[OutgoingEmail]:
+        """Render the weekly performance report with site name once for all (email, name) recipients"""
         from datetime import datetime
 
         # Format dates
@@ -340,7 +619,6 @@ class EmailService:
         subject = f"Weekly Report: {site_name} - {formatted_range}"
 
         context = {
-            'recipient_name': recipient_name,
             'organization_name': organization_name,
             'site_name': site_name,
             'week_start': week_start,
@@ -350,14 +628,36 @@ class EmailService:
             **report_data
         }
 
-        return self.send_template_email(
-            to_email=recipient_email,
+        return self.build_template_emails(
+            recipients=recipients,
             subject=subject,
             template_name='daily_report',
-            context=context,
-            to_name=recipient_name
+            context=context
         )
 
+    def build_weekly_report_email(
+        self,
+        recipient_email: str,
+        recipient_name: str,
+        organization_name: str,
+        site_name: str,
+        week_start: str,
+        week_end: str,
+        report_data: Dict[str, Any]
+    ) -> OutgoingEmail:
+        """Render the weekly performance report email with site name"""
+        return self.build_weekly_report_emails(
+            [(recipient_email, recipient_name)], organization_name, site_name, week_start, week_end, report_data
+        )[0]
+
+    def send_weekly_report_email(self, *args, **kwargs) -> bool:
+        """Send weekly performance report email with site name"""
+        try:
+            return self.send_batch([self.build_weekly_report_email(*args, **kwargs)])[0].success
+        except Exception as e:
+            logger.error(f"Failed to send template email: {str(e)}")
+            return False
+
     def send_defect_report_email(
         self,
         recipient_email: str,
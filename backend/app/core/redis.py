@@ -0,0 +1,30 @@
+"""
+Shared Redis client
+
+Redis is already deployed as the Celery broker; the API and workers also use
+it for small shared state (snapshots, caches, pub/sub). Callers must treat
+Redis as optional and fall back to the database when it is unavailable.
+"""
+import logging
+from typing import Optional
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Return the process-wide Redis client (connections are pooled and opened lazily)."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.REDIS_URL or settings.CELERY_BROKER_URL,
+            socket_timeout=2,
+            socket_connect_timeout=2,
+            decode_responses=True
+        )
+    return _client
@@ -2,7 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import engine, Base, db_metrics, start_request_metrics
 import os
 from pathlib import Path
 
@@ -31,6 +31,17 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def count_db_statements(request, call_next):
+    """Record the number of SQL statements each request ran."""
+    counter = start_request_metrics()
+    response = await call_next(request)
+    db_metrics.record_request(counter[0])
+    response.headers["X-DB-Statements"] = str(counter[0])
+    return response
+
+
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
@@ -52,6 +63,20 @@ async def root():
     }
 
 
+@app.on_event("shutdown")
+def flush_activity_logs():
+    """Write queued activity log entries before the worker exits."""
+    from app.services.activity_log_writer import activity_log_writer
+    activity_log_writer.close()
+
+
+@app.on_event("shutdown")
+def flush_progress_heartbeats():
+    """Write buffered course progress heartbeats before the worker exits."""
+    from app.services.progress_heartbeat_buffer import progress_heartbeat_buffer
+    progress_heartbeat_buffer.close()
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
@@ -36,6 +36,8 @@ from app.models.subscription_package import SubscriptionPackage
 from app.models.package_module import PackageModule
 from app.models.organization_module_addon import OrganizationModuleAddon
 from app.models.blog_post import BlogPost
+from app.models.site_daily_stats import SiteDailyStats
+from app.models.report_job import ReportJob, ReportJobStatus
 
 __all__ = [
     "User",
@@ -78,4 +80,7 @@ __all__ = [
     "PackageModule",
     "OrganizationModuleAddon",
     "BlogPost",
+    "SiteDailyStats",
+    "ReportJob",
+    "ReportJobStatus",
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Date, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Date, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -16,6 +16,10 @@ class ChecklistStatus(str, enum.Enum):
 class Checklist(Base):
     """Checklist model - represents a specific instance of a category for a date."""
     __tablename__ = "checklists"
+    __table_args__ = (
+        # Backs the per-site listing (filtered by status, ordered by date) and keyset pagination
+        Index("ix_checklists_site_date_status", "site_id", "checklist_date", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     checklist_date = Column(Date, nullable=False)  # The date this checklist is for
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, String, DateTime, Date, ForeignKey, Text, Enum as SQLEnum, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+
+class ReportJobStatus(str, enum.Enum):
+    """Report job status enumeration."""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ReportJob(Base):
+    """
+    ReportJob model - a checklist PDF report rendered in the background.
+
+    fingerprint identifies the content of the requested days, so a repeat
+    request for unchanged data reuses the existing job and its file.
+    """
+    __tablename__ = "report_jobs"
+    __table_args__ = (
+        Index("ix_report_jobs_site_range_fingerprint", "site_id", "start_date", "end_date", "fingerprint"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(SQLEnum(ReportJobStatus), nullable=False, default=ReportJobStatus.PENDING)
+
+    # Request
+    site_id = Column(Integer, ForeignKey("sites.id", ondelete="CASCADE"), nullable=False)
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    requested_by_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    fingerprint = Column(String(64), nullable=False)
+
+    # Result
+    file_path = Column(Text, nullable=True)  # Absolute path of the stored PDF/ZIP
+    filename = Column(String, nullable=True)  # Download filename
+    content_type = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<ReportJob {self.id} site={self.site_id} {self.start_date}..{self.end_date} ({self.status})>"
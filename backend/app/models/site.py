@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -7,6 +7,14 @@ from app.core.database import Base
 class Site(Base):
     """Site model - represents a physical location within an organization."""
     __tablename__ = "sites"
+    __table_args__ = (
+        # Used by the report scheduler tick to find sites due in the current window
+        Index("ix_sites_daily_report_schedule", "daily_report_enabled", "timezone", "daily_report_time"),
+        Index(
+            "ix_sites_weekly_report_schedule",
+            "weekly_report_enabled", "timezone", "weekly_report_day", "weekly_report_time"
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
@@ -18,13 +26,14 @@ class Site(Base):
     city = Column(String, nullable=True)
     postcode = Column(String, nullable=True)
     country = Column(String, default="UK")
+    timezone = Column(String, nullable=False, default="Europe/London", server_default="Europe/London")  # IANA name
 
     # Foreign Keys
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
 
     # Email Reporting Configuration
     daily_report_enabled = Column(Boolean, default=False)
-    daily_report_time = Column(String, default="09:00")  # Time in HH:MM format
+    daily_report_time = Column(String, default="09:00")  # Site-local time in HH:MM format
     weekly_report_enabled = Column(Boolean, default=False)
     weekly_report_day = Column(Integer, default=1)  # 1=Monday, 7=Sunday
     weekly_report_time = Column(String, default="09:00")
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, UniqueConstraint, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class SiteDailyStats(Base):
+    """
+    SiteDailyStats model - pre-aggregated completion rollup per site, category and date.
+
+    Rows are derived data: they are recomputed per (site, date) slice whenever
+    checklists, items or defects for that slice change, and can be rebuilt for
+    any date range by the rebuild_site_daily_stats Celery task.
+
+    category_id is NULL for the row holding defects that are not linked to a
+    checklist item.
+    """
+    __tablename__ = "site_daily_stats"
+    __table_args__ = (
+        UniqueConstraint("site_id", "category_id", "stats_date", name="uq_site_daily_stats_site_category_date"),
+        Index("ix_site_daily_stats_site_date", "site_id", "stats_date"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    stats_date = Column(Date, nullable=False)
+
+    # Foreign Keys
+    site_id = Column(Integer, ForeignKey("sites.id", ondelete="CASCADE"), nullable=False)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), nullable=True)
+
+    # Counts
+    checklist_count = Column(Integer, nullable=False, default=0)
+    completed_checklist_count = Column(Integer, nullable=False, default=0)
+    item_count = Column(Integer, nullable=False, default=0)
+    completed_item_count = Column(Integer, nullable=False, default=0)
+    defect_count = Column(Integer, nullable=False, default=0)
+
+    # Timestamps
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<SiteDailyStats site={self.site_id} category={self.category_id} {self.stats_date}>"
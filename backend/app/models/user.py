@@ -65,6 +65,7 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     must_change_password = Column(Boolean, default=False)
     phone = Column(String, nullable=True)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # Bump to revoke issued tokens
 
     # Department and Job Title
     department = Column(SQLEnum(Department, name='department', native_enum=True, create_constraint=False), nullable=True)
@@ -96,6 +97,10 @@ class User(Base):
     @property
     def site_ids(self):
         """Get list of site IDs assigned to this user."""
+        # Set from the cached principal for the authenticated user
+        cached_site_ids = self.__dict__.get("_cached_site_ids")
+        if cached_site_ids is not None:
+            return list(cached_site_ids)
         return [us.site_id for us in self.user_sites]
 
     @property
@@ -44,8 +44,8 @@ class CategoryInfo(BaseModel):
     """Category information for checklist response."""
     id: int
     name: str
-    opens_at: Optional[str] = None
-    closes_at: Optional[str] = None
+    opens_at: Optional[time] = None
+    closes_at: Optional[time] = None
 
     model_config = {"from_attributes": True}
 
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+from datetime import datetime
 
 
 class SuperAdminDashboard(BaseModel):
@@ -24,6 +25,7 @@ class SuperAdminDashboard(BaseModel):
     bottom_sites: List[Dict[str, Any]] = []
     alerts: List[Dict[str, Any]] = []
     checklists_today: int = 0
+    generated_at: Optional[datetime] = None  # When the served snapshot was computed
 
 
 class RecentActivityResponse(BaseModel):
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -38,3 +38,21 @@ class ModuleProgressResponse(ModuleProgressBase):
 class CompleteModuleRequest(BaseModel):
     """Request to mark a module as complete."""
     time_spent_seconds: int = 0
+
+
+class ProgressHeartbeat(BaseModel):
+    """Playback position reported periodically by the course player."""
+    enrollment_id: int
+    module_id: int
+    last_position_seconds: int = Field(ge=0)
+    time_spent_seconds: int = Field(ge=0)
+
+
+class ProgressHeartbeatBatch(BaseModel):
+    """One or more heartbeats (e.g. queued while offline)."""
+    heartbeats: List[ProgressHeartbeat] = Field(min_length=1, max_length=100)
+
+
+class ProgressHeartbeatResponse(BaseModel):
+    """Number of heartbeats accepted into the write buffer."""
+    accepted: int
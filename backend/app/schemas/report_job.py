@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime, date
+from app.models.report_job import ReportJobStatus
+
+
+class ReportJobCreate(BaseModel):
+    """Request a checklist PDF report for a site and date range."""
+    site_id: int
+    start_date: date
+    end_date: date
+
+
+class ReportJobResponse(BaseModel):
+    """Report job status schema."""
+    id: int
+    status: ReportJobStatus
+    site_id: int
+    start_date: date
+    end_date: date
+    filename: Optional[str] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    download_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
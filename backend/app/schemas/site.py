@@ -1,6 +1,19 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, time
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+def normalize_report_time(value: str) -> str:
+    """Parse a report time ("9:00", "09:00" or "09:00:00") into the stored HH:MM form."""
+    parts = value.strip().split(":")
+    if len(parts) not in (2, 3) or not all(part.isdigit() for part in parts):
+        raise ValueError(f"Invalid report time: {value!r} (expected HH:MM)")
+    try:
+        report_time = time(*(int(part) for part in parts))
+    except ValueError:
+        raise ValueError(f"Invalid report time: {value!r} (expected HH:MM)")
+    return report_time.strftime("%H:%M")
 
 
 class SiteBase(BaseModel):
@@ -33,8 +46,29 @@ class SiteUpdate(BaseModel):
     weekly_report_enabled: Optional[bool] = None
     weekly_report_day: Optional[int] = None
     weekly_report_time: Optional[str] = None
+    timezone: Optional[str] = None
     report_recipients: Optional[str] = None
 
+    @field_validator('timezone')
+    @classmethod
+    def validate_timezone(cls, timezone):
+        """Report times are in the site's timezone, so it must be a valid IANA name."""
+        if timezone is None:
+            return timezone
+        try:
+            ZoneInfo(timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown timezone: {timezone}")
+        return timezone
+
+    @field_validator('daily_report_time', 'weekly_report_time')
+    @classmethod
+    def validate_report_time(cls, report_time):
+        """The scheduler matches report times as exact HH:MM strings."""
+        if report_time is None:
+            return report_time
+        return normalize_report_time(report_time)
+
 
 class SiteResponse(SiteBase):
     """Site response schema."""
@@ -47,6 +81,7 @@ class SiteResponse(SiteBase):
     weekly_report_enabled: bool
     weekly_report_day: int
     weekly_report_time: str
+    timezone: str = "Europe/London"
     report_recipients: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -91,3 +91,8 @@ class TaskFieldResponseSubmission(BaseModel):
     """Submit multiple field responses at once."""
     checklist_item_id: int
     responses: List[TaskFieldResponseCreate]
+
+
+class TaskFieldResponseBatchSubmission(BaseModel):
+    """Submit field responses for several checklist items at once."""
+    submissions: List[TaskFieldResponseSubmission]
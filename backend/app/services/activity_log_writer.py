@@ -0,0 +1,130 @@
+"""
+Activity Log Writer
+
+Buffered writer for ActivityLog entries.
+
+Requests put log entries on an in-process queue and return without an extra
+transaction; a background thread bulk-inserts them in batches of up to
+ACTIVITY_LOG_BATCH_SIZE, at least every ACTIVITY_LOG_FLUSH_INTERVAL seconds.
+Entries are timestamped when they are logged, not when they are written.
+
+With ACTIVITY_LOG_SYNC (tests), or when the queue is full, entries are
+written immediately through the caller's session instead.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.activity_log import ActivityLog
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityLogWriter:
+    """Queues activity log rows and writes them in batches from a background thread."""
+
+    def __init__(self, batch_size: int = 100, flush_interval: float = 2.0, max_queued: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="activity-log-writer", daemon=True)
+                self._thread.start()
+
+    def write(self, db: Session, row: dict) -> None:
+        """Queue a row for the activity_logs table (written synchronously if queueing is off or full)."""
+        row.setdefault("created_at", datetime.now(timezone.utc))
+
+        if not settings.ACTIVITY_LOG_SYNC:
+            self._ensure_started()
+            try:
+                self._queue.put_nowait(row)
+                return
+            except queue.Full:
+                logger.warning("Activity log queue full, writing entry synchronously")
+
+        db.add(ActivityLog(**row))
+        db.commit()
+
+    # ========== Flushing ==========
+
+    def _drain(self, first: dict) -> List[dict]:
+        """Collect a batch, waiting up to the flush interval for it to fill."""
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 or self._stopping.is_set():
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _insert(self, rows: List[dict]) -> None:
+        db = SessionLocal()
+        try:
+            db.execute(insert(ActivityLog), rows)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to write {len(rows)} activity log entries: {str(e)}", exc_info=True)
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not (self._stopping.is_set() and self._queue.empty()):
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            self._insert(self._drain(first))
+
+    def flush(self) -> None:
+        """Write everything queued so far from the calling thread."""
+        while True:
+            rows = []
+            while len(rows) < self.batch_size:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not rows:
+                return
+            self._insert(rows)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the background thread after it has written the queued entries."""
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+        self.flush()
+
+
+# Singleton instance
+activity_log_writer = ActivityLogWriter(
+    batch_size=settings.ACTIVITY_LOG_BATCH_SIZE,
+    flush_interval=settings.ACTIVITY_LOG_FLUSH_INTERVAL,
+    max_queued=settings.ACTIVITY_LOG_QUEUE_SIZE
+)
+atexit.register(activity_log_writer.close)
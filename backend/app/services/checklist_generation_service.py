@@ -0,0 +1,279 @@
+"""
+Checklist Generation Service
+
+Set-based engine behind the nightly checklist generation task.
+
+Active sites, categories and task templates are loaded once, the missing
+(site, category, date) triples are worked out in memory against a single
+existence lookup, and checklists plus their items are written with bulk
+INSERT ... RETURNING statements in chunks. Each chunk is committed on its
+own so a failure late in the run does not throw away earlier chunks; the
+existence lookup makes a re-run pick up where a failed run stopped.
+"""
+import logging
+import time
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.category import Category, ChecklistFrequency
+from app.models.checklist import Checklist, ChecklistStatus
+from app.models.checklist_item import ChecklistItem
+from app.models.site import Site
+from app.models.task import Task
+from app.services.site_stats_service import rebuild_site_daily_stats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def get_checklist_date(frequency: ChecklistFrequency, today: date) -> Optional[date]:
+    """
+    Return the due date of the checklist a category should get today, or None
+    if no checklist is due today for that frequency.
+
+    - Daily: every day, due today
+    - Weekly: Mondays only, due the same day
+    - Monthly: 1st of the month only, due the last day of the month
+    - Other frequencies (quarterly, six_monthly, yearly) are not generated yet
+    """
+    if frequency == ChecklistFrequency.DAILY:
+        return today
+    if frequency == ChecklistFrequency.WEEKLY:
+        return today if today.weekday() == 0 else None
+    if frequency == ChecklistFrequency.MONTHLY:
+        if today.day != 1:
+            return None
+        _, last_day = monthrange(today.year, today.month)
+        return date(today.year, today.month, last_day)
+    return None
+
+
+def _chunks(rows: List, size: int) -> Iterable[List]:
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def _load_sites(db: Session, site_ids: Optional[List[int]]) -> List[Tuple[int, int]]:
+    """Return (site_id, organization_id) for every active site in scope."""
+    query = db.query(Site.id, Site.organization_id).filter(Site.is_active == True)
+    if site_ids is not None:
+        query = query.filter(Site.id.in_(site_ids))
+    return [(row.id, row.organization_id) for row in query.order_by(Site.id).all()]
+
+
+def _load_categories(db: Session, organization_ids: set) -> List:
+    """Return active global categories plus the org categories of the given orgs."""
+    query = db.query(
+        Category.id,
+        Category.frequency,
+        Category.is_global,
+        Category.organization_id
+    ).filter(Category.is_active == True)
+    if organization_ids:
+        query = query.filter(
+            (Category.is_global == True) | (Category.organization_id.in_(organization_ids))
+        )
+    else:
+        query = query.filter(Category.is_global == True)
+    return query.order_by(Category.id).all()
+
+
+def _load_task_templates(db: Session, category_ids: List[int]) -> Dict[int, List[Tuple[int, str]]]:
+    """Return active tasks as {category_id: [(task_id, task_name), ...]} in display order."""
+    templates: Dict[int, List[Tuple[int, str]]] = defaultdict(list)
+    if not category_ids:
+        return templates
+    rows = db.query(Task.id, Task.name, Task.category_id).filter(
+        Task.category_id.in_(category_ids),
+        Task.is_active == True
+    ).order_by(Task.category_id, Task.order_index, Task.id).all()
+    for row in rows:
+        templates[row.category_id].append((row.id, row.name))
+    return templates
+
+
+def _load_existing(
+    db: Session,
+    dates: set,
+    site_ids: List[int],
+    restrict_sites: bool
+) -> set:
+    """Return the (site_id, category_id, checklist_date) triples that already exist."""
+    if not dates:
+        return set()
+    query = db.query(
+        Checklist.site_id,
+        Checklist.category_id,
+        Checklist.checklist_date
+    ).filter(Checklist.checklist_date.in_(dates))
+    if restrict_sites:
+        query = query.filter(Checklist.site_id.in_(site_ids))
+    return {(row.site_id, row.category_id, row.checklist_date) for row in query.all()}
+
+
+def build_site_shards(db: Session, shard_size: int) -> List[List[int]]:
+    """
+    Split the active site ids into shards of at most shard_size sites.
+
+    Sites are ordered by organization so an organization's sites land in the
+    same shard where possible, keeping each shard's category lookup small.
+    """
+    rows = db.query(Site.id).filter(
+        Site.is_active == True
+    ).order_by(Site.organization_id, Site.id).all()
+    site_ids = [row.id for row in rows]
+    return list(_chunks(site_ids, max(shard_size, 1)))
+
+
+def generate_checklists(
+    db: Session,
+    today: Optional[date] = None,
+    site_ids: Optional[List[int]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> dict:
+    """
+    Generate the checklists due today for all active sites (or the given
+    subset of site ids) and commit them chunk by chunk.
+
+    Returns:
+        dict: {
+            "date": str,
+            "created": int,
+            "skipped": int,
+            "items_created": int,
+            "total_sites": int,
+            "chunks": [{"chunk": int, "checklists": int, "items": int, "seconds": float}, ...]
+        }
+    """
+    today = today or date.today()
+    started = time.monotonic()
+
+    sites = _load_sites(db, site_ids)
+    organization_ids = {org_id for _, org_id in sites}
+    categories = _load_categories(db, organization_ids)
+
+    # Resolve each category's due date once; frequencies we don't generate are dropped
+    generated_frequencies = (
+        ChecklistFrequency.DAILY,
+        ChecklistFrequency.WEEKLY,
+        ChecklistFrequency.MONTHLY
+    )
+    global_categories = []
+    org_categories: Dict[int, list] = defaultdict(list)
+    for category in categories:
+        if category.frequency not in generated_frequencies:
+            continue
+        entry = (category.id, get_checklist_date(category.frequency, today))
+        if category.is_global:
+            global_categories.append(entry)
+        elif category.organization_id is not None:
+            org_categories[category.organization_id].append(entry)
+
+    due_dates = {
+        checklist_date
+        for entries in [global_categories, *org_categories.values()]
+        for _, checklist_date in entries
+        if checklist_date is not None
+    }
+    existing = _load_existing(
+        db,
+        due_dates,
+        [site_id for site_id, _ in sites],
+        restrict_sites=site_ids is not None
+    )
+
+    skipped_count = 0
+    missing: List[Tuple[int, int, date]] = []
+    for site_id, organization_id in sites:
+        for category_id, checklist_date in global_categories + org_categories.get(organization_id, []):
+            # Not due today (weekly/monthly) or already generated
+            if checklist_date is None or (site_id, category_id, checklist_date) in existing:
+                skipped_count += 1
+                continue
+            missing.append((site_id, category_id, checklist_date))
+
+    templates = _load_task_templates(db, list({category_id for _, category_id, _ in missing}))
+
+    logger.info(
+        f"Checklist generation for {today}: {len(sites)} sites, "
+        f"{len(missing)} checklists to create, {skipped_count} skipped"
+    )
+
+    created_count = 0
+    items_created = 0
+    chunk_stats = []
+
+    for chunk_number, chunk in enumerate(_chunks(missing, chunk_size), start=1):
+        chunk_started = time.monotonic()
+
+        checklist_rows = [
+            {
+                "checklist_date": checklist_date,
+                "category_id": category_id,
+                "site_id": site_id,
+                "status": ChecklistStatus.PENDING,
+                "total_items": len(templates.get(category_id, [])),
+                "completed_items": 0,
+                "completion_percentage": 0,
+            }
+            for site_id, category_id, checklist_date in chunk
+        ]
+        checklist_ids = db.scalars(
+            insert(Checklist).returning(Checklist.id, sort_by_parameter_order=True),
+            checklist_rows
+        ).all()
+
+        item_rows = [
+            {
+                "checklist_id": checklist_id,
+                "task_id": task_id,
+                "item_name": task_name,
+                "is_completed": False,
+            }
+            for checklist_id, (_, category_id, _) in zip(checklist_ids, chunk)
+            for task_id, task_name in templates.get(category_id, [])
+        ]
+        if item_rows:
+            db.execute(insert(ChecklistItem), item_rows)
+
+        db.commit()
+
+        elapsed = round(time.monotonic() - chunk_started, 3)
+        created_count += len(checklist_ids)
+        items_created += len(item_rows)
+        chunk_stats.append({
+            "chunk": chunk_number,
+            "checklists": len(checklist_ids),
+            "items": len(item_rows),
+            "seconds": elapsed,
+        })
+        logger.info(
+            f"Checklist generation chunk {chunk_number}: {len(checklist_ids)} checklists, "
+            f"{len(item_rows)} items in {elapsed}s"
+        )
+
+    # Bring the site_daily_stats rollup up to date for the generated days
+    if created_count:
+        for checklist_date in sorted({checklist_date for _, _, checklist_date in missing}):
+            rebuild_site_daily_stats(db, checklist_date, checklist_date, site_ids)
+        db.commit()
+
+    logger.info(
+        f"Checklist generation for {today} complete: {created_count} created, {skipped_count} skipped, "
+        f"{items_created} items in {round(time.monotonic() - started, 3)}s"
+    )
+
+    return {
+        "date": str(today),
+        "created": created_count,
+        "skipped": skipped_count,
+        "items_created": items_created,
+        "total_sites": len(sites),
+        "chunks": chunk_stats,
+    }
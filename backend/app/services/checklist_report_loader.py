@@ -0,0 +1,129 @@
+"""
+Checklist Report Loader
+
+Preloads everything a checklist report needs for a site and date range in a
+fixed number of queries: checklists with their category names, checklist
+items, and field responses (one query each, however many checklists and
+items the range has); field definitions come from the task field cache.
+
+The result is a plain in-memory structure, so renderers (the PDF report, the
+report emails) never touch the session while building their output.
+"""
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.models.checklist import Checklist
+from app.models.checklist_item import ChecklistItem
+from app.models.task_field_response import TaskFieldResponse
+from app.services.task_field_cache import CachedTaskField, task_field_cache
+
+
+@dataclass
+class ReportItem:
+    """A checklist item with its field responses and their field definitions."""
+    item: ChecklistItem
+    responses: List[Tuple[TaskFieldResponse, Optional[CachedTaskField]]] = field(default_factory=list)
+
+
+@dataclass
+class ReportChecklist:
+    """A checklist with its category name and items, in item order."""
+    checklist: Checklist
+    category_name: Optional[str]
+    items: List[ReportItem] = field(default_factory=list)
+
+
+@dataclass
+class DailyReportData:
+    """One day's checklists at a site, ordered by category."""
+    site_id: int
+    report_date: date
+    checklists: List[ReportChecklist] = field(default_factory=list)
+
+    @property
+    def total_items(self) -> int:
+        return sum(c.checklist.total_items or 0 for c in self.checklists)
+
+    @property
+    def completed_items(self) -> int:
+        return sum(c.checklist.completed_items or 0 for c in self.checklists)
+
+    @property
+    def completion_rate(self) -> float:
+        total = self.total_items
+        return (self.completed_items / total * 100) if total > 0 else 0
+
+
+def load_report_data(db: Session, site_id: int, start_date: date, end_date: date) -> Dict[date, DailyReportData]:
+    """
+    Load the checklist report data of every day in the range.
+
+    Returns:
+        dict: {date: DailyReportData} with an entry for each day in the
+        range (days without checklists have an empty checklists list)
+    """
+    days = {}
+    current_date = start_date
+    while current_date <= end_date:
+        days[current_date] = DailyReportData(site_id=site_id, report_date=current_date)
+        current_date += timedelta(days=1)
+
+    # Checklists with their category names
+    rows = db.query(Checklist, Category.name).outerjoin(
+        Category, Category.id == Checklist.category_id
+    ).filter(
+        Checklist.site_id == site_id,
+        Checklist.checklist_date >= start_date,
+        Checklist.checklist_date <= end_date
+    ).order_by(Checklist.checklist_date, Checklist.category_id, Checklist.id).all()
+
+    if not rows:
+        return days
+
+    report_checklists = {}
+    for checklist, category_name in rows:
+        report_checklist = ReportChecklist(checklist=checklist, category_name=category_name)
+        report_checklists[checklist.id] = report_checklist
+        days[checklist.checklist_date].checklists.append(report_checklist)
+
+    # Items of all checklists
+    items = db.query(ChecklistItem).filter(
+        ChecklistItem.checklist_id.in_(list(report_checklists))
+    ).order_by(ChecklistItem.checklist_id, ChecklistItem.id).all()
+
+    report_items = {}
+    for item in items:
+        report_item = ReportItem(item=item)
+        report_items[item.id] = report_item
+        report_checklists[item.checklist_id].items.append(report_item)
+
+    if not report_items:
+        return days
+
+    # Responses of all items, with field definitions from the cache
+    responses = db.query(TaskFieldResponse).join(
+        ChecklistItem, ChecklistItem.id == TaskFieldResponse.checklist_item_id
+    ).join(
+        Checklist, Checklist.id == ChecklistItem.checklist_id
+    ).filter(
+        Checklist.site_id == site_id,
+        Checklist.checklist_date >= start_date,
+        Checklist.checklist_date <= end_date
+    ).order_by(TaskFieldResponse.checklist_item_id, TaskFieldResponse.id).all()
+
+    field_map = task_field_cache.get_field_map(db, {item.task_id for item in items})
+    for response in responses:
+        report_item = report_items.get(response.checklist_item_id)
+        if report_item is not None:
+            report_item.responses.append((response, field_map.get(response.task_field_id)))
+
+    return days
+
+
+def load_daily_report_data(db: Session, site_id: int, report_date: date) -> DailyReportData:
+    """Load the checklist report data of a single day."""
+    return load_report_data(db, site_id, report_date, report_date)[report_date]
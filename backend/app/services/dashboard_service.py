@@ -0,0 +1,375 @@
+"""
+Dashboard Service
+
+Builds the super admin dashboard payload and keeps a snapshot of it in Redis.
+
+The payload touches every tenant, so it is computed by the
+refresh_super_admin_dashboard Celery task every few minutes and the
+endpoint serves the stored snapshot; request latency no longer grows with
+the number of organizations and sites.
+"""
+import json
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.checklist import Checklist, ChecklistStatus
+from app.models.defect import Defect, DefectStatus
+from app.models.organization import Organization
+from app.models.organization_module import OrganizationModule
+from app.models.site import Site
+from app.models.user import User
+from app.services.rag_service import calculate_sites_rag_status, summarize_rag
+
+logger = logging.getLogger(__name__)
+
+SUPER_ADMIN_SNAPSHOT_KEY = "dashboard:super_admin:snapshot"
+
+
+def build_super_admin_dashboard(db: Session) -> dict:
+    """Compute the super admin dashboard payload from the database."""
+    now = datetime.utcnow()
+    today = now.date()
+
+    # Count totals
+    total_orgs = db.query(Organization).filter(Organization.is_active == True).count()
+    total_sites = db.query(Site).filter(Site.is_active == True).count()
+    total_users = db.query(User).filter(User.is_active == True).count()
+
+    # Active checklists (last 30 days)
+    thirty_days_ago = now - timedelta(days=30)
+    total_active_checklists = db.query(Checklist).filter(
+        Checklist.created_at >= thirty_days_ago
+    ).count()
+
+    # Checklists today
+    checklists_today = db.query(Checklist).filter(
+        Checklist.checklist_date == today
+    ).count()
+
+    # Open defects
+    total_open_defects = db.query(Defect).filter(
+        Defect.status == DefectStatus.OPEN
+    ).count()
+
+    # Subscription summary
+    subscription_summary = {
+        "platform_admin": db.query(Organization).filter(Organization.subscription_tier == "platform_admin").count(),
+        "free": db.query(Organization).filter(Organization.subscription_tier == "free").count(),
+        "basic": db.query(Organization).filter(Organization.subscription_tier == "basic").count(),
+        "professional": db.query(Organization).filter(Organization.subscription_tier == "professional").count(),
+        "enterprise": db.query(Organization).filter(Organization.subscription_tier == "enterprise").count(),
+        "trial": db.query(Organization).filter(Organization.is_trial == True).count()
+    }
+
+    # Active subscriptions
+    active_subscriptions = db.query(Organization).filter(
+        Organization.is_active == True,
+        or_(
+            Organization.subscription_end_date > now,
+            Organization.subscription_end_date.is_(None)
+        )
+    ).count()
+
+    # === REVENUE METRICS ===
+    tier_pricing = {
+        "platform_admin": 0,
+        "free": 0,
+        "basic": 29,
+        "professional": 79,
+        "enterprise": 199
+    }
+
+    # Calculate MRR (Monthly Recurring Revenue)
+    mrr = 0
+    orgs_with_pricing = db.query(Organization).filter(Organization.is_active == True).all()
+    for org in orgs_with_pricing:
+        if org.custom_price_per_site:
+            site_count = db.query(Site).filter(Site.organization_id == org.id, Site.is_active == True).count()
+            mrr += org.custom_price_per_site * site_count
+        else:
+            mrr += tier_pricing.get(org.subscription_tier, 0)
+
+    revenue_metrics = {
+        "mrr": mrr,
+        "arr": mrr * 12,
+        "avg_revenue_per_org": round(mrr / total_orgs, 2) if total_orgs > 0 else 0,
+        "tier_breakdown": {
+            tier: {"count": count, "revenue": count * tier_pricing.get(tier, 0)}
+            for tier, count in subscription_summary.items() if tier != "trial"
+        }
+    }
+
+    # === USER ENGAGEMENT ===
+    seven_days_ago = now - timedelta(days=7)
+    active_users_today = db.query(User).filter(
+        User.last_login >= today
+    ).count() if hasattr(User, 'last_login') else 0
+
+    active_users_week = db.query(User).filter(
+        User.last_login >= seven_days_ago
+    ).count() if hasattr(User, 'last_login') else 0
+
+    new_users_week = db.query(User).filter(
+        User.created_at >= seven_days_ago
+    ).count()
+
+    user_engagement = {
+        "active_today": active_users_today,
+        "active_this_week": active_users_week,
+        "new_users_this_week": new_users_week,
+        "total_users": total_users,
+        "engagement_rate": round((active_users_week / total_users * 100), 1) if total_users > 0 else 0
+    }
+
+    # === MODULE ADOPTION ===
+    module_adoption = []
+    try:
+        module_counts = db.query(
+            OrganizationModule.module_name,
+            func.count(OrganizationModule.id).label('count')
+        ).filter(
+            OrganizationModule.is_enabled == True
+        ).group_by(OrganizationModule.module_name).all()
+
+        for module_name, count in module_counts:
+            module_adoption.append({
+                "module": module_name,
+                "display_name": module_name.replace("_", " ").title(),
+                "organizations": count,
+                "adoption_rate": round((count / total_orgs * 100), 1) if total_orgs > 0 else 0
+            })
+    except Exception:
+        pass  # Module table might not exist
+
+    # === DEFECT TRENDS (last 7 days) ===
+    defect_trends = []
+    for i in range(6, -1, -1):
+        day = today - timedelta(days=i)
+        day_start = datetime.combine(day, datetime.min.time())
+        day_end = datetime.combine(day, datetime.max.time())
+
+        created = db.query(Defect).filter(
+            Defect.created_at >= day_start,
+            Defect.created_at <= day_end
+        ).count()
+
+        resolved = db.query(Defect).filter(
+            Defect.resolved_at >= day_start,
+            Defect.resolved_at <= day_end
+        ).count() if hasattr(Defect, 'resolved_at') else 0
+
+        defect_trends.append({
+            "date": day.strftime("%a"),
+            "full_date": day.isoformat(),
+            "created": created,
+            "resolved": resolved
+        })
+
+    # === SITE PERFORMANCE RANKINGS ===
+    all_sites = db.query(Site).filter(Site.is_active == True).all()
+    site_rags = calculate_sites_rag_status([site.id for site in all_sites], db)
+    site_performance = []
+
+    for site in all_sites:
+        rag_data = site_rags[site.id]
+        site_performance.append({
+            "site_id": site.id,
+            "site_name": site.name,
+            "organization": site.organization.name if site.organization else "Unknown",
+            "completion_rate": rag_data["completion_rate"],
+            "rag_status": rag_data["rag_status"],
+            "open_defects": rag_data["open_defects"]
+        })
+
+    # Sort and get top 5 and bottom 5
+    site_performance_sorted = sorted(site_performance, key=lambda x: x["completion_rate"], reverse=True)
+    top_sites = site_performance_sorted[:5]
+    bottom_sites = sorted(site_performance_sorted[-5:], key=lambda x: x["completion_rate"]) if len(site_performance_sorted) > 5 else []
+
+    # === ALERTS ===
+    alerts = []
+
+    # Expiring subscriptions (within 30 days)
+    expiring_soon = db.query(Organization).filter(
+        Organization.is_active == True,
+        Organization.subscription_end_date.isnot(None),
+        Organization.subscription_end_date <= now + timedelta(days=30),
+        Organization.subscription_end_date > now
+    ).all()
+
+    for org in expiring_soon:
+        days_left = (org.subscription_end_date - now).days
+        alerts.append({
+            "type": "warning",
+            "category": "subscription",
+            "title": f"Subscription expiring soon",
+            "message": f"{org.name}'s subscription expires in {days_left} days",
+            "org_id": org.id,
+            "priority": "high" if days_left <= 7 else "medium"
+        })
+
+    # Inactive organizations (no checklist activity in 14 days)
+    fourteen_days_ago = now - timedelta(days=14)
+    active_org_ids = db.query(Checklist.site_id).join(Site).filter(
+        Checklist.created_at >= fourteen_days_ago
+    ).distinct().subquery()
+
+    inactive_orgs = db.query(Organization).filter(
+        Organization.is_active == True,
+        ~Organization.id.in_(
+            db.query(Site.organization_id).filter(Site.id.in_(active_org_ids))
+        )
+    ).limit(5).all()
+
+    for org in inactive_orgs:
+        alerts.append({
+            "type": "info",
+            "category": "engagement",
+            "title": "Low engagement",
+            "message": f"{org.name} has no checklist activity in 14 days",
+            "org_id": org.id,
+            "priority": "low"
+        })
+
+    # High defect sites (more than 5 open defects)
+    high_defect_sites = db.query(Site, func.count(Defect.id).label('defect_count')).join(
+        Defect, Defect.site_id == Site.id
+    ).filter(
+        Defect.status == DefectStatus.OPEN
+    ).group_by(Site.id).having(func.count(Defect.id) > 5).limit(5).all()
+
+    for site, defect_count in high_defect_sites:
+        alerts.append({
+            "type": "error",
+            "category": "defects",
+            "title": "High defect count",
+            "message": f"{site.name} has {defect_count} open defects",
+            "site_id": site.id,
+            "priority": "high"
+        })
+
+    # Platform-wide RAG status aggregation
+    rag_summary = {"green": 0, "amber": 0, "red": 0}
+    active_orgs = db.query(Organization).filter(Organization.is_active == True).all()
+    org_performance = []
+
+    # Reuse the per-site RAG computed above for the organization summaries
+    site_rags_by_org = {org.id: [] for org in active_orgs}
+    for site in all_sites:
+        if site.organization_id in site_rags_by_org:
+            site_rags_by_org[site.organization_id].append(site_rags[site.id])
+
+    for org in active_orgs:
+        org_rag = summarize_rag(site_rags_by_org[org.id])
+        rag_status = org_rag["overall_rag"]
+
+        if rag_status == "green":
+            rag_summary["green"] += 1
+        elif rag_status == "amber":
+            rag_summary["amber"] += 1
+        elif rag_status == "red":
+            rag_summary["red"] += 1
+
+        org_performance.append({
+            "org_id": org.id,
+            "org_name": org.name,
+            "rag_status": rag_status,
+            "completion_rate": org_rag["average_completion_rate"],
+            "open_defects": org_rag["total_open_defects"],
+            "total_sites": len(site_rags_by_org[org.id])
+        })
+
+    org_performance = sorted(org_performance, key=lambda x: x["completion_rate"], reverse=True)[:10]
+
+    # Platform growth data (last 6 months)
+    growth_data = []
+    for i in range(5, -1, -1):
+        month_start = (now - timedelta(days=30 * i)).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(seconds=1)
+
+        growth_data.append({
+            "month": month_start.strftime("%b %Y"),
+            "organizations": db.query(Organization).filter(Organization.created_at <= month_end).count(),
+            "sites": db.query(Site).filter(Site.created_at <= month_end).count(),
+            "users": db.query(User).filter(User.created_at <= month_end).count()
+        })
+
+    # Recent activity (limited to 5 for initial load)
+    recent_checklists = db.query(Checklist).filter(
+        Checklist.status == ChecklistStatus.COMPLETED
+    ).order_by(Checklist.completed_at.desc()).limit(5).all()
+
+    recent_activity = []
+    for checklist in recent_checklists:
+        recent_activity.append({
+            "type": "checklist",
+            "description": f"Checklist completed at {checklist.site.name}",
+            "timestamp": checklist.completed_at.isoformat() if checklist.completed_at else None,
+            "organization": checklist.site.organization.name,
+            "site": checklist.site.name
+        })
+
+    return dict(
+        total_organizations=total_orgs,
+        total_sites=total_sites,
+        total_users=total_users,
+        total_active_checklists=total_active_checklists,
+        total_open_defects=total_open_defects,
+        active_subscriptions=active_subscriptions,
+        subscription_summary=subscription_summary,
+        recent_activity=recent_activity,
+        rag_summary=rag_summary,
+        org_performance=org_performance,
+        growth_data=growth_data,
+        # New enhanced metrics
+        revenue_metrics=revenue_metrics,
+        user_engagement=user_engagement,
+        module_adoption=module_adoption,
+        defect_trends=defect_trends,
+        top_sites=top_sites,
+        bottom_sites=bottom_sites,
+        alerts=alerts,
+        checklists_today=checklists_today
+    )
+
+
+def store_super_admin_snapshot(payload: dict) -> dict:
+    """Stamp the payload with generated_at and store it in Redis (best effort)."""
+    snapshot = {**payload, "generated_at": datetime.utcnow().isoformat()}
+    try:
+        get_redis().set(
+            SUPER_ADMIN_SNAPSHOT_KEY,
+            json.dumps(snapshot, default=str),
+            ex=settings.DASHBOARD_SNAPSHOT_TTL_SECONDS
+        )
+    except Exception as e:
+        logger.warning(f"Could not store super admin dashboard snapshot: {str(e)}")
+    return snapshot
+
+
+def refresh_super_admin_snapshot(db: Session) -> dict:
+    """Recompute the dashboard and store it as the current snapshot."""
+    return store_super_admin_snapshot(build_super_admin_dashboard(db))
+
+
+def get_super_admin_snapshot(db: Session, fresh: bool = False) -> dict:
+    """
+    Return the latest super admin dashboard snapshot.
+
+    Falls back to computing (and storing) it when fresh=True, when no
+    snapshot exists yet or when Redis is unavailable.
+    """
+    if not fresh:
+        try:
+            cached = get_redis().get(SUPER_ADMIN_SNAPSHOT_KEY)
+            if cached:
+                return json.loads(cached)
+        except Exception as e:
+            logger.warning(f"Could not read super admin dashboard snapshot: {str(e)}")
+
+    return refresh_super_admin_snapshot(db)
@@ -0,0 +1,226 @@
+"""
+Field Response Service
+
+Set-based submission of task field responses for one or many checklist items.
+
+A submission batch is handled with a fixed number of statements however
+many items and readings it holds: checklist items, checklists and
+categories are loaded once, field definitions come from the schema cache,
+all temperature readings are validated in one pass, and defects and
+responses are written with bulk INSERT ... RETURNING. This lets an offline
+tablet sync a whole round of fridge checks in one request.
+
+Readings are checked against each field's validation rules, compiled once
+per field and cached (see validation_rules).
+"""
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, func, insert
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.models.checklist import Checklist, ChecklistStatus
+from app.models.checklist_item import ChecklistItem
+from app.models.defect import Defect, DefectStatus
+from app.models.task_field import TaskField
+from app.models.task_field_response import TaskFieldResponse
+from app.models.user import User
+from app.schemas.task_field import TaskFieldResponseSchema, TaskFieldResponseSubmission
+from app.services.site_stats_service import refresh_site_days
+from app.services.task_field_cache import task_field_cache
+from app.services.validation_rules import Violation, compile_field, evaluate_batch
+
+
+def validate_readings(response_data, task_field, site_id: Optional[int] = None) -> Optional[Violation]:
+    """
+    Check a response's readings against the field's validation rules.
+
+    Uses the evaluator compiled onto cached fields, compiling on the fly for
+    plain TaskField rows.
+
+    Returns:
+        (title, description, severity) of the defect to raise, or None
+    """
+    evaluator = getattr(task_field, "evaluator", None) or compile_field(task_field)
+    return evaluator.evaluate(response_data, site_id)
+
+
+def _check_not_overdue(checklist: Checklist, category: Optional[Category], today: date, now: datetime):
+    """Prevent completion of overdue checklists."""
+    # If checklist date is in the past, it's overdue
+    if checklist.checklist_date < today:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot complete overdue checklist. This checklist was due on " + str(checklist.checklist_date)
+        )
+
+    # If checklist is for today but past closing time, it's overdue
+    if checklist.checklist_date == today and category and category.closes_at:
+        closes_at_time = category.closes_at
+        if now.time() > closes_at_time:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cannot complete checklist after closing time (" + str(closes_at_time) + ")"
+            )
+
+
+def submit_responses(
+    db: Session,
+    submissions: List[TaskFieldResponseSubmission],
+    current_user: User
+) -> List[TaskFieldResponseSchema]:
+    """
+    Store field responses for one or more checklist items and complete them.
+
+    Raises auto-defects for readings that break their field's rules, marks
+    the items completed and updates their checklists' completion. Commits
+    and returns the created responses in submission order.
+    """
+    item_ids = {submission.checklist_item_id for submission in submissions}
+    if not item_ids:
+        return []
+
+    # Checklist items with their checklists and categories in one query
+    rows = db.query(ChecklistItem, Checklist, Category).join(
+        Checklist, Checklist.id == ChecklistItem.checklist_id
+    ).outerjoin(
+        Category, Category.id == Checklist.category_id
+    ).filter(ChecklistItem.id.in_(item_ids)).all()
+    items = {item.id: (item, checklist, category) for item, checklist, category in rows}
+
+    missing = item_ids - items.keys()
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Checklist item not found: {', '.join(str(i) for i in sorted(missing))}"
+        )
+
+    today = date.today()
+    now = datetime.now()
+    checked = set()
+    for _, checklist, category in items.values():
+        if checklist.id not in checked:
+            _check_not_overdue(checklist, category, today, now)
+            checked.add(checklist.id)
+
+    # Field definitions for every task involved (schema cache, one query for misses)
+    field_map = task_field_cache.get_field_map(db, {item.task_id for item, _, _ in items.values()})
+    stray_field_ids = {
+        response.task_field_id
+        for submission in submissions
+        for response in submission.responses
+        if response.task_field_id not in field_map
+    }
+    evaluators = {field_id: field.evaluator for field_id, field in field_map.items()}
+    if stray_field_ids:
+        for field in db.query(TaskField).filter(TaskField.id.in_(stray_field_ids)).all():
+            evaluators[field.id] = compile_field(field)
+
+    # Validate all readings in one pass per submission and build rows
+    response_rows = []
+    defect_rows = []
+    defect_for_response: Dict[int, int] = {}  # response row index -> defect row index
+    for submission in submissions:
+        item, checklist, _ = items[submission.checklist_item_id]
+        checkable = [
+            (response_data, evaluators[response_data.task_field_id])
+            for response_data in submission.responses
+            if checklist.site_id and response_data.task_field_id in evaluators
+        ]
+        violations = iter(evaluate_batch(checkable, checklist.site_id))
+        for response_data in submission.responses:
+            if checklist.site_id and response_data.task_field_id in evaluators:
+                violation = next(violations)
+                if violation:
+                    title, description, severity = violation
+                    defect_for_response[len(response_rows)] = len(defect_rows)
+                    defect_rows.append({
+                        "title": title,
+                        "description": description,
+                        "severity": severity,
+                        "status": DefectStatus.OPEN,
+                        "site_id": checklist.site_id,
+                        "checklist_item_id": item.id,
+                        "reported_by_id": current_user.id
+                    })
+            response_rows.append({
+                "checklist_item_id": item.id,
+                "task_field_id": response_data.task_field_id,
+                "text_value": response_data.text_value,
+                "number_value": response_data.number_value,
+                "boolean_value": response_data.boolean_value,
+                "json_value": response_data.json_value,
+                "file_url": response_data.file_url,
+                "completed_by": current_user.id,
+                "auto_defect_id": None
+            })
+
+    # Bulk insert defects, then link them to their responses
+    stats_keys = set()
+    if defect_rows:
+        created_defects = db.execute(
+            insert(Defect).returning(Defect.id, Defect.site_id, Defect.created_at, sort_by_parameter_order=True),
+            defect_rows
+        ).all()
+        for response_index, defect_index in defect_for_response.items():
+            response_rows[response_index]["auto_defect_id"] = created_defects[defect_index].id
+        stats_keys.update(
+            (defect.site_id, defect.created_at.date() if defect.created_at else today)
+            for defect in created_defects
+        )
+
+    created_responses = []
+    if response_rows:
+        # Serialise straight from the RETURNING rows so nothing is reloaded after commit
+        created_responses = [
+            TaskFieldResponseSchema.model_validate(response)
+            for response in db.scalars(
+                insert(TaskFieldResponse).returning(TaskFieldResponse, sort_by_parameter_order=True),
+                response_rows
+            ).all()
+        ]
+
+    # Mark checklist items as completed
+    completed_at = datetime.utcnow()
+    db.query(ChecklistItem).filter(ChecklistItem.id.in_(item_ids)).update(
+        {ChecklistItem.is_completed: True, ChecklistItem.completed_at: completed_at},
+        synchronize_session=False
+    )
+
+    # Update parent checklist completion statistics with row-level locking to prevent race conditions
+    checklist_ids = sorted({checklist.id for _, checklist, _ in items.values()})
+    checklists = db.query(Checklist).filter(
+        Checklist.id.in_(checklist_ids)
+    ).order_by(Checklist.id).with_for_update().populate_existing().all()
+
+    completed_counts = dict(db.query(
+        ChecklistItem.checklist_id,
+        func.sum(case((ChecklistItem.is_completed == True, 1), else_=0))
+    ).filter(
+        ChecklistItem.checklist_id.in_(checklist_ids)
+    ).group_by(ChecklistItem.checklist_id).all())
+
+    for checklist in checklists:
+        checklist.completed_items = int(completed_counts.get(checklist.id) or 0)
+        checklist.calculate_completion()
+
+        # Update checklist status to in_progress
+        if checklist.status == ChecklistStatus.PENDING:
+            checklist.status = ChecklistStatus.IN_PROGRESS
+
+        # If all items are completed, mark checklist as completed
+        if checklist.completed_items == checklist.total_items and checklist.total_items > 0:
+            checklist.status = ChecklistStatus.COMPLETED
+            checklist.completed_at = completed_at
+            checklist.completed_by_id = current_user.id
+
+        stats_keys.add((checklist.site_id, checklist.checklist_date))
+
+    # Keep the site_daily_stats rollup in step with the new completion and defects
+    refresh_site_days(db, stats_keys)
+
+    db.commit()
+
+    return created_responses
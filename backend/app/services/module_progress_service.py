@@ -5,6 +5,7 @@ from app.models.module_progress import ModuleProgress
 from app.models.course_enrollment import CourseEnrollment, EnrollmentStatus
 from app.models.course_module import CourseModule
 from app.schemas.module_progress import ModuleProgressCreate, ModuleProgressUpdate
+from app.services.progress_heartbeat_buffer import progress_heartbeat_buffer
 
 
 class ModuleProgressService:
@@ -32,6 +33,20 @@ class ModuleProgressService:
 
         return progress
 
+    @staticmethod
+    def apply_buffered_heartbeat(progress: ModuleProgress) -> None:
+        """
+        Apply a heartbeat still waiting in the write buffer to the progress row.
+
+        Keeps the position and time spent it carries, and stops it from
+        overwriting this write when the buffer is flushed.
+        """
+        heartbeat = progress_heartbeat_buffer.take(progress.enrollment_id, progress.module_id)
+        if heartbeat is None or heartbeat.user_id != progress.enrollment.user_id:
+            return
+        progress.last_position_seconds = heartbeat.last_position_seconds
+        progress.time_spent_seconds = max(progress.time_spent_seconds or 0, heartbeat.time_spent_seconds)
+
     @staticmethod
     def update_progress(
         db: Session,
@@ -41,8 +56,10 @@ class ModuleProgressService:
     ) -> ModuleProgress:
         """Update module progress."""
         progress = ModuleProgressService.get_or_create_progress(db, enrollment_id, module_id)
+        ModuleProgressService.apply_buffered_heartbeat(progress)
 
         update_dict = update_data.model_dump(exclude_unset=True)
+        was_completed = progress.is_completed
 
         # If marking as completed, set completed_at
         if update_dict.get('is_completed') and not progress.is_completed:
@@ -54,8 +71,9 @@ class ModuleProgressService:
         db.commit()
         db.refresh(progress)
 
-        # Update overall course progress
-        ModuleProgressService.update_course_progress(db, enrollment_id)
+        # Course percentage only changes when the module's completion does
+        if progress.is_completed != was_completed:
+            ModuleProgressService.update_course_progress(db, enrollment_id)
 
         return progress
 
@@ -68,6 +86,7 @@ class ModuleProgressService:
     ) -> ModuleProgress:
         """Mark a module as completed."""
         progress = ModuleProgressService.get_or_create_progress(db, enrollment_id, module_id)
+        ModuleProgressService.apply_buffered_heartbeat(progress)
 
         if not progress.is_completed:
             progress.is_completed = True
@@ -79,6 +98,10 @@ class ModuleProgressService:
 
             # Update overall course progress
             ModuleProgressService.update_course_progress(db, enrollment_id)
+        elif db.is_modified(progress):
+            # Only the buffered heartbeat changed it
+            db.commit()
+            db.refresh(progress)
 
         return progress
 
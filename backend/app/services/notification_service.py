@@ -1,10 +1,18 @@
 """
 Notification service for creating and managing user notifications
 """
+import logging
+from datetime import datetime
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from app.core.config import settings
 from app.models.notification import Notification
 from app.models.user import User, UserRole
+# Also registers the session hooks that push committed notifications to connected clients
+from app.services.notification_stream import queue_notification_payloads
+
+logger = logging.getLogger(__name__)
 
 
 class NotificationService:
@@ -41,38 +49,91 @@ class NotificationService:
         notification_type: str,
         related_id: int = None,
         related_url: str = None
-    ) -> List[Notification]:
-        """Create notifications for multiple users"""
-        notifications = []
-        for user_id in user_ids:
-            notification = NotificationService.create_notification(
-                db=db,
-                user_id=user_id,
-                title=title,
-                message=message,
-                notification_type=notification_type,
-                related_id=related_id,
-                related_url=related_url
-            )
-            notifications.append(notification)
-        return notifications
+    ) -> int:
+        """
+        Create the same notification for multiple users with one bulk INSERT.
+
+        Rows are written when the caller commits (and pushed to connected
+        clients then). Returns the number of notifications created.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return 0
+
+        created_at = datetime.utcnow()
+        rows = [{
+            "user_id": user_id,
+            "title": title,
+            "message": message,
+            "notification_type": notification_type,
+            "related_id": related_id,
+            "related_url": related_url,
+            "is_read": False,
+            "created_at": created_at
+        } for user_id in user_ids]
+
+        ids = db.execute(
+            insert(Notification).returning(Notification.id, sort_by_parameter_order=True),
+            rows
+        ).scalars().all()
+
+        queue_notification_payloads(db, [
+            {**row, "id": notification_id, "read_at": None, "created_at": created_at.isoformat()}
+            for notification_id, row in zip(ids, rows)
+        ])
+        return len(rows)
 
     @staticmethod
-    def notify_all_super_admins(
+    def role_recipient_ids(db: Session, role: UserRole) -> List[int]:
+        """Ids of all users with the given role, in one query."""
+        return [row.id for row in db.query(User.id).filter(User.role == role).all()]
+
+    @staticmethod
+    def fan_out(
         db: Session,
         title: str,
         message: str,
         notification_type: str,
         related_id: int = None,
-        related_url: str = None
-    ) -> List[Notification]:
-        """Create notifications for all super admin users"""
-        super_admins = db.query(User).filter(User.role == UserRole.SUPER_ADMIN).all()
-        super_admin_ids = [admin.id for admin in super_admins]
+        related_url: str = None,
+        user_ids: Optional[List[int]] = None,
+        role: Optional[UserRole] = None,
+        defer: Optional[bool] = None
+    ) -> Optional[int]:
+        """
+        Notify a list of users, or every user with a role.
+
+        With defer (default NOTIFICATION_FANOUT_DEFERRED) recipients are
+        resolved and rows inserted by a Celery task, and None is returned;
+        otherwise the rows are added to the caller's session (commit it) and
+        the number created is returned. Falls back to inline if the task
+        cannot be queued.
+        """
+        if defer is None:
+            defer = settings.NOTIFICATION_FANOUT_DEFERRED
+
+        if defer:
+            from app.celery_app import celery_app
+            try:
+                celery_app.send_task('app.celery_tasks.fan_out_notifications', kwargs={
+                    "title": title,
+                    "message": message,
+                    "notification_type": notification_type,
+                    "related_id": related_id,
+                    "related_url": related_url,
+                    "user_ids": user_ids,
+                    "role": role.value if role else None
+                })
+                return None
+            except Exception as e:
+                logger.warning(f"Could not queue notification fan-out, creating inline: {str(e)}")
+
+        if user_ids is None:
+            user_ids = NotificationService.role_recipient_ids(db, role) if role else []
 
         return NotificationService.create_notifications_for_users(
             db=db,
-            user_ids=super_admin_ids,
+            user_ids=user_ids,
             title=title,
             message=message,
             notification_type=notification_type,
@@ -80,6 +141,28 @@ class NotificationService:
             related_url=related_url
         )
 
+    @staticmethod
+    def notify_all_super_admins(
+        db: Session,
+        title: str,
+        message: str,
+        notification_type: str,
+        related_id: int = None,
+        related_url: str = None,
+        defer: Optional[bool] = None
+    ) -> Optional[int]:
+        """Create notifications for all super admin users"""
+        return NotificationService.fan_out(
+            db=db,
+            title=title,
+            message=message,
+            notification_type=notification_type,
+            related_id=related_id,
+            related_url=related_url,
+            role=UserRole.SUPER_ADMIN,
+            defer=defer
+        )
+
     @staticmethod
     def notify_ticket_new(db: Session, ticket_number: str, subject: str, ticket_id: int):
         """Notify all super admins of a new ticket"""
@@ -0,0 +1,179 @@
+"""
+Notification Stream
+
+Pushes new notifications and unread-count changes to connected clients
+(Server-Sent Events, with a long-poll fallback) instead of clients polling
+the unread count.
+
+Committed notifications are published on a Redis pub/sub channel by any
+process (API or Celery). Each API process holds a single subscription and
+hands events to the asyncio queues of the users connected to it, so an idle
+client costs one open response and a queue, and no database queries.
+Without Redis, events still reach the clients connected to the publishing
+process.
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+import redis.asyncio as aioredis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.notification import Notification
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "notifications:events"
+RECONNECT_DELAY = 5  # seconds
+
+EVENT_NOTIFICATION = "notification"
+EVENT_UNREAD_COUNT = "unread_count"
+
+
+def notification_payload(notification: Notification) -> dict:
+    """JSON-serializable form of a notification, as NotificationResponse."""
+    return {
+        "id": notification.id,
+        "user_id": notification.user_id,
+        "title": notification.title,
+        "message": notification.message,
+        "notification_type": notification.notification_type,
+        "related_id": notification.related_id,
+        "related_url": notification.related_url,
+        "is_read": bool(notification.is_read),
+        "read_at": notification.read_at.isoformat() if notification.read_at else None,
+        "created_at": notification.created_at.isoformat() if notification.created_at else None
+    }
+
+
+class NotificationBroker:
+    """Publishes notification events and fans them out to this process's connected clients."""
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    # ========== Publishing ==========
+
+    def publish(self, events: List[dict]) -> None:
+        """Publish events (each with a user_id and a type) to every API process."""
+        if not events:
+            return
+        try:
+            pipe = get_redis().pipeline(transaction=False)
+            for item in events:
+                pipe.publish(CHANNEL, json.dumps(item))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not publish notification events, delivering locally: {str(e)}")
+            loop = self._loop
+            if loop is not None and not loop.is_closed():
+                for item in events:
+                    loop.call_soon_threadsafe(self._deliver, item)
+
+    def publish_notifications(self, payloads: Iterable[dict]) -> None:
+        self.publish([
+            {"type": EVENT_NOTIFICATION, "user_id": payload["user_id"], "notification": payload}
+            for payload in payloads
+        ])
+
+    def publish_unread_count(self, user_id: int, count: int) -> None:
+        self.publish([{"type": EVENT_UNREAD_COUNT, "user_id": user_id, "count": count}])
+
+    # ========== Subscribing ==========
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        """Queue receiving the user's events (call from the event loop)."""
+        self._ensure_listener()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+    def connected_clients(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def _ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._loop = asyncio.get_running_loop()
+            self._listener = self._loop.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """Relay the Redis channel to local subscribers, reconnecting on errors."""
+        while True:
+            client = aioredis.Redis.from_url(
+                settings.REDIS_URL or settings.CELERY_BROKER_URL,
+                decode_responses=True
+            )
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        self._deliver(json.loads(message["data"]))
+                    except (ValueError, KeyError) as e:
+                        logger.warning(f"Ignoring malformed notification event: {str(e)}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Notification event subscription lost, reconnecting: {str(e)}")
+                await asyncio.sleep(RECONNECT_DELAY)
+            finally:
+                await client.close()
+
+    def _deliver(self, item: dict) -> None:
+        for queue in list(self._subscribers.get(item["user_id"], ())):
+            try:
+                queue.put_nowait(item)
+            except asyncio.QueueFull:
+                # Slow client; it resyncs the unread count when it reconnects
+                pass
+
+
+# Singleton instance
+notification_broker = NotificationBroker()
+
+
+# ========== Publishing on commit ==========
+
+_PENDING_KEY = "notification_events"
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_new_notifications(session, flush_context):
+    """Serialize new notifications while they are loaded (published after commit)."""
+    for obj in session.new:
+        if isinstance(obj, Notification):
+            session.info.setdefault(_PENDING_KEY, []).append(notification_payload(obj))
+
+
+def queue_notification_payloads(session: Session, payloads: List[dict]) -> None:
+    """Publish notifications inserted without the ORM (bulk inserts) once the session commits."""
+    session.info.setdefault(_PENDING_KEY, []).extend(payloads)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_new_notifications(session):
+    payloads = session.info.pop(_PENDING_KEY, None)
+    if payloads:
+        notification_broker.publish_notifications(payloads)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_new_notifications(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,138 @@
+"""
+PDF Render Pool
+
+Renders daily checklist PDFs in a pool of worker processes and streams
+multi-day exports as a ZIP.
+
+ReportLab rendering is CPU-bound and holds the GIL, so days are spread over
+separate processes (PDF_RENDER_WORKERS, default one per core); each worker
+opens its own database session. At most one render per worker is in flight
+and every finished PDF is compressed straight into the ZIP stream, so peak
+memory stays around one PDF per worker whatever the length of the range.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from typing import Iterable, Iterator, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_workers = 0
+_lock = threading.Lock()
+
+
+def render_daily_report(site_id: int, report_date: date, organization_name: str, site_name: str) -> bytes:
+    """Render one day's checklist PDF (runs in a pool worker process)."""
+    from app.core.database import ReadSessionLocal
+    from app.services.pdf_service import pdf_service
+
+    db = ReadSessionLocal()
+    try:
+        return pdf_service.generate_daily_checklist_report(
+            db=db,
+            site_id=site_id,
+            report_date=report_date,
+            organization_name=organization_name,
+            site_name=site_name
+        ).getvalue()
+    finally:
+        db.close()
+
+
+def _get_executor() -> Tuple[ProcessPoolExecutor, int]:
+    """Shared process pool, created on first use (spawned, so no state is inherited)."""
+    global _executor, _executor_workers
+    with _lock:
+        if _executor is None:
+            _executor_workers = settings.PDF_RENDER_WORKERS or os.cpu_count() or 1
+            _executor = ProcessPoolExecutor(
+                max_workers=_executor_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor, _executor_workers
+
+
+def _reset_executor():
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+class _ChunkWriter:
+    """Write-only sink for ZipFile; the written bytes are drained after each entry."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_daily_reports_zip(
+    site_id: int,
+    report_dates: Iterable[date],
+    organization_name: str,
+    site_name: str
+) -> Iterator[bytes]:
+    """
+    Render the given days in parallel and yield a ZIP of the PDFs in chunks.
+
+    Entries are added in the order the renders finish. An error after
+    streaming has started can no longer change the response status, so it
+    is logged and ends the stream.
+    """
+    from app.services.pdf_service import pdf_service
+
+    executor, workers = _get_executor()
+    pending = list(report_dates)
+    in_flight = {}
+    writer = _ChunkWriter()
+
+    try:
+        with zipfile.ZipFile(writer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            while pending or in_flight:
+                # Keep every worker busy, but never more than one PDF per worker
+                while pending and len(in_flight) < workers:
+                    report_date = pending.pop(0)
+                    future = executor.submit(render_daily_report, site_id, report_date, organization_name, site_name)
+                    in_flight[future] = report_date
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report_date = in_flight.pop(future)
+                    filename = pdf_service.generate_filename(organization_name, site_name, report_date)
+                    zip_file.writestr(filename, future.result())
+                    yield writer.drain()
+
+        # Central directory
+        yield writer.drain()
+
+    except BrokenProcessPool:
+        logger.error("PDF render pool broke, recreating it on next use", exc_info=True)
+        _reset_executor()
+        raise
+    except Exception as e:
+        logger.error(f"Error streaming PDF reports for site {site_id}: {str(e)}", exc_info=True)
+        raise
+    finally:
+        for future in in_flight:
+            future.cancel()
@@ -3,7 +3,7 @@ PDF Generation Service for Checklist Reports
 """
 from io import BytesIO
 from datetime import date, datetime
-from typing import List, Optional, Dict, Any
+from typing import TYPE_CHECKING, List, Optional, Dict, Any
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -15,8 +15,11 @@ from reportlab.platypus import (
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 from sqlalchemy.orm import Session
 import base64
-import requests
-import os
+
+from app.services.report_image_cache import Thumbnail, report_image_cache
+
+if TYPE_CHECKING:
+    from app.services.checklist_report_loader import DailyReportData
 
 
 class PDFService:
@@ -95,7 +98,8 @@ class PDFService:
         site_id: int,
         report_date: date,
         organization_name: str,
-        site_name: str
+        site_name: str,
+        report_data: Optional["DailyReportData"] = None
     ) -> BytesIO:
         """
         Generate a PDF report for a single day's checklists at a site.
@@ -106,15 +110,16 @@ class PDFService:
             report_date: The date to generate the report for
             organization_name: Name of the organization
             site_name: Name of the site
+            report_data: Preloaded data for the day (loaded if not given)
 
         Returns:
             BytesIO buffer containing the PDF
         """
-        from app.models.checklist import Checklist, ChecklistStatus
-        from app.models.checklist_item import ChecklistItem
-        from app.models.task_field_response import TaskFieldResponse
-        from app.models.task_field import TaskField
-        from app.models.category import Category
+        from app.models.checklist import ChecklistStatus
+        from app.services.checklist_report_loader import load_daily_report_data
+
+        if report_data is None:
+            report_data = load_daily_report_data(db, site_id, report_date)
 
         # Create PDF buffer
         buffer = BytesIO()
@@ -158,11 +163,11 @@ class PDFService:
         elements.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor('#E5E7EB')))
         elements.append(Spacer(1, 15))
 
-        # Get checklists for this date and site
-        checklists = db.query(Checklist).filter(
-            Checklist.site_id == site_id,
-            Checklist.checklist_date == report_date
-        ).order_by(Checklist.category_id).all()
+        # Checklists for this date and site
+        checklists = report_data.checklists
+
+        # Load every photo of the day up front (local files from storage, remote ones concurrently)
+        thumbnails = report_image_cache.get_thumbnails(self._photo_urls(report_data))
 
         if not checklists:
             elements.append(Paragraph(
@@ -171,9 +176,9 @@ class PDFService:
             ))
         else:
             # Summary section
-            total_items = sum(c.total_items or 0 for c in checklists)
-            completed_items = sum(c.completed_items or 0 for c in checklists)
-            completion_rate = (completed_items / total_items * 100) if total_items > 0 else 0
+            total_items = report_data.total_items
+            completed_items = report_data.completed_items
+            completion_rate = report_data.completion_rate
 
             # Summary table
             summary_data = [
@@ -204,9 +209,9 @@ class PDFService:
             elements.append(Spacer(1, 20))
 
             # Detailed sections for each category
-            for checklist in checklists:
-                category = db.query(Category).filter(Category.id == checklist.category_id).first()
-                category_name = category.name if category else "Unknown Category"
+            for report_checklist in checklists:
+                checklist = report_checklist.checklist
+                category_name = report_checklist.category_name or "Unknown Category"
 
                 # Category header
                 status_color = '#059669' if checklist.status == ChecklistStatus.COMPLETED else '#DC2626'
@@ -232,12 +237,9 @@ class PDFService:
 
                 elements.append(Spacer(1, 10))
 
-                # Get checklist items
-                items = db.query(ChecklistItem).filter(
-                    ChecklistItem.checklist_id == checklist.id
-                ).order_by(ChecklistItem.id).all()
+                for report_item in report_checklist.items:
+                    item = report_item.item
 
-                for item in items:
                     # Item status icon and name
                     if item.is_completed:
                         icon = "✓"
@@ -252,16 +254,9 @@ class PDFService:
                         style
                     ))
 
-                    # Get field responses for this item
-                    responses = db.query(TaskFieldResponse).filter(
-                        TaskFieldResponse.checklist_item_id == item.id
-                    ).all()
-
-                    if responses:
-                        for response in responses:
-                            field = db.query(TaskField).filter(
-                                TaskField.id == response.task_field_id
-                            ).first()
+                    # Field responses for this item
+                    if report_item.responses:
+                        for response, field in report_item.responses:
                             field_label = field.field_label if field else "Field"
                             value = response.get_value()
 
@@ -272,13 +267,10 @@ class PDFService:
                                     self.styles['NormalText']
                                 ))
                                 # Try to embed the image
-                                try:
-                                    img = self._get_image_from_url(response.file_url)
-                                    if img:
-                                        elements.append(img)
-                                        elements.append(Spacer(1, 5))
-                                except Exception as e:
-                                    print(f"Failed to embed image: {e}")
+                                img = self._image_from_thumbnail(thumbnails.get(response.file_url))
+                                if img:
+                                    elements.append(img)
+                                    elements.append(Spacer(1, 5))
                             else:
                                 # Format value for display
                                 display_value = self._format_value(value, field)
@@ -300,13 +292,10 @@ class PDFService:
                             f"    Evidence photo attached",
                             self.styles['NormalText']
                         ))
-                        try:
-                            img = self._get_image_from_url(item.photo_url)
-                            if img:
-                                elements.append(img)
-                                elements.append(Spacer(1, 5))
-                        except Exception as e:
-                            print(f"Failed to embed evidence photo: {e}")
+                        img = self._image_from_thumbnail(thumbnails.get(item.photo_url))
+                        if img:
+                            elements.append(img)
+                            elements.append(Spacer(1, 5))
 
                     elements.append(Spacer(1, 5))
 
@@ -348,47 +337,39 @@ class PDFService:
 
         return str(value)
 
-    def _get_image_from_url(self, url: str, max_width: float = 150*mm, max_height: float = 100*mm) -> Optional[Image]:
+    def _photo_urls(self, report_data: "DailyReportData") -> List[str]:
+        """All photo URLs embedded in a day's report."""
+        urls = []
+        for report_checklist in report_data.checklists:
+            for report_item in report_checklist.items:
+                for response, field in report_item.responses:
+                    if field and field.field_type == 'photo' and response.file_url:
+                        urls.append(response.file_url)
+                if report_item.item.photo_url:
+                    urls.append(report_item.item.photo_url)
+        return urls
+
+    def _image_from_thumbnail(
+        self,
+        thumbnail: Optional[Thumbnail],
+        max_width: float = 150*mm,
+        max_height: float = 100*mm
+    ) -> Optional[Image]:
+        """
+        Build a ReportLab Image from a cached thumbnail, scaled to fit the
+        max dimensions (in points). Returns None if the photo could not be loaded.
         """
-        Fetch an image from URL and return a ReportLab Image object.
+        if thumbnail is None:
+            return None
 
-        Args:
-            url: URL of the image
-            max_width: Maximum width in points
-            max_height: Maximum height in points
+        data, (img_width, img_height) = thumbnail
 
-        Returns:
-            ReportLab Image object or None if failed
-        """
-        try:
-            # Handle relative URLs
-            if url.startswith('/'):
-                # This is a relative URL, need to construct full path
-                # For local development, you might need to adjust this
-                base_url = os.environ.get('API_BASE_URL', 'http://localhost:8000')
-                url = f"{base_url}{url}"
-
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                img_buffer = BytesIO(response.content)
-                img = Image(img_buffer)
-
-                # Scale image to fit within max dimensions
-                img_width, img_height = img.drawWidth, img.drawHeight
-
-                # Calculate scale factor
-                scale_w = max_width / img_width if img_width > max_width else 1
-                scale_h = max_height / img_height if img_height > max_height else 1
-                scale = min(scale_w, scale_h)
-
-                img.drawWidth = img_width * scale
-                img.drawHeight = img_height * scale
-
-                return img
-        except Exception as e:
-            print(f"Error fetching image from {url}: {e}")
-
-        return None
+        # Calculate scale factor
+        scale_w = max_width / img_width if img_width > max_width else 1
+        scale_h = max_height / img_height if img_height > max_height else 1
+        scale = min(scale_w, scale_h)
+
+        return Image(BytesIO(data), width=img_width * scale, height=img_height * scale)
 
     def generate_filename(
         self,
@@ -0,0 +1,368 @@
+"""
+Authenticated Principal Cache
+
+Short-lived cache of the authenticated user behind an access token, so
+get_current_user does not query the user, their sites and modules on every
+request.
+
+A Principal is a compact immutable snapshot: the user's columns (without
+the password hash), assigned site ids, the user's module access and the
+organization's enabled modules. Entries live in a per-process LRU and in
+Redis, both for PRINCIPAL_CACHE_TTL seconds, keyed by user id under a
+shared cache version.
+
+Commits touching users, their site assignments or module access drop those
+users' entries in every process (Redis delete plus a pub/sub message);
+commits touching sites or organization modules bump the shared version,
+dropping every entry. Bulk DML on these tables (query(...).delete() and
+the like) is picked up as well. Tokens carry the user's token_version, which must
+match the cached principal's.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.models.organization_module import OrganizationModule
+from app.models.site import Site
+from app.models.user import Department, JobTitle, User, UserRole
+from app.models.user_module_access import UserModuleAccess
+from app.models.user_site import UserSite
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "principals:version"
+INVALIDATION_CHANNEL = "principals:invalidate"
+VERSION_CHECK_INTERVAL = 30  # seconds
+DEFAULT_MAX_ENTRIES = 10000
+
+# User columns kept in the principal; anything else is loaded on first access
+USER_COLUMNS = (
+    "email", "first_name", "last_name", "role", "is_active", "must_change_password",
+    "phone", "department", "job_title", "job_role_id", "hire_date", "organization_id",
+    "token_version"
+)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Immutable snapshot of an authenticated user."""
+    id: int
+    email: str
+    first_name: str
+    last_name: str
+    role: UserRole
+    is_active: bool
+    must_change_password: bool
+    phone: Optional[str]
+    department: Optional[Department]
+    job_title: Optional[JobTitle]
+    job_role_id: Optional[int]
+    hire_date: Optional[datetime]
+    organization_id: Optional[int]
+    token_version: int
+    site_ids: Tuple[int, ...]
+    user_modules: Tuple[str, ...]
+    org_modules: Tuple[str, ...]
+
+    @classmethod
+    def load(cls, db: Session, user_id: int) -> Optional["Principal"]:
+        """Load a principal from the database (None if the user does not exist)."""
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            return None
+
+        site_ids = tuple(row.site_id for row in db.query(UserSite.site_id).filter(
+            UserSite.user_id == user_id
+        ).order_by(UserSite.site_id).all())
+        user_modules = tuple(row.module_name for row in db.query(UserModuleAccess.module_name).filter(
+            UserModuleAccess.user_id == user_id
+        ).order_by(UserModuleAccess.module_name).all())
+        org_modules = ()
+        if user.organization_id:
+            org_modules = tuple(row.module_name for row in db.query(OrganizationModule.module_name).filter(
+                OrganizationModule.organization_id == user.organization_id,
+                OrganizationModule.is_enabled == True
+            ).order_by(OrganizationModule.module_name).all())
+
+        return cls(
+            id=user.id,
+            **{column: getattr(user, column) for column in USER_COLUMNS},
+            site_ids=site_ids,
+            user_modules=user_modules,
+            org_modules=org_modules
+        )
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data["role"] = self.role.value
+        data["department"] = self.department.value if self.department else None
+        data["job_title"] = self.job_title.value if self.job_title else None
+        data["hire_date"] = self.hire_date.isoformat() if self.hire_date else None
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw: str) -> "Principal":
+        data = json.loads(raw)
+        data["role"] = UserRole(data["role"])
+        data["department"] = Department(data["department"]) if data["department"] else None
+        data["job_title"] = JobTitle(data["job_title"]) if data["job_title"] else None
+        data["hire_date"] = datetime.fromisoformat(data["hire_date"]) if data["hire_date"] else None
+        for key in ("site_ids", "user_modules", "org_modules"):
+            data[key] = tuple(data[key])
+        return cls(**data)
+
+    def attach_user(self, db: Session) -> User:
+        """
+        Return a User for this principal, attached to the session without a query.
+
+        Columns not in the principal (e.g. hashed_password) and relationships
+        are loaded on first access.
+        """
+        user = User(id=self.id, **{column: getattr(self, column) for column in USER_COLUMNS})
+        make_transient_to_detached(user)
+        db.add(user)
+        user.__dict__["_cached_site_ids"] = self.site_ids
+        return user
+
+
+class PrincipalCache:
+    """Per-process LRU plus Redis cache of principals with cross-process invalidation."""
+
+    def __init__(self, ttl: int = 60, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[Principal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self._last_version_check = 0.0
+        self._subscriber = None
+        self.memory_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _redis_key(self, user_id: int, version: int) -> str:
+        return f"principals:{version}:{user_id}"
+
+    # ========== Reads ==========
+
+    def get(self, db: Session, user_id: int) -> Optional[Principal]:
+        """Return the user's principal from memory, Redis or the database (None if no such user)."""
+        self._ensure_current_version()
+        now = time.monotonic()
+
+        with self._lock:
+            version = self._version
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                self.memory_hits += 1
+                return entry[0]
+
+        principal = None
+        try:
+            raw = get_redis().get(self._redis_key(user_id, version))
+            if raw:
+                principal = Principal.from_json(raw)
+        except Exception as e:
+            logger.debug(f"Principal cache Redis read skipped: {str(e)}")
+
+        if principal is not None:
+            with self._lock:
+                self.redis_hits += 1
+        else:
+            with self._lock:
+                self.misses += 1
+            principal = Principal.load(db, user_id)
+            if principal is None:
+                return None
+            try:
+                get_redis().set(self._redis_key(user_id, version), principal.to_json(), ex=self.ttl)
+            except Exception as e:
+                logger.debug(f"Principal cache Redis write skipped: {str(e)}")
+
+        with self._lock:
+            # Only store if no invalidation happened while we were loading
+            if version == self._version:
+                self._entries[user_id] = (principal, now + self.ttl)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return principal
+
+    # ========== Invalidation ==========
+
+    def invalidate_users(self, user_ids: Iterable[int]) -> None:
+        """Drop the given users' principals in every process (call after commit)."""
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+            self.invalidations += 1
+            version = self._version
+        try:
+            client = get_redis()
+            client.delete(*(self._redis_key(user_id, version) for user_id in user_ids))
+            client.publish(INVALIDATION_CHANNEL, json.dumps({"user_ids": user_ids}))
+        except Exception as e:
+            logger.warning(f"Could not publish principal invalidation: {str(e)}")
+
+    def invalidate_all(self) -> None:
+        """Drop every cached principal in every process (call after commit)."""
+        version = None
+        try:
+            client = get_redis()
+            version = int(client.incr(VERSION_KEY))
+            client.publish(INVALIDATION_CHANNEL, json.dumps({"version": version}))
+        except Exception as e:
+            logger.warning(f"Could not publish principal cache version: {str(e)}")
+
+        with self._lock:
+            self._apply_version(version if version is not None else self._version + 1)
+
+    def _apply_version(self, version: int):
+        """Switch to a new cache version and drop cached entries (lock must be held)."""
+        if version != self._version:
+            self._version = version
+            self._entries.clear()
+            self.invalidations += 1
+
+    def _handle_message(self, message):
+        try:
+            payload = json.loads(message["data"])
+            with self._lock:
+                if "version" in payload:
+                    self._apply_version(int(payload["version"]))
+                for user_id in payload.get("user_ids", []):
+                    self._entries.pop(int(user_id), None)
+        except Exception as e:
+            logger.warning(f"Ignoring malformed principal invalidation message: {str(e)}")
+
+    def _ensure_current_version(self):
+        """Subscribe to invalidations and poll the shared version at most every VERSION_CHECK_INTERVAL."""
+        now = time.monotonic()
+        if now - self._last_version_check < VERSION_CHECK_INTERVAL:
+            return
+        self._last_version_check = now
+        try:
+            client = get_redis()
+            if self._subscriber is None or not self._subscriber.is_alive():
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{INVALIDATION_CHANNEL: self._handle_message})
+                self._subscriber = pubsub.run_in_thread(sleep_time=1, daemon=True)
+            version = client.get(VERSION_KEY)
+            with self._lock:
+                self._apply_version(int(version) if version else 0)
+        except Exception as e:
+            logger.debug(f"Principal cache version check skipped: {str(e)}")
+
+    # ========== Metrics ==========
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            hits = self.memory_hits + self.redis_hits
+            lookups = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups * 100, 2) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "cached_principals": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "version": self._version
+            }
+
+
+# Singleton instance
+principal_cache = PrincipalCache(ttl=settings.PRINCIPAL_CACHE_TTL)
+
+
+# ========== Invalidation on commit ==========
+
+_PENDING_KEY = "principal_invalidations"
+
+
+def _pending_changes(session) -> dict:
+    return session.info.setdefault(_PENDING_KEY, {"user_ids": set(), "all": False})
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_principal_changes(session, flush_context):
+    """Note which principals the flushed changes affect (applied after commit)."""
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            _pending_changes(session)["user_ids"].add(obj.id)
+        elif isinstance(obj, (UserSite, UserModuleAccess)):
+            _pending_changes(session)["user_ids"].add(obj.user_id)
+        elif isinstance(obj, (Site, OrganizationModule)):
+            _pending_changes(session)["all"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_principal_changes(orm_execute_state):
+    """
+    Note principals affected by bulk DML (e.g. query(UserSite).delete()),
+    which bypasses the flush.
+    """
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    model = mapper.class_ if mapper is not None else None
+    if model not in (User, UserSite, UserModuleAccess, Site, OrganizationModule):
+        return
+    if model is User and orm_execute_state.is_insert:
+        return  # New users have nothing cached
+
+    session = orm_execute_state.session
+    if model in (Site, OrganizationModule):
+        _pending_changes(session)["all"] = True
+        return
+
+    user_column = User.id if model is User else model.user_id
+    user_ids = None
+    if orm_execute_state.is_insert:
+        params = orm_execute_state.parameters
+        rows = params if isinstance(params, list) else [params or {}]
+        if all(user_column.key in row for row in rows):
+            user_ids = {row[user_column.key] for row in rows}
+    else:
+        whereclause = orm_execute_state.statement.whereclause
+        if whereclause is not None:
+            # Affected users, read before the statement runs
+            user_ids = set(session.scalars(select(user_column).where(whereclause)).all())
+
+    if user_ids is None:
+        _pending_changes(session)["all"] = True
+    else:
+        _pending_changes(session)["user_ids"].update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_principal_changes(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    if pending["all"]:
+        principal_cache.invalidate_all()
+    else:
+        principal_cache.invalidate_users(pending["user_ids"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_changes(session):
+    session.info.pop(_PENDING_KEY, None)
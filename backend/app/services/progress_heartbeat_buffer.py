@@ -0,0 +1,255 @@
+"""
+Progress Heartbeat Buffer
+
+Write-behind buffer for course player heartbeats (playback position and
+time spent, sent every few seconds per active learner).
+
+Heartbeats are coalesced in memory per (enrollment, module), so only the
+latest position is kept, and a background thread writes them every
+PROGRESS_FLUSH_INTERVAL seconds: one query checks enrollment ownership and
+module membership, then the progress rows are upserted with one INSERT ...
+ON CONFLICT DO UPDATE on PostgreSQL, so rows created meanwhile by another
+worker or a direct write do not fail the batch. Elsewhere, missing rows are
+bulk-inserted (row by row on a conflict) and existing ones bulk-updated.
+Time spent never goes backwards.
+
+Heartbeats never complete a module, so course percentages are not
+recomputed here; that happens only when a module is completed.
+"""
+import atexit
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, case, func, insert, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.course_enrollment import CourseEnrollment
+from app.models.course_module import CourseModule
+from app.models.module_progress import ModuleProgress
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Heartbeat:
+    """Latest buffered position of a learner in a module."""
+    user_id: int
+    last_position_seconds: int
+    time_spent_seconds: int
+
+
+class ProgressHeartbeatBuffer:
+    """Coalesces heartbeats per (enrollment, module) and writes them in bulk from a background thread."""
+
+    def __init__(self, flush_interval: float = 5.0, max_pending: int = 50000):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: Dict[Tuple[int, int], Heartbeat] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.received = 0
+        self.written = 0
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="progress-heartbeat-flusher", daemon=True)
+                self._thread.start()
+
+    def record(
+        self,
+        user_id: int,
+        enrollment_id: int,
+        module_id: int,
+        last_position_seconds: int,
+        time_spent_seconds: int
+    ) -> None:
+        """Buffer a heartbeat; replaces any earlier one for the same enrollment and module."""
+        self._ensure_started()
+        key = (enrollment_id, module_id)
+        with self._lock:
+            previous = self._pending.get(key)
+            if previous is not None:
+                time_spent_seconds = max(time_spent_seconds, previous.time_spent_seconds)
+            self._pending[key] = Heartbeat(user_id, last_position_seconds, time_spent_seconds)
+            self.received += 1
+            full = len(self._pending) >= self.max_pending
+        if full:
+            self._wake.set()
+
+    def take(self, enrollment_id: int, module_id: int) -> Optional[Heartbeat]:
+        """Remove and return the buffered heartbeat, for a caller writing the progress itself."""
+        with self._lock:
+            return self._pending.pop((enrollment_id, module_id), None)
+
+    # ========== Flushing ==========
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all buffered heartbeats; returns the number of progress rows written."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            db = SessionLocal()
+            try:
+                written = self._write(db, pending)
+                db.commit()
+                with self._lock:
+                    self.written += written
+                return written
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to write {len(pending)} progress heartbeats: {str(e)}", exc_info=True)
+                return 0
+            finally:
+                db.close()
+
+    def _write(self, db, pending: Dict[Tuple[int, int], Heartbeat]) -> int:
+        # Only the enrollment's own learner, and only modules of the enrolled course
+        owners = {
+            (row.enrollment_id, row.module_id): row.user_id
+            for row in db.query(
+                CourseEnrollment.id.label("enrollment_id"),
+                CourseModule.id.label("module_id"),
+                CourseEnrollment.user_id
+            ).join(
+                CourseModule, CourseModule.course_id == CourseEnrollment.course_id
+            ).filter(
+                tuple_(CourseEnrollment.id, CourseModule.id).in_(list(pending))
+            ).all()
+        }
+        pending = {
+            key: heartbeat for key, heartbeat in pending.items()
+            if owners.get(key) == heartbeat.user_id
+        }
+        if not pending:
+            return 0
+
+        rows = [
+            {
+                "enrollment_id": enrollment_id,
+                "module_id": module_id,
+                "is_completed": False,
+                "time_spent_seconds": heartbeat.time_spent_seconds,
+                "last_position_seconds": heartbeat.last_position_seconds
+            }
+            for (enrollment_id, module_id), heartbeat in pending.items()
+        ]
+        if db.get_bind().dialect.name == "postgresql":
+            self._upsert(db, rows)
+        else:
+            self._insert_or_update(db, rows)
+        return len(rows)
+
+    def _upsert(self, db, rows: List[dict]) -> None:
+        """One INSERT ... ON CONFLICT DO UPDATE; rows created concurrently are updated in place."""
+        statement = pg_insert(ModuleProgress)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ModuleProgress.enrollment_id, ModuleProgress.module_id],
+            set_={
+                "last_position_seconds": statement.excluded.last_position_seconds,
+                "time_spent_seconds": func.greatest(
+                    ModuleProgress.time_spent_seconds, statement.excluded.time_spent_seconds
+                ),
+                "updated_at": func.now()
+            }
+        )
+        db.execute(statement, rows)
+
+    def _insert_or_update(self, db, rows: List[dict]) -> None:
+        """Portable path: bulk insert the missing rows and bulk update the others."""
+        existing = set(
+            (row.enrollment_id, row.module_id)
+            for row in db.query(ModuleProgress.enrollment_id, ModuleProgress.module_id).filter(
+                tuple_(ModuleProgress.enrollment_id, ModuleProgress.module_id).in_(
+                    [(row["enrollment_id"], row["module_id"]) for row in rows]
+                )
+            ).all()
+        )
+        inserts = [row for row in rows if (row["enrollment_id"], row["module_id"]) not in existing]
+        updates = [row for row in rows if (row["enrollment_id"], row["module_id"]) in existing]
+
+        if inserts:
+            try:
+                with db.begin_nested():
+                    db.execute(insert(ModuleProgress), inserts)
+            except IntegrityError:
+                # Some rows were created meanwhile (another worker or a direct write): row by row
+                for row in inserts:
+                    try:
+                        with db.begin_nested():
+                            db.execute(insert(ModuleProgress), [row])
+                    except IntegrityError:
+                        updates.append(row)
+
+        if updates:
+            spent = bindparam("spent")
+            db.execute(
+                update(ModuleProgress).where(
+                    ModuleProgress.enrollment_id == bindparam("progress_enrollment_id"),
+                    ModuleProgress.module_id == bindparam("progress_module_id")
+                ).values(
+                    last_position_seconds=bindparam("position"),
+                    time_spent_seconds=case(
+                        (ModuleProgress.time_spent_seconds < spent, spent),
+                        else_=ModuleProgress.time_spent_seconds
+                    ),
+                    updated_at=func.now()
+                ).execution_options(synchronize_session=False),
+                [
+                    {
+                        "progress_enrollment_id": row["enrollment_id"],
+                        "progress_module_id": row["module_id"],
+                        "position": row["last_position_seconds"],
+                        "spent": row["time_spent_seconds"]
+                    }
+                    for row in updates
+                ]
+            )
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the background thread and write what is still buffered."""
+        self._stopping.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+        self.flush()
+
+    # ========== Metrics ==========
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "received": self.received,
+                "written": self.written,
+                "pending": len(self._pending),
+                "coalesced": max(self.received - self.written - len(self._pending), 0)
+            }
+
+
+# Singleton instance
+progress_heartbeat_buffer = ProgressHeartbeatBuffer(
+    flush_interval=settings.PROGRESS_FLUSH_INTERVAL,
+    max_pending=settings.PROGRESS_BUFFER_MAX
+)
+atexit.register(progress_heartbeat_buffer.close)
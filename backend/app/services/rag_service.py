@@ -7,13 +7,91 @@ Rules:
 - Red: <90% completion OR >5 overdue defects
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, case
 from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
 from app.models.site import Site
 from app.models.checklist import Checklist, ChecklistStatus
 from app.models.defect import Defect, DefectStatus
 
 
+def _rag_status(completion_rate: float, overdue_defects: int) -> str:
+    """Apply the RAG rules to a site's completion rate and overdue defect count."""
+    if completion_rate >= 95 and overdue_defects <= 2:
+        return "green"
+    elif completion_rate >= 90 or (overdue_defects >= 3 and overdue_defects <= 5):
+        return "amber"
+    return "red"
+
+
+def calculate_sites_rag_status(site_ids: Iterable[int], db: Session) -> Dict[int, dict]:
+    """
+    Calculate RAG status for many sites at once.
+
+    Uses one grouped aggregate over checklists and one over defects,
+    regardless of how many sites are requested.
+
+    Returns:
+        dict: {
+            site_id: {
+                "rag_status": "green"|"amber"|"red",
+                "completion_rate": float,
+                "open_defects": int,
+                "overdue_defects": int
+            }
+        }
+    """
+    site_ids = list(set(site_ids))
+    if not site_ids:
+        return {}
+
+    now = datetime.utcnow()
+    thirty_days_ago = now - timedelta(days=30)
+    seven_days_ago = now - timedelta(days=7)
+
+    # Checklist completion (last 30 days)
+    checklist_counts = {
+        site_id: (total, completed or 0)
+        for site_id, total, completed in db.query(
+            Checklist.site_id,
+            func.count(Checklist.id),
+            func.sum(case((Checklist.status == ChecklistStatus.COMPLETED, 1), else_=0))
+        ).filter(
+            Checklist.site_id.in_(site_ids),
+            Checklist.created_at >= thirty_days_ago
+        ).group_by(Checklist.site_id)
+    }
+
+    # Open defects and overdue defects (open for more than 7 days)
+    defect_counts = {
+        site_id: (open_count, overdue or 0)
+        for site_id, open_count, overdue in db.query(
+            Defect.site_id,
+            func.count(Defect.id),
+            func.sum(case((Defect.created_at < seven_days_ago, 1), else_=0))
+        ).filter(
+            Defect.site_id.in_(site_ids),
+            Defect.status == DefectStatus.OPEN
+        ).group_by(Defect.site_id)
+    }
+
+    results = {}
+    for site_id in site_ids:
+        total_checklists, completed_checklists = checklist_counts.get(site_id, (0, 0))
+        open_defects, overdue_defects = defect_counts.get(site_id, (0, 0))
+
+        completion_rate = (completed_checklists / total_checklists * 100) if total_checklists > 0 else 100.0
+
+        results[site_id] = {
+            "rag_status": _rag_status(completion_rate, overdue_defects),
+            "completion_rate": round(completion_rate, 2),
+            "open_defects": open_defects,
+            "overdue_defects": overdue_defects
+        }
+
+    return results
+
+
 def calculate_site_rag_status(site_id: int, db: Session) -> dict:
     """
     Calculate RAG status for a specific site.
@@ -26,55 +104,12 @@ def calculate_site_rag_status(site_id: int, db: Session) -> dict:
             "overdue_defects": int
         }
     """
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-
-    # Get checklist completion rate (last 30 days)
-    total_checklists = db.query(Checklist).filter(
-        Checklist.site_id == site_id,
-        Checklist.created_at >= thirty_days_ago
-    ).count()
-
-    completed_checklists = db.query(Checklist).filter(
-        Checklist.site_id == site_id,
-        Checklist.created_at >= thirty_days_ago,
-        Checklist.status == ChecklistStatus.COMPLETED
-    ).count()
-
-    completion_rate = (completed_checklists / total_checklists * 100) if total_checklists > 0 else 100.0
-
-    # Get open defects count
-    open_defects = db.query(Defect).filter(
-        Defect.site_id == site_id,
-        Defect.status == DefectStatus.OPEN
-    ).count()
-
-    # Get overdue defects (open for more than 7 days)
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    overdue_defects = db.query(Defect).filter(
-        Defect.site_id == site_id,
-        Defect.status == DefectStatus.OPEN,
-        Defect.created_at < seven_days_ago
-    ).count()
-
-    # Calculate RAG status
-    if completion_rate >= 95 and overdue_defects <= 2:
-        rag_status = "green"
-    elif completion_rate >= 90 or (overdue_defects >= 3 and overdue_defects <= 5):
-        rag_status = "amber"
-    else:
-        rag_status = "red"
+    return calculate_sites_rag_status([site_id], db)[site_id]
 
-    return {
-        "rag_status": rag_status,
-        "completion_rate": round(completion_rate, 2),
-        "open_defects": open_defects,
-        "overdue_defects": overdue_defects
-    }
 
-
-def get_organization_rag_summary(organization_id: int, db: Session) -> dict:
+def summarize_rag(site_rags: List[dict]) -> dict:
     """
-    Get RAG status summary for an entire organization.
+    Combine per-site RAG results into an organization summary.
 
     Returns:
         dict: {
@@ -86,20 +121,13 @@ def get_organization_rag_summary(organization_id: int, db: Session) -> dict:
             "total_open_defects": int
         }
     """
-    sites = db.query(Site).filter(
-        Site.organization_id == organization_id,
-        Site.is_active == True
-    ).all()
-
     green_count = 0
     amber_count = 0
     red_count = 0
     total_completion = 0
     total_defects = 0
 
-    for site in sites:
-        rag_data = calculate_site_rag_status(site.id, db)
-
+    for rag_data in site_rags:
         if rag_data["rag_status"] == "green":
             green_count += 1
         elif rag_data["rag_status"] == "amber":
@@ -110,7 +138,7 @@ def get_organization_rag_summary(organization_id: int, db: Session) -> dict:
         total_completion += rag_data["completion_rate"]
         total_defects += rag_data["open_defects"]
 
-    total_sites = len(sites)
+    total_sites = len(site_rags)
     avg_completion = (total_completion / total_sites) if total_sites > 0 else 0
 
     # Overall RAG: worst status determines overall
@@ -129,3 +157,45 @@ def get_organization_rag_summary(organization_id: int, db: Session) -> dict:
         "average_completion_rate": round(avg_completion, 2),
         "total_open_defects": total_defects
     }
+
+
+def get_organizations_rag_summary(organization_ids: Iterable[int], db: Session) -> Dict[int, dict]:
+    """
+    Get RAG status summaries for many organizations at once.
+
+    Returns:
+        dict: {organization_id: summary} with the same summary shape as
+        get_organization_rag_summary.
+    """
+    organization_ids = list(set(organization_ids))
+    if not organization_ids:
+        return {}
+
+    sites = db.query(Site.id, Site.organization_id).filter(
+        Site.organization_id.in_(organization_ids),
+        Site.is_active == True
+    ).all()
+    site_rags = calculate_sites_rag_status([site.id for site in sites], db)
+
+    rags_by_org: Dict[int, List[dict]] = {org_id: [] for org_id in organization_ids}
+    for site in sites:
+        rags_by_org[site.organization_id].append(site_rags[site.id])
+
+    return {org_id: summarize_rag(rags) for org_id, rags in rags_by_org.items()}
+
+
+def get_organization_rag_summary(organization_id: int, db: Session) -> dict:
+    """
+    Get RAG status summary for an entire organization.
+
+    Returns:
+        dict: {
+            "overall_rag": "green"|"amber"|"red",
+            "green_sites": int,
+            "amber_sites": int,
+            "red_sites": int,
+            "average_completion_rate": float,
+            "total_open_defects": int
+        }
+    """
+    return get_organizations_rag_summary([organization_id], db)[organization_id]
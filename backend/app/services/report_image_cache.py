@@ -0,0 +1,190 @@
+"""
+Report Image Cache
+
+Photos embedded in PDF reports, downscaled to JPEG thumbnails sized for the
+PDF frame.
+
+/uploads/... URLs are read straight from local storage instead of being
+fetched back over HTTP. Their thumbnails are cached on disk (keyed by path,
+modification time and size, so a replaced file is re-encoded) and in a small
+per-process LRU. Any other URLs are downloaded concurrently.
+"""
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import requests
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+from app.services.storage import storage_service
+
+logger = logging.getLogger(__name__)
+
+# Thumbnails fit the largest PDF image frame (150mm x 100mm) at this resolution
+THUMBNAIL_DPI = 150
+THUMBNAIL_MAX_SIZE = (int(150 / 25.4 * THUMBNAIL_DPI), int(100 / 25.4 * THUMBNAIL_DPI))
+THUMBNAIL_QUALITY = 80
+
+# Bump when the thumbnail encoding changes
+CACHE_VERSION = 1
+
+# (JPEG bytes, (width, height) in pixels)
+Thumbnail = Tuple[bytes, Tuple[int, int]]
+
+
+def make_thumbnail(image_data: bytes) -> Thumbnail:
+    """Downscale an image to the PDF thumbnail size and encode it as JPEG."""
+    image = Image.open(io.BytesIO(image_data))
+    image = ImageOps.exif_transpose(image)
+
+    if image.mode in ("RGBA", "LA"):
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+
+    image.thumbnail(THUMBNAIL_MAX_SIZE, Image.Resampling.LANCZOS)
+
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=THUMBNAIL_QUALITY, optimize=True)
+    return output.getvalue(), image.size
+
+
+class ReportImageCache:
+    """Loads report photos as thumbnails, from local storage where possible."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Thumbnail]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._cache_dir: Optional[Path] = None
+
+    def _get_cache_dir(self) -> Path:
+        if self._cache_dir is None:
+            base = settings.PDF_IMAGE_CACHE_DIR or os.path.join(tempfile.gettempdir(), "zynthio-report-images")
+            path = Path(base)
+            path.mkdir(parents=True, exist_ok=True)
+            self._cache_dir = path
+        return self._cache_dir
+
+    # ========== Memory LRU ==========
+
+    def _get_cached(self, key: str) -> Optional[Thumbnail]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put_cached(self, key: str, thumbnail: Thumbnail) -> None:
+        with self._lock:
+            self._entries[key] = thumbnail
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # ========== Loading ==========
+
+    def _load_local(self, path: Path) -> Optional[Thumbnail]:
+        """Thumbnail of a file in local storage, via the memory and disk caches."""
+        try:
+            stat = path.stat()
+        except OSError:
+            logger.warning(f"Report photo not found in storage: {path}")
+            return None
+
+        key = hashlib.sha256(
+            f"{CACHE_VERSION}|{path}|{stat.st_mtime_ns}|{stat.st_size}".encode()
+        ).hexdigest()
+
+        thumbnail = self._get_cached(key)
+        if thumbnail is not None:
+            return thumbnail
+
+        cache_path = self._get_cache_dir() / f"{key}.jpg"
+        try:
+            data = cache_path.read_bytes()
+            with Image.open(io.BytesIO(data)) as image:
+                thumbnail = (data, image.size)
+        except FileNotFoundError:
+            thumbnail = make_thumbnail(path.read_bytes())
+            self._write_atomic(cache_path, thumbnail[0])
+
+        self._put_cached(key, thumbnail)
+        return thumbnail
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        """Write via a temp file and rename, as other processes share the directory."""
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache report photo thumbnail: {str(e)}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def _fetch_remote(self, session: requests.Session, url: str) -> Optional[Thumbnail]:
+        fetch_url = url
+        if url.startswith('/'):
+            # Relative URL outside local storage, served by the API itself
+            base_url = os.environ.get('API_BASE_URL', 'http://localhost:8000')
+            fetch_url = f"{base_url}{url}"
+
+        response = session.get(fetch_url, timeout=10)
+        if response.status_code != 200:
+            logger.warning(f"Error fetching image from {fetch_url}: HTTP {response.status_code}")
+            return None
+        return make_thumbnail(response.content)
+
+    def get_thumbnails(self, urls: Iterable[str]) -> Dict[str, Optional[Thumbnail]]:
+        """
+        Load the thumbnails of the given image URLs.
+
+        Returns:
+            dict: {url: (jpeg_bytes, (width, height))}, or None for images
+            that could not be loaded
+        """
+        results: Dict[str, Optional[Thumbnail]] = {}
+        remote_urls = []
+
+        for url in dict.fromkeys(urls):
+            path = storage_service.resolve_path(url)
+            if path is None:
+                remote_urls.append(url)
+                continue
+            try:
+                results[url] = self._load_local(path)
+            except Exception as e:
+                logger.warning(f"Error loading report photo {url}: {str(e)}")
+                results[url] = None
+
+        if remote_urls:
+            with requests.Session() as session:
+                def fetch(url: str) -> Optional[Thumbnail]:
+                    try:
+                        return self._fetch_remote(session, url)
+                    except Exception as e:
+                        logger.warning(f"Error fetching image from {url}: {str(e)}")
+                        return None
+
+                workers = min(len(remote_urls), settings.PDF_IMAGE_FETCH_CONCURRENCY)
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    for url, thumbnail in zip(remote_urls, executor.map(fetch, remote_urls)):
+                        results[url] = thumbnail
+
+        return results
+
+
+# Singleton instance
+report_image_cache = ReportImageCache(max_entries=settings.PDF_IMAGE_CACHE_SIZE)
@@ -0,0 +1,285 @@
+"""
+Report Job Service
+
+Background rendering of checklist PDF reports for a site and date range.
+
+A request creates a ReportJob which a Celery worker renders; the result (a
+PDF for one day, a ZIP of daily PDFs for a range) is stored on disk under
+REPORT_STORAGE_DIR and downloaded once the job has completed.
+
+Every day's content is fingerprinted from a few grouped aggregates over its
+checklists, items and field responses. Rendered day PDFs are stored under
+their fingerprint, so unchanged days are never rendered twice, and a repeat
+request for a range whose fingerprint is unchanged reuses the existing job.
+Fingerprints are keyed with SECRET_KEY, which keeps the stored file names
+unguessable.
+"""
+import hashlib
+import hmac
+import logging
+import os
+import tempfile
+import zipfile
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Tuple
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.checklist import Checklist, ChecklistStatus
+from app.models.checklist_item import ChecklistItem
+from app.models.report_job import ReportJob, ReportJobStatus
+from app.models.site import Site
+from app.models.task_field_response import TaskFieldResponse
+from app.models.user import User
+from app.services.checklist_report_loader import load_report_data
+from app.services.pdf_service import pdf_service
+from app.services.task_field_cache import task_field_cache
+
+logger = logging.getLogger(__name__)
+
+# Bump when the PDF layout changes so stored renders are not reused
+REPORT_RENDER_VERSION = 1
+
+# Pending/running jobs older than this are assumed lost and not reused
+STALE_JOB_AFTER = timedelta(minutes=30)
+
+
+def _storage_dir(site_id: int) -> Path:
+    path = Path(settings.REPORT_STORAGE_DIR) / str(site_id)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _digest(*parts) -> str:
+    message = "|".join(str(part) for part in parts).encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write via a temp file and rename so readers never see a partial file."""
+    fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def day_fingerprints(
+    db: Session,
+    site: Site,
+    organization_name: str,
+    start_date: date,
+    end_date: date
+) -> Dict[date, str]:
+    """
+    Fingerprint the report content of each day in the range.
+
+    Uses one grouped query each over checklists, checklist items and field
+    responses; any completion, edit, new response or deletion changes the
+    day's fingerprint.
+    """
+    in_range = (
+        Checklist.site_id == site.id,
+        Checklist.checklist_date >= start_date,
+        Checklist.checklist_date <= end_date
+    )
+
+    checklist_rows = dict((row[0], row[1:]) for row in db.query(
+        Checklist.checklist_date,
+        func.count(Checklist.id),
+        func.sum(Checklist.completed_items),
+        func.sum(case((Checklist.status == ChecklistStatus.COMPLETED, 1), else_=0)),
+        func.max(func.coalesce(Checklist.updated_at, Checklist.created_at)),
+        func.max(Checklist.completed_at)
+    ).filter(*in_range).group_by(Checklist.checklist_date).all())
+
+    item_rows = dict((row[0], row[1:]) for row in db.query(
+        Checklist.checklist_date,
+        func.count(ChecklistItem.id),
+        func.sum(ChecklistItem.id),  # Cheap checksum of which items exist
+        func.max(func.coalesce(ChecklistItem.updated_at, ChecklistItem.created_at)),
+        func.max(ChecklistItem.completed_at)
+    ).join(ChecklistItem, ChecklistItem.checklist_id == Checklist.id).filter(
+        *in_range
+    ).group_by(Checklist.checklist_date).all())
+
+    response_rows = dict((row[0], row[1:]) for row in db.query(
+        Checklist.checklist_date,
+        func.count(TaskFieldResponse.id),
+        func.max(TaskFieldResponse.id),
+        func.max(TaskFieldResponse.completed_at)
+    ).join(ChecklistItem, ChecklistItem.checklist_id == Checklist.id).join(
+        TaskFieldResponse, TaskFieldResponse.checklist_item_id == ChecklistItem.id
+    ).filter(*in_range).group_by(Checklist.checklist_date).all())
+
+    schema_version = task_field_cache.schema_version()
+    fingerprints = {}
+    current_date = start_date
+    while current_date <= end_date:
+        fingerprints[current_date] = _digest(
+            REPORT_RENDER_VERSION,
+            schema_version,
+            site.id,
+            site.name,
+            organization_name,
+            current_date.isoformat(),
+            checklist_rows.get(current_date),
+            item_rows.get(current_date),
+            response_rows.get(current_date)
+        )
+        current_date += timedelta(days=1)
+    return fingerprints
+
+
+def range_fingerprint(fingerprints: Dict[date, str]) -> str:
+    """Combine the day fingerprints of a range into one."""
+    return _digest(*(fingerprints[day] for day in sorted(fingerprints)))
+
+
+def get_or_create_job(
+    db: Session,
+    site: Site,
+    organization_name: str,
+    start_date: date,
+    end_date: date,
+    user: User
+) -> Tuple[ReportJob, bool]:
+    """
+    Return an existing job for the same unchanged content, or create a new
+    pending one (committed). The bool is True when a new job was created and
+    must be queued for rendering.
+    """
+    fingerprint = range_fingerprint(day_fingerprints(db, site, organization_name, start_date, end_date))
+
+    existing = db.query(ReportJob).filter(
+        ReportJob.site_id == site.id,
+        ReportJob.start_date == start_date,
+        ReportJob.end_date == end_date,
+        ReportJob.fingerprint == fingerprint,
+        ReportJob.status != ReportJobStatus.FAILED
+    ).order_by(ReportJob.id.desc()).first()
+
+    if existing:
+        if existing.status == ReportJobStatus.COMPLETED:
+            if existing.file_path and os.path.exists(existing.file_path):
+                return existing, False
+        else:
+            created_at = existing.created_at
+            if created_at is not None and created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            if created_at is None or created_at > datetime.now(timezone.utc) - STALE_JOB_AFTER:
+                return existing, False
+
+    job = ReportJob(
+        site_id=site.id,
+        start_date=start_date,
+        end_date=end_date,
+        requested_by_id=user.id,
+        fingerprint=fingerprint,
+        status=ReportJobStatus.PENDING
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job, True
+
+
+def render_job(db: Session, job: ReportJob) -> ReportJob:
+    """
+    Render a job's PDFs, store the artefact and mark the job completed.
+
+    Day PDFs already stored under their current fingerprint are reused.
+    Failures mark the job failed and are re-raised.
+    """
+    job.status = ReportJobStatus.RUNNING
+    job.started_at = datetime.utcnow()
+    job.error = None
+    db.commit()
+
+    try:
+        site = db.query(Site).filter(Site.id == job.site_id).first()
+        if not site:
+            raise ValueError(f"Site {job.site_id} not found")
+        organization_name = site.organization.name if site.organization else "Unknown"
+        storage_dir = _storage_dir(site.id)
+
+        # Render (or reuse) one PDF per day
+        fingerprints = day_fingerprints(db, site, organization_name, job.start_date, job.end_date)
+        # Record what was actually rendered, in case data changed since the request
+        job.fingerprint = range_fingerprint(fingerprints)
+        day_paths = {
+            report_date: storage_dir / f"{report_date.isoformat()}-{fingerprints[report_date][:32]}.pdf"
+            for report_date in fingerprints
+        }
+        # Preload the data of the days that need rendering in one go
+        to_render = [report_date for report_date, path in day_paths.items() if not path.exists()]
+        report_data = load_report_data(db, site.id, min(to_render), max(to_render)) if to_render else {}
+
+        day_files = []
+        rendered = 0
+        for report_date in sorted(day_paths):
+            path = day_paths[report_date]
+            if not path.exists():
+                pdf_buffer = pdf_service.generate_daily_checklist_report(
+                    db=db,
+                    site_id=site.id,
+                    report_date=report_date,
+                    organization_name=organization_name,
+                    site_name=site.name,
+                    report_data=report_data.get(report_date)
+                )
+                _write_atomic(path, pdf_buffer.getvalue())
+                rendered += 1
+            day_files.append((report_date, path))
+
+        if len(day_files) == 1:
+            report_date, path = day_files[0]
+            job.file_path = str(path)
+            job.filename = pdf_service.generate_filename(organization_name, site.name, report_date)
+            job.content_type = "application/pdf"
+        else:
+            zip_path = storage_dir / f"{job.start_date.isoformat()}_{job.end_date.isoformat()}-{job.fingerprint[:32]}.zip"
+            if not zip_path.exists():
+                fd, tmp_path = tempfile.mkstemp(dir=str(storage_dir), prefix=".tmp-")
+                os.close(fd)
+                try:
+                    with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                        for report_date, path in day_files:
+                            zip_file.write(
+                                path, pdf_service.generate_filename(organization_name, site.name, report_date)
+                            )
+                    os.replace(tmp_path, zip_path)
+                except Exception:
+                    if os.path.exists(tmp_path):
+                        os.unlink(tmp_path)
+                    raise
+            job.file_path = str(zip_path)
+            job.filename = pdf_service.generate_filename(
+                organization_name, site.name, job.start_date, job.end_date
+            ).replace('.pdf', '.zip')
+            job.content_type = "application/zip"
+
+        job.status = ReportJobStatus.COMPLETED
+        job.completed_at = datetime.utcnow()
+        db.commit()
+
+        logger.info(
+            f"Report job {job.id} completed: {len(day_files)} days, {rendered} rendered, "
+            f"{len(day_files) - rendered} reused"
+        )
+        return job
+
+    except Exception as e:
+        db.rollback()
+        job.status = ReportJobStatus.FAILED
+        job.error = str(e)
+        job.completed_at = datetime.utcnow()
+        db.commit()
+        raise
@@ -0,0 +1,230 @@
+"""
+Site Report Service
+
+Builds the scheduled daily and weekly performance report emails of a single
+site. Each site's report is sent by its own Celery task, so one slow site or
+mail server does not hold up the other tenants' reports.
+
+Report times are site-local (Site.timezone). A scheduler tick every few
+minutes picks the sites whose daily or weekly report time falls in the tick's
+window, so report load is spread over the day instead of one burst.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.email import OutgoingEmail, email_service
+from app.models.defect import Defect
+from app.models.site import Site
+from app.services.site_stats_service import get_site_stats_summary
+
+logger = logging.getLogger(__name__)
+
+REPORT_DAILY = "daily"
+REPORT_WEEKLY = "weekly"
+DEFAULT_REPORT_TIME = "09:00"  # Report time of sites that never set one
+
+
+def report_recipients(site: Site) -> List[str]:
+    """Parse the site's comma-separated report_recipients."""
+    if not site.report_recipients:
+        return []
+    return [email.strip() for email in site.report_recipients.split(',') if email.strip()]
+
+
+def build_report_data(db: Session, site: Site, start_date: date, end_date: date, is_daily: bool) -> Optional[dict]:
+    """
+    Gather the report figures for a site and date range.
+
+    Returns:
+        dict: template context for the report, or None if the site had no
+        checklists in the range (nothing to report)
+    """
+    # Totals for this site from the site_daily_stats rollup
+    stats = get_site_stats_summary(db, [site.id], start_date, end_date)[site.id]
+
+    if not stats['checklist_count']:
+        return None
+
+    # Calculate completion stats
+    total_checklists = stats['checklist_count']
+    completed_checklists = stats['completed_checklist_count']
+    completion_rate = (completed_checklists / total_checklists * 100) if total_checklists > 0 else 0
+
+    # Count total items and completed items
+    total_items = stats['item_count']
+    completed_items = stats['completed_item_count']
+
+    # Defects raised in the range
+    defects = db.query(Defect).filter(
+        Defect.site_id == site.id,
+        Defect.created_at >= datetime.combine(start_date, datetime.min.time()),
+        Defect.created_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+    ).all()
+
+    defects_data = [{
+        'title': d.title,
+        'severity': d.severity,
+        'description': d.description
+    } for d in defects]
+
+    # Category performance
+    category_stats = []
+    for cat in stats['categories'].values():
+        if cat['organization_id'] == site.organization_id and cat['checklist_count']:
+            cat_rate = cat['completed_checklist_count'] / cat['checklist_count'] * 100
+            category_stats.append({
+                'category_name': cat['category_name'],
+                'completion_rate': round(cat_rate, 1)
+            })
+
+    report_data = {
+        'completion_rate': round(completion_rate, 1),
+        'tasks_completed': completed_checklists,
+        'total_tasks': total_checklists,
+        'items_completed': completed_items,
+        'total_items': total_items,
+        'defects': defects_data,
+        'category_stats': category_stats,
+        'recommendations': [],
+        'is_daily': is_daily
+    }
+    if is_daily:
+        # Calculate item completion rate
+        report_data['item_completion_rate'] = round(
+            (completed_items / total_items * 100) if total_items > 0 else 0, 1
+        )
+
+    return report_data
+
+
+def build_site_report_emails(
+    db: Session,
+    site: Site,
+    report_type: str,
+    start_date: date,
+    end_date: date,
+    recipients: List[str]
+) -> Optional[List[OutgoingEmail]]:
+    """
+    Render a site's daily or weekly report for the given recipients.
+
+    Returns None when there is nothing to report for the range.
+    """
+    is_daily = report_type == REPORT_DAILY
+    report_data = build_report_data(db, site, start_date, end_date, is_daily)
+    if report_data is None:
+        return None
+
+    organization_name = site.organization.name if site.organization else "Organization"
+    named_recipients = [(recipient, recipient.split('@')[0]) for recipient in recipients]
+
+    # Rendered once per site; only the recipient name differs
+    if is_daily:
+        return email_service.build_daily_report_emails(
+            recipients=named_recipients,
+            organization_name=organization_name,
+            site_name=site.name,
+            report_date=str(end_date),
+            report_data=report_data
+        )
+    return email_service.build_weekly_report_emails(
+        recipients=named_recipients,
+        organization_name=organization_name,
+        site_name=site.name,
+        week_start=str(start_date),
+        week_end=str(end_date),
+        report_data=report_data
+    )
+
+
+def _report_time_in(column, times: List[str]):
+    """Filter for a report time column set to one of `times` (NULL meaning the default time)."""
+    if DEFAULT_REPORT_TIME in times:
+        return or_(column.in_(times), column.is_(None))
+    return column.in_(times)
+
+
+def _local_report_slots(window_start: datetime, minutes: int, tz: ZoneInfo):
+    """
+    Local HH:MM report times falling in the window, by local date.
+
+    Local times skipped by a spring-forward DST change fire at the next
+    valid local minute; times repeated by a fall-back change fire only on
+    their first occurrence.
+    """
+    slots = defaultdict(list)
+    for offset in range(minutes):
+        instant = window_start + timedelta(minutes=offset)
+        local = instant.astimezone(tz)
+        if local.fold:
+            continue
+        times = slots[local.date()]
+
+        # Wall-clock minutes between the previous minute and this one never occurred
+        skipped = (instant - timedelta(minutes=1)).astimezone(tz).replace(tzinfo=None) + timedelta(minutes=1)
+        wall = local.replace(tzinfo=None)
+        while skipped < wall:
+            times.append(skipped.strftime("%H:%M"))
+            skipped += timedelta(minutes=1)
+
+        times.append(local.strftime("%H:%M"))
+    return slots
+
+
+def due_site_reports(db: Session, window_start: datetime, minutes: int) -> List[Tuple[str, date, date, List[int]]]:
+    """
+    Find the site reports due in [window_start, window_start + minutes).
+
+    window_start is a timezone-aware UTC datetime. Each site timezone is
+    handled separately: the window's minutes are converted to local HH:MM
+    strings (grouped by local date, so a window spanning local midnight
+    works; see _local_report_slots for DST changes) and matched against the
+    report time columns, which the site schema stores as HH:MM. A NULL
+    report time means DEFAULT_REPORT_TIME.
+
+    Returns:
+        list: (report_type, start_date, end_date, site_ids) groups; daily
+        reports cover the local yesterday, weekly reports the 7 days up to it
+    """
+    timezones = [row.timezone for row in db.query(Site.timezone).filter(
+        Site.is_active == True,
+        or_(Site.daily_report_enabled == True, Site.weekly_report_enabled == True)
+    ).distinct().all()]
+
+    due = []
+    for timezone_name in timezones:
+        try:
+            tz = ZoneInfo(timezone_name)
+        except (ZoneInfoNotFoundError, ValueError):
+            logger.warning(f"Skipping report schedule for unknown timezone {timezone_name!r}")
+            continue
+
+        for local_date, times in sorted(_local_report_slots(window_start, minutes, tz).items()):
+            report_date = local_date - timedelta(days=1)
+
+            daily_ids = [row.id for row in db.query(Site.id).filter(
+                Site.daily_report_enabled == True,
+                Site.timezone == timezone_name,
+                _report_time_in(Site.daily_report_time, times),
+                Site.is_active == True
+            ).order_by(Site.id).all()]
+            if daily_ids:
+                due.append((REPORT_DAILY, report_date, report_date, daily_ids))
+
+            weekly_ids = [row.id for row in db.query(Site.id).filter(
+                Site.weekly_report_enabled == True,
+                Site.timezone == timezone_name,
+                Site.weekly_report_day == local_date.isoweekday(),
+                _report_time_in(Site.weekly_report_time, times),
+                Site.is_active == True
+            ).order_by(Site.id).all()]
+            if weekly_ids:
+                due.append((REPORT_WEEKLY, report_date - timedelta(days=6), report_date, weekly_ids))
+
+    return due
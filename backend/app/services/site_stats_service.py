@@ -0,0 +1,257 @@
+"""
+Site Daily Stats Service
+
+Maintains the site_daily_stats rollup (one row per site, category and date
+holding checklist, item, completion and defect counts) and reads it back
+for reports and dashboards.
+
+The rollup is kept up to date by recomputing the affected (site, date)
+slice with a handful of grouped aggregates whenever a checklist, item or
+defect in it changes. Callers refresh inside their own transaction, right
+before committing. rebuild_site_daily_stats recomputes any date range and
+is used for backfills and the nightly safety-net rebuild.
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Date, case, cast, func, insert, text
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.models.checklist import Checklist, ChecklistStatus
+from app.models.checklist_item import ChecklistItem
+from app.models.defect import Defect
+from app.models.site import Site
+from app.models.site_daily_stats import SiteDailyStats
+
+# First key of the pg_advisory_xact_lock(namespace, site_id) rollup locks
+ROLLUP_LOCK_NAMESPACE = 7301
+
+COUNT_FIELDS = (
+    "checklist_count",
+    "completed_checklist_count",
+    "item_count",
+    "completed_item_count",
+    "defect_count",
+)
+
+
+def _empty_counts() -> dict:
+    return {field: 0 for field in COUNT_FIELDS}
+
+
+def _aggregate(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    site_ids: Optional[List[int]]
+) -> Dict[Tuple[int, Optional[int], date], dict]:
+    """Compute rollup rows from the raw tables with one grouped query per table."""
+    rows: Dict[Tuple[int, Optional[int], date], dict] = defaultdict(_empty_counts)
+
+    # Checklists
+    query = db.query(
+        Checklist.site_id,
+        Checklist.category_id,
+        Checklist.checklist_date,
+        func.count(Checklist.id),
+        func.sum(case((Checklist.status == ChecklistStatus.COMPLETED, 1), else_=0))
+    ).filter(
+        Checklist.checklist_date >= start_date,
+        Checklist.checklist_date <= end_date
+    )
+    if site_ids is not None:
+        query = query.filter(Checklist.site_id.in_(site_ids))
+    for site_id, category_id, checklist_date, total, completed in query.group_by(
+        Checklist.site_id, Checklist.category_id, Checklist.checklist_date
+    ):
+        counts = rows[(site_id, category_id, checklist_date)]
+        counts["checklist_count"] = total
+        counts["completed_checklist_count"] = completed or 0
+
+    # Checklist items
+    query = db.query(
+        Checklist.site_id,
+        Checklist.category_id,
+        Checklist.checklist_date,
+        func.count(ChecklistItem.id),
+        func.sum(case((ChecklistItem.is_completed == True, 1), else_=0))
+    ).join(ChecklistItem, ChecklistItem.checklist_id == Checklist.id).filter(
+        Checklist.checklist_date >= start_date,
+        Checklist.checklist_date <= end_date
+    )
+    if site_ids is not None:
+        query = query.filter(Checklist.site_id.in_(site_ids))
+    for site_id, category_id, checklist_date, total, completed in query.group_by(
+        Checklist.site_id, Checklist.category_id, Checklist.checklist_date
+    ):
+        counts = rows[(site_id, category_id, checklist_date)]
+        counts["item_count"] = total
+        counts["completed_item_count"] = completed or 0
+
+    # Defects, bucketed by the day they were raised and the category of the
+    # checklist they came from (NULL for defects raised outside a checklist)
+    defect_date = cast(Defect.created_at, Date)
+    query = db.query(
+        Defect.site_id,
+        Checklist.category_id,
+        defect_date,
+        func.count(Defect.id)
+    ).outerjoin(
+        ChecklistItem, ChecklistItem.id == Defect.checklist_item_id
+    ).outerjoin(
+        Checklist, Checklist.id == ChecklistItem.checklist_id
+    ).filter(
+        defect_date >= start_date,
+        defect_date <= end_date
+    )
+    if site_ids is not None:
+        query = query.filter(Defect.site_id.in_(site_ids))
+    for site_id, category_id, created_date, total in query.group_by(
+        Defect.site_id, Checklist.category_id, defect_date
+    ):
+        rows[(site_id, category_id, created_date)]["defect_count"] = total
+
+    return rows
+
+
+def lock_sites(db: Session, site_ids: Iterable[int]) -> None:
+    """
+    Take the rollup lock of each site until the transaction ends (PostgreSQL).
+
+    Transaction-scoped advisory locks, taken in id order, rather than row
+    locks on sites: the caller may already hold FK key-share locks on those
+    rows (e.g. from inserting defects), which FOR UPDATE would conflict with.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for site_id in sorted(set(site_ids)):
+        db.execute(
+            text("SELECT pg_advisory_xact_lock(:namespace, :site_id)"),
+            {"namespace": ROLLUP_LOCK_NAMESPACE, "site_id": site_id}
+        )
+
+
+def rebuild_site_daily_stats(
+    db: Session,
+    start_date: date,
+    end_date: date,
+    site_ids: Optional[List[int]] = None
+) -> int:
+    """
+    Recompute the rollup for a date range (optionally limited to some sites).
+
+    Existing rows in the range are replaced. The affected sites are locked
+    first (see lock_sites) so concurrent rebuilds and refreshes of a site
+    serialise instead of interleaving their delete and insert. Does not
+    commit; returns the number of rows written.
+    """
+    if site_ids is None:
+        site_ids = [row.id for row in db.query(Site.id).all()]
+    lock_sites(db, site_ids)
+
+    db.query(SiteDailyStats).filter(
+        SiteDailyStats.stats_date >= start_date,
+        SiteDailyStats.stats_date <= end_date,
+        SiteDailyStats.site_id.in_(site_ids)
+    ).delete(synchronize_session=False)
+
+    rows = [
+        {"site_id": site_id, "category_id": category_id, "stats_date": stats_date, **counts}
+        for (site_id, category_id, stats_date), counts in _aggregate(db, start_date, end_date, site_ids).items()
+    ]
+    if rows:
+        db.execute(insert(SiteDailyStats), rows)
+    return len(rows)
+
+
+def refresh_site_day(db: Session, site_id: int, stats_date: date) -> None:
+    """
+    Recompute the rollup rows of one site and date after a change.
+
+    Holds the site's rollup lock (see lock_sites) until the caller commits.
+    """
+    db.flush()
+    rebuild_site_daily_stats(db, stats_date, stats_date, [site_id])
+
+
+def refresh_site_days(db: Session, keys: Iterable[Tuple[int, date]]) -> None:
+    """Refresh several (site_id, date) slices, each at most once."""
+    for site_id, stats_date in sorted(set(keys)):
+        refresh_site_day(db, site_id, stats_date)
+
+
+def refresh_for_checklist(db: Session, checklist: Checklist) -> None:
+    """Refresh the slice a checklist belongs to."""
+    refresh_site_day(db, checklist.site_id, checklist.checklist_date)
+
+
+def defect_stats_date(db: Session, defect_id: int) -> Optional[date]:
+    """The day a stored defect is counted in, bucketed in SQL exactly as _aggregate does."""
+    return db.query(cast(Defect.created_at, Date)).filter(Defect.id == defect_id).scalar()
+
+
+def refresh_for_defect(db: Session, defect: Defect) -> None:
+    """Refresh the slice a defect is counted in (the day it was raised)."""
+    db.flush()
+    refresh_site_day(db, defect.site_id, defect_stats_date(db, defect.id) or date.today())
+
+
+def get_site_stats_summary(
+    db: Session,
+    site_ids: List[int],
+    start_date: date,
+    end_date: date
+) -> Dict[int, dict]:
+    """
+    Read rollup totals for a set of sites over a date range.
+
+    Returns:
+        dict: {
+            site_id: {
+                "checklist_count": int, "completed_checklist_count": int,
+                "item_count": int, "completed_item_count": int, "defect_count": int,
+                "categories": {
+                    category_id: {"category_name": str, "organization_id": int|None, ...counts}
+                }
+            }
+        }
+    Sites without any rollup rows get all-zero totals.
+    """
+    summary = {site_id: {**_empty_counts(), "categories": {}} for site_id in site_ids}
+    if not site_ids:
+        return summary
+
+    rows = db.query(
+        SiteDailyStats.site_id,
+        SiteDailyStats.category_id,
+        Category.name,
+        Category.organization_id,
+        *[func.sum(getattr(SiteDailyStats, field)) for field in COUNT_FIELDS]
+    ).outerjoin(
+        Category, Category.id == SiteDailyStats.category_id
+    ).filter(
+        SiteDailyStats.site_id.in_(site_ids),
+        SiteDailyStats.stats_date >= start_date,
+        SiteDailyStats.stats_date <= end_date
+    ).group_by(
+        SiteDailyStats.site_id,
+        SiteDailyStats.category_id,
+        Category.name,
+        Category.organization_id
+    ).all()
+
+    for site_id, category_id, category_name, organization_id, *values in rows:
+        counts = dict(zip(COUNT_FIELDS, (int(v or 0) for v in values)))
+        site_summary = summary[site_id]
+        for field, value in counts.items():
+            site_summary[field] += value
+        if category_id is not None:
+            site_summary["categories"][category_id] = {
+                "category_name": category_name,
+                "organization_id": organization_id,
+                **counts
+            }
+
+    return summary
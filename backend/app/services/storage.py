@@ -2,14 +2,22 @@
 File Storage Service
 Handles file uploads to local storage or cloud storage (S3, Azure, etc.)
 """
+import asyncio
+import hashlib
 import os
+import re
+import tempfile
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 from fastapi import UploadFile
-from PIL import Image
+from PIL import Image, ImageOps
 import io
 
+# Upload file names: <content hash>-<upload id>[-<variant>].<ext>
+UPLOAD_NAME = re.compile(r"^([0-9a-f]{32})-([0-9a-f]{16})(.*)$")
+
 
 class StorageService:
     """
@@ -24,7 +32,27 @@ class StorageService:
         # Image settings
         self.max_image_size = 10 * 1024 * 1024  # 10MB
         self.allowed_extensions = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
-        self.thumbnail_size = (800, 800)  # Max dimensions for thumbnails
+        self.thumbnail_size = (800, 800)  # Max dimensions of the medium derivative
+        
+        # Derivatives written for every uploaded image (max dimensions);
+        # thumbnails for lists, medium for checklists, original capped
+        self.derivative_sizes = {
+            "thumbnail": (320, 320),
+            "medium": self.thumbnail_size,
+            "original": (2048, 2048),
+        }
+        
+        # Image processing runs in this bounded pool, off the event loop
+        self.processing_workers = 2
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.processing_workers,
+                thread_name_prefix="image-processing"
+            )
+        return self._executor
     
     def _get_file_extension(self, filename: str) -> str:
         """Get file extension from filename"""
@@ -49,108 +77,254 @@ class StorageService:
             max_size_mb = self.max_image_size / 1024 / 1024
             raise ValueError(f"File too large. Maximum size: {max_size_mb}MB")
     
-    def _optimize_image(self, image_data: bytes, filename: str) -> bytes:
-        """Optimize image size and quality"""
+    def _derivative_extension(self, variant: str, ext: str) -> str:
+        """Thumbnail and medium are always JPEG; the capped original keeps PNG/WebP"""
+        if variant == "original" and ext in (".png", ".webp"):
+            return ext
+        return ".jpg"
+    
+    def _derivative_paths(self, directory: Path, prefix: str, ext: str) -> Dict[str, Path]:
+        return {
+            variant: directory / f"{prefix}-{variant}{self._derivative_extension(variant, ext)}"
+            for variant in self.derivative_sizes
+        }
+    
+    def _content_dir(self, upload_dir: Path) -> Path:
+        """Content-addressed copies of the files in upload_dir"""
+        return self.base_path / ".content" / upload_dir.relative_to(self.base_path)
+    
+    def _link(self, content_path: Path, path: Path) -> None:
+        """Hard-link an upload's file to its content-addressed copy"""
         try:
-            # Open image
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Convert RGBA to RGB if needed
-            if image.mode in ("RGBA", "LA"):
-                background = Image.new("RGB", image.size, (255, 255, 255))
-                background.paste(image, mask=image.split()[-1])
-                image = background
-            elif image.mode != "RGB":
-                image = image.convert("RGB")
-            
-            # Resize if too large
-            if image.width > self.thumbnail_size[0] or image.height > self.thumbnail_size[1]:
-                image.thumbnail(self.thumbnail_size, Image.Resampling.LANCZOS)
-            
-            # Save optimized image
-            output = io.BytesIO()
-            ext = self._get_file_extension(filename)
-            
-            if ext in [".jpg", ".jpeg"]:
-                image.save(output, format="JPEG", quality=85, optimize=True)
-            elif ext == ".png":
-                image.save(output, format="PNG", optimize=True)
-            elif ext == ".webp":
-                image.save(output, format="WEBP", quality=85)
-            else:
-                image.save(output, format="JPEG", quality=85, optimize=True)
+            os.link(content_path, path)
+        except FileNotFoundError:
+            # Content copy collected meanwhile; the caller stores it again
+            raise
+        except OSError:
+            # No hard links on this filesystem: store an independent copy
+            self._write_atomic(path, content_path.read_bytes())
+    
+    def _encode_image(self, image: Image.Image, ext: str) -> bytes:
+        output = io.BytesIO()
+        if ext == ".png":
+            image.save(output, format="PNG", optimize=True)
+        elif ext == ".webp":
+            image.save(output, format="WEBP", quality=85)
+        else:
+            image.save(output, format="JPEG", quality=85, optimize=True)
+        return output.getvalue()
+    
+    def _process_image(self, image_data: bytes, ext: str) -> Dict[str, bytes]:
+        """Decode once and encode every derivative, largest first"""
+        # Open image
+        image = Image.open(io.BytesIO(image_data))
+        image = ImageOps.exif_transpose(image)
+        
+        # Convert RGBA to RGB if needed
+        if image.mode in ("RGBA", "LA"):
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.split()[-1])
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+        
+        derivatives = {}
+        for variant, size in sorted(
+            self.derivative_sizes.items(), key=lambda entry: entry[1], reverse=True
+        ):
+            # Resize if too large (each size from the previous, smaller one)
+            if image.width > size[0] or image.height > size[1]:
+                image.thumbnail(size, Image.Resampling.LANCZOS)
+            derivatives[variant] = self._encode_image(image, self._derivative_extension(variant, ext))
+        return derivatives
+    
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        """Write via a temp file and rename so readers never see a partial file"""
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+    
+    def _store_image(self, file_data: bytes, upload_dir: Path, ext: str, optimize: bool) -> Dict[str, Path]:
+        """Process and write an upload (runs in the processing pool)"""
+        for attempt in range(2):
+            try:
+                return self._store_upload(file_data, upload_dir, ext, optimize)
+            except FileNotFoundError:
+                # A content copy was collected by a concurrent delete; store it again
+                if attempt:
+                    raise
+    
+    def _store_upload(self, file_data: bytes, upload_dir: Path, ext: str, optimize: bool) -> Dict[str, Path]:
+        """
+        Give the upload its own file names, hard-linked to content-addressed
+        copies, so identical uploads share storage but are deleted separately
+        """
+        content_hash = hashlib.sha256(file_data).hexdigest()[:32]
+        prefix = f"{content_hash}-{uuid.uuid4().hex[:16]}"
+        content_dir = self._content_dir(upload_dir)
+        content_dir.mkdir(parents=True, exist_ok=True)
+        
+        if optimize:
+            content_paths = self._derivative_paths(content_dir, content_hash, ext)
+            # Unless a duplicate upload was already processed
+            if not all(path.exists() for path in content_paths.values()):
+                try:
+                    derivatives = self._process_image(file_data, ext)
+                except Exception as e:
+                    # If optimization fails, store the original as is
+                    print(f"Image optimization failed: {e}")
+                    derivatives = None
+                if derivatives is None:
+                    content_paths = None
+                else:
+                    for variant, path in content_paths.items():
+                        self._write_atomic(path, derivatives[variant])
             
-            return output.getvalue()
-        except Exception as e:
-            # If optimization fails, return original
-            print(f"Image optimization failed: {e}")
-            return image_data
+            if content_paths is not None:
+                paths = self._derivative_paths(upload_dir, prefix, ext)
+                for variant, path in paths.items():
+                    self._link(content_paths[variant], path)
+                return paths
+        
+        content_path = content_dir / f"{content_hash}{ext}"
+        if not content_path.exists():
+            self._write_atomic(content_path, file_data)
+        file_path = upload_dir / f"{prefix}{ext}"
+        self._link(content_path, file_path)
+        if optimize:
+            return {variant: file_path for variant in self.derivative_sizes}
+        return {"original": file_path}
     
-    async def upload_file(
+    def _to_url(self, path: Path) -> str:
+        return f"/uploads/{path.relative_to(self.base_path).as_posix()}"
+    
+    async def upload_image(
         self,
         file: UploadFile,
         subfolder: str = "photos",
         optimize: bool = True
-    ) -> str:
+    ) -> Dict[str, str]:
         """
-        Upload a file to storage
+        Upload an image to storage
+        
+        Decoding, resizing and encoding run in a bounded thread pool so the
+        event loop is never blocked. A duplicate upload reuses the stored
+        files through hard links but gets its own names, so deleting one
+        upload never removes another's photo.
         
         Args:
             file: The uploaded file
             subfolder: Subfolder to store the file in (e.g., photos, defects)
-            optimize: Whether to optimize images
+            optimize: Whether to produce resized derivatives
         
         Returns:
-            The URL/path to access the uploaded file
+            URLs by derivative: thumbnail, medium and original (only
+            original when optimize is False)
         """
         # Validate file
         self._validate_image(file)
         
-        # Generate unique filename
         ext = self._get_file_extension(file.filename or "")
-        unique_filename = f"{uuid.uuid4()}{ext}"
         
         # Create subfolder
         upload_dir = self.base_path / subfolder
         upload_dir.mkdir(parents=True, exist_ok=True)
         
-        # Full file path
-        file_path = upload_dir / unique_filename
-        
         # Read file data
         file_data = await file.read()
         
-        # Optimize if requested
-        if optimize and ext in self.allowed_extensions:
-            file_data = self._optimize_image(file_data, file.filename or "")
+        loop = asyncio.get_running_loop()
+        paths = await loop.run_in_executor(
+            self._get_executor(), self._store_image, file_data, upload_dir, ext, optimize
+        )
         
-        # Write file
-        with open(file_path, "wb") as f:
-            f.write(file_data)
+        # Relative URLs (served by FastAPI static files or nginx)
+        return {variant: self._to_url(path) for variant, path in paths.items()}
+    
+    async def upload_file(
+        self,
+        file: UploadFile,
+        subfolder: str = "photos",
+        optimize: bool = True
+    ) -> str:
+        """
+        Upload a file to storage
         
-        # Return relative URL (will be served by FastAPI static files or nginx)
-        return f"/uploads/{subfolder}/{unique_filename}"
+        Args:
+            file: The uploaded file
+            subfolder: Subfolder to store the file in (e.g., photos, defects)
+            optimize: Whether to optimize images
+        
+        Returns:
+            The URL/path to access the uploaded file (the medium derivative
+            for optimized images)
+        """
+        urls = await self.upload_image(file, subfolder=subfolder, optimize=optimize)
+        return urls.get("medium", urls["original"])
+    
+    def resolve_path(self, file_url: str) -> Optional[Path]:
+        """
+        Map an /uploads/... URL to its file in local storage
+        
+        Returns:
+            The file path, or None if the URL is not a local upload
+        """
+        if not file_url or not file_url.startswith("/uploads/"):
+            return None
+        rel_path = file_url[len("/uploads/"):].split("?", 1)[0]
+        file_path = (self.base_path / rel_path).resolve()
+        # Never resolve outside the storage root
+        if self.base_path.resolve() not in file_path.parents:
+            return None
+        return file_path
+    
+    def _upload_files(self, file_path: Path) -> List[Path]:
+        """Every derivative of the upload a file belongs to"""
+        match = UPLOAD_NAME.match(file_path.name)
+        if not match:
+            return [file_path]
+        return sorted(file_path.parent.glob(f"{match.group(1)}-{match.group(2)}*"))
+    
+    def _collect_content(self, file_path: Path) -> None:
+        """Remove the content-addressed copy of a deleted file once no upload links to it"""
+        match = UPLOAD_NAME.match(file_path.name)
+        if not match:
+            return
+        content_path = self._content_dir(file_path.parent) / f"{match.group(1)}{match.group(3)}"
+        try:
+            if content_path.stat().st_nlink <= 1:
+                content_path.unlink()
+        except FileNotFoundError:
+            pass
     
     def delete_file(self, file_url: str) -> bool:
         """
-        Delete a file from storage
+        Delete an upload from storage
+        
+        Removes every derivative of the upload the URL points to; files
+        shared with identical uploads stay until the last one is deleted.
         
         Args:
-            file_url: The URL/path of the file to delete
+            file_url: The URL/path of the file (any derivative) to delete
         
         Returns:
             True if deleted successfully, False otherwise
         """
         try:
             # Extract path from URL
-            if file_url.startswith("/uploads/"):
-                rel_path = file_url[len("/uploads/"):]
-                file_path = self.base_path / rel_path
-                
-                if file_path.exists():
-                    file_path.unlink()
-                    return True
-            return False
+            file_path = self.resolve_path(file_url)
+            if not file_path or not file_path.exists():
+                return False
+            for path in self._upload_files(file_path):
+                path.unlink(missing_ok=True)
+                self._collect_content(path)
+            return True
         except Exception as e:
             print(f"Error deleting file: {e}")
             return False
@@ -0,0 +1,229 @@
+"""
+Task Field Schema Cache
+
+Process-wide LRU cache of task field definitions (TaskField rows), which
+almost never change but are read for every checklist open, field response
+submission and PDF report.
+
+Entries are keyed by (task_id, schema_version). Any change to task fields
+bumps the shared schema version in Redis and publishes it on a pub/sub
+channel, so every API and worker process drops its cached schemas at once.
+As a safety net for missed messages each process also re-reads the version
+from Redis at most every VERSION_CHECK_INTERVAL seconds. Without Redis the
+cache still works per process and is invalidated locally.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from functools import cached_property
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.redis import get_redis
+from app.models.task_field import TaskField
+from app.services.validation_rules import FieldEvaluator, compile_field
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION_KEY = "task_fields:schema_version"
+INVALIDATION_CHANNEL = "task_fields:invalidate"
+VERSION_CHECK_INTERVAL = 30  # seconds
+DEFAULT_MAX_TASKS = 2048
+
+
+@dataclass(frozen=True)
+class CachedTaskField:
+    """Immutable copy of a TaskField row, attribute-compatible with the model."""
+    id: int
+    task_id: int
+    field_type: str
+    field_label: str
+    field_order: int
+    is_required: bool
+    validation_rules: Optional[Dict[str, Any]]
+    options: Optional[List[str]]
+    show_if: Optional[Dict[str, Any]]
+
+    @classmethod
+    def from_model(cls, field: TaskField) -> "CachedTaskField":
+        return cls(
+            id=field.id,
+            task_id=field.task_id,
+            field_type=field.field_type,
+            field_label=field.field_label,
+            field_order=field.field_order,
+            is_required=field.is_required,
+            validation_rules=field.validation_rules,
+            options=field.options,
+            show_if=field.show_if
+        )
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @cached_property
+    def evaluator(self) -> FieldEvaluator:
+        """validation_rules compiled once for as long as this schema version is cached."""
+        return compile_field(self)
+
+
+class TaskFieldSchemaCache:
+    """LRU cache of per-task field schemas with cross-process version invalidation."""
+
+    def __init__(self, max_tasks: int = DEFAULT_MAX_TASKS):
+        self.max_tasks = max_tasks
+        self._entries: "OrderedDict[Tuple[int, int], Tuple[CachedTaskField, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self._last_version_check = 0.0
+        self._subscriber = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    # ========== Reads ==========
+
+    def get_fields(self, db: Session, task_ids: Iterable[int]) -> Dict[int, List[CachedTaskField]]:
+        """
+        Return {task_id: [fields ordered by field_order]} for the given tasks.
+
+        Cached tasks are served from memory; all misses are loaded with a
+        single TaskField IN (...) query.
+        """
+        self._ensure_current_version()
+        task_ids = set(task_ids)
+        result: Dict[int, List[CachedTaskField]] = {}
+
+        with self._lock:
+            version = self._version
+            for task_id in task_ids:
+                key = (task_id, version)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    result[task_id] = list(self._entries[key])
+            self.hits += len(result)
+            missing = task_ids - result.keys()
+            self.misses += len(missing)
+
+        if missing:
+            loaded: Dict[int, List[CachedTaskField]] = {task_id: [] for task_id in missing}
+            fields = db.query(TaskField).filter(
+                TaskField.task_id.in_(missing)
+            ).order_by(TaskField.task_id, TaskField.field_order).all()
+            for field in fields:
+                loaded[field.task_id].append(CachedTaskField.from_model(field))
+
+            with self._lock:
+                # Only store if no invalidation happened while we were loading
+                if version == self._version:
+                    for task_id, task_fields in loaded.items():
+                        self._entries[(task_id, version)] = tuple(task_fields)
+                    while len(self._entries) > self.max_tasks:
+                        self._entries.popitem(last=False)
+            result.update(loaded)
+
+        return result
+
+    def get_field_map(self, db: Session, task_ids: Iterable[int]) -> Dict[int, CachedTaskField]:
+        """Return {field_id: field} for every field of the given tasks."""
+        return {
+            field.id: field
+            for task_fields in self.get_fields(db, task_ids).values()
+            for field in task_fields
+        }
+
+    # ========== Invalidation ==========
+
+    def bump_version(self, task_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Invalidate cached schemas in every process after task fields changed.
+
+        Call after the change is committed. task_ids is informational (logged
+        and published); every cached schema is dropped.
+        """
+        task_ids = sorted(set(task_ids)) if task_ids else []
+        version = None
+        try:
+            client = get_redis()
+            version = int(client.incr(SCHEMA_VERSION_KEY))
+            client.publish(INVALIDATION_CHANNEL, json.dumps({"version": version, "task_ids": task_ids}))
+        except Exception as e:
+            logger.warning(f"Could not publish task field schema version: {str(e)}")
+
+        with self._lock:
+            self._apply_version(version if version is not None else self._version + 1)
+        return self._version
+
+    def schema_version(self) -> int:
+        """
+        The shared schema version, read from Redis rather than this process's copy.
+
+        Use where processes must agree on it (e.g. report fingerprints);
+        falls back to the local version when Redis is unavailable.
+        """
+        try:
+            version = get_redis().get(SCHEMA_VERSION_KEY)
+        except Exception as e:
+            logger.debug(f"Task field schema version read skipped: {str(e)}")
+            return self._version
+        version = int(version) if version else 0
+        with self._lock:
+            self._apply_version(version)
+        return version
+
+    def _apply_version(self, version: int):
+        """Switch to a new schema version and drop cached entries (lock must be held)."""
+        if version != self._version:
+            self._version = version
+            self._entries.clear()
+            self.invalidations += 1
+
+    def _handle_message(self, message):
+        try:
+            payload = json.loads(message["data"])
+            with self._lock:
+                self._apply_version(int(payload["version"]))
+        except Exception as e:
+            logger.warning(f"Ignoring malformed task field invalidation message: {str(e)}")
+
+    def _ensure_current_version(self):
+        """Subscribe to invalidations and poll the shared version at most every VERSION_CHECK_INTERVAL."""
+        now = time.monotonic()
+        if now - self._last_version_check < VERSION_CHECK_INTERVAL:
+            return
+        self._last_version_check = now
+        try:
+            client = get_redis()
+            if self._subscriber is None or not self._subscriber.is_alive():
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(**{INVALIDATION_CHANNEL: self._handle_message})
+                self._subscriber = pubsub.run_in_thread(sleep_time=1, daemon=True)
+            version = client.get(SCHEMA_VERSION_KEY)
+            with self._lock:
+                self._apply_version(int(version) if version else 0)
+        except Exception as e:
+            logger.debug(f"Task field schema version check skipped: {str(e)}")
+
+    # ========== Metrics ==========
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "cached_tasks": len(self._entries),
+                "max_tasks": self.max_tasks,
+                "schema_version": self._version
+            }
+
+
+# Singleton instance
+task_field_cache = TaskFieldSchemaCache()
@@ -0,0 +1,275 @@
+"""
+Validation Rule Engine for Task Fields
+
+Compiles a field's validation_rules JSON once into an evaluator that checks
+readings with a few comparisons, instead of re-reading the rules and
+scanning the field label on every submission.
+
+Supported rules (top level for number/temperature fields, or on the
+temperature entry of a repeating group's repeat_template):
+
+    {
+        "min": 1, "max": 5,                  # allowed range
+        "create_defect_if": "out_of_range",  # or "above_max" / "below_min"
+        "auto_defect_threshold": 5,          # alternatively: raise a defect when
+        "auto_defect_operator": ">",         #   value <operator> threshold
+        "severity": "high",                  # defect severity (default high)
+        "site_overrides": {"12": {"max": 6}} # per-site values merged over the above
+    }
+
+The legal limits for fridges (< 8°C) and freezers (≤ -18°C), detected from
+the field label once at compile time, are always enforced; configured rules
+add checks on top of them.
+"""
+import logging
+import operator
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.models.defect import DefectSeverity
+
+logger = logging.getLogger(__name__)
+
+# Legal limits (fallback when a field has no defect rule configured)
+FRIDGE_MAX = 8  # Fridges must be below 8°C
+FREEZER_MAX = -18  # Freezers must be at or below -18°C
+
+FRIDGE_KEYWORDS = ("fridge", "refrigerator", "chiller")
+FREEZER_KEYWORDS = ("freezer", "frozen")
+
+NUMERIC_FIELD_TYPES = ("temperature", "number")
+
+OPERATORS: Dict[str, Callable[[float, float], bool]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+}
+
+# Least to most severe
+SEVERITY_ORDER = [DefectSeverity.LOW, DefectSeverity.MEDIUM, DefectSeverity.HIGH, DefectSeverity.CRITICAL]
+
+# (title, description, severity) of a defect to raise
+Violation = Tuple[str, str, DefectSeverity]
+
+
+def equipment_type(field_label: str) -> Optional[str]:
+    """Classify a field as 'fridge', 'freezer' or None from its label."""
+    label = (field_label or "").lower()
+    if any(keyword in label for keyword in FRIDGE_KEYWORDS):
+        return "fridge"
+    if any(keyword in label for keyword in FREEZER_KEYWORDS):
+        return "freezer"
+    return None
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (ValueError, TypeError):
+        return None
+
+
+def _severity(value: Any) -> DefectSeverity:
+    try:
+        return DefectSeverity(str(value).lower())
+    except ValueError:
+        return DefectSeverity.HIGH
+
+
+class ReadingRule:
+    """A compiled check for a single numeric reading."""
+
+    __slots__ = ("checks", "severity", "unit", "reading_name")
+
+    def __init__(
+        self,
+        checks: List[Tuple[Callable[[float], bool], str]],
+        severity: DefectSeverity,
+        unit: str,
+        reading_name: str = "Reading"
+    ):
+        # Each check is (predicate returning True on violation, limit description)
+        self.checks = checks
+        self.severity = severity
+        self.unit = unit
+        self.reading_name = reading_name
+
+    def violation(self, value: float) -> Optional[str]:
+        """Return the broken limit's description, or None if the reading is fine."""
+        for is_violation, limit in self.checks:
+            if is_violation(value):
+                return limit
+        return None
+
+    @classmethod
+    def compile(cls, rules: Dict[str, Any], unit: str) -> Optional["ReadingRule"]:
+        """Compile the defect part of a rules dict; None if it raises no defects."""
+        checks = []
+        minimum = _number(rules.get("min"))
+        maximum = _number(rules.get("max"))
+        defect_if = rules.get("create_defect_if")
+
+        if defect_if in ("out_of_range", "below_min") and minimum is not None:
+            checks.append((lambda v, m=minimum: v < m, f"must be ≥ {minimum:g}{unit}"))
+        if defect_if in ("out_of_range", "above_max") and maximum is not None:
+            checks.append((lambda v, m=maximum: v > m, f"must be ≤ {maximum:g}{unit}"))
+
+        threshold = _number(rules.get("auto_defect_threshold"))
+        compare = OPERATORS.get(rules.get("auto_defect_operator", ">"))
+        if threshold is not None and compare is not None:
+            symbol = rules.get("auto_defect_operator", ">")
+            checks.append((
+                lambda v, t=threshold, c=compare: c(v, t),
+                f"must not be {symbol} {threshold:g}{unit}"
+            ))
+
+        if not checks:
+            return None
+        return cls(checks, _severity(rules.get("severity", "high")), unit)
+
+    @classmethod
+    def legal_limit(cls, equipment: Optional[str]) -> Optional["ReadingRule"]:
+        """Fallback rule enforcing the legal fridge/freezer limits."""
+        if equipment == "fridge":
+            return cls(
+                [(lambda v: v >= FRIDGE_MAX, f"must be < {FRIDGE_MAX}°C")],
+                DefectSeverity.HIGH, "°C", "Fridge temperature"
+            )
+        if equipment == "freezer":
+            return cls(
+                [(lambda v: v > FREEZER_MAX, f"must be ≤ {FREEZER_MAX}°C")],
+                DefectSeverity.HIGH, "°C", "Freezer temperature"
+            )
+        return None
+
+
+class FieldEvaluator:
+    """Compiled validation for one task field, optionally varying per site."""
+
+    __slots__ = ("field_label", "is_numeric", "reading_key", "value_rules", "group_rules", "site_rules")
+
+    def __init__(self, field):
+        rules = field.validation_rules or {}
+        field_type = (field.field_type or "").lower()
+        equipment = equipment_type(field.field_label)
+
+        self.field_label = field.field_label
+        self.is_numeric = field_type in NUMERIC_FIELD_TYPES
+        self.reading_key = "temperature"
+
+        template = self._reading_template(rules)
+        if template is not None:
+            self.reading_key = template.get("key") or template.get("type") or "temperature"
+
+        self.value_rules, self.group_rules = self._compile(rules, template, field_type, equipment)
+
+        # Per-site overrides are merged over the base rules and compiled up front
+        self.site_rules: Dict[int, Tuple[Tuple[ReadingRule, ...], Tuple[ReadingRule, ...]]] = {}
+        for site_id, override in (rules.get("site_overrides") or {}).items():
+            if not isinstance(override, dict):
+                continue
+            try:
+                site_key = int(site_id)
+            except (TypeError, ValueError):
+                logger.warning(f"Ignoring site override with invalid site id {site_id!r} on field '{field.field_label}'")
+                continue
+            site_template = {**template, **override} if template is not None else None
+            self.site_rules[site_key] = self._compile(
+                {**rules, **override}, site_template, field_type, equipment
+            )
+
+    @staticmethod
+    def _reading_template(rules: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The numeric entry of a repeating group's repeat_template, if any."""
+        for entry in rules.get("repeat_template") or []:
+            if isinstance(entry, dict) and str(entry.get("type", "")).lower() in NUMERIC_FIELD_TYPES:
+                return entry
+        return None
+
+    @staticmethod
+    def _compile(rules, template, field_type, equipment):
+        """
+        Rules checked per single reading and per group reading, in order.
+
+        The legal fridge/freezer limit always comes first; configured rules
+        can only add checks on top of it, never relax it.
+        """
+        unit = "°C" if field_type == "temperature" or equipment else ""
+        legal = ReadingRule.legal_limit(equipment)
+        value_rules = (legal, ReadingRule.compile(rules, unit))
+        group_rules = (legal,)
+        if template is not None:
+            group_unit = "°C" if str(template.get("type", "")).lower() == "temperature" else unit
+            group_rules = (legal, ReadingRule.compile(template, group_unit))
+        return (
+            tuple(rule for rule in value_rules if rule is not None),
+            tuple(rule for rule in group_rules if rule is not None)
+        )
+
+    @staticmethod
+    def _violation(rules, value: float) -> Optional[Tuple[ReadingRule, str]]:
+        """The first rule a reading breaks, with the broken limit."""
+        for rule in rules:
+            limit = rule.violation(value)
+            if limit:
+                return rule, limit
+        return None
+
+    def _title(self, rule: ReadingRule) -> str:
+        """Defect title: temperature readings keep the historical title."""
+        if rule.unit == "°C":
+            return f"Temperature Violation: {self.field_label}"
+        return f"Reading Out of Range: {self.field_label}"
+
+    def evaluate(self, response_data, site_id: Optional[int] = None) -> Optional[Violation]:
+        """Check one response; returns the defect to raise or None."""
+        value_rules, group_rules = self.site_rules.get(site_id, (self.value_rules, self.group_rules))
+
+        # Single numeric reading
+        if response_data.number_value is not None and self.is_numeric:
+            value = response_data.number_value
+            found = self._violation(value_rules, value)
+            if found:
+                rule, limit = found
+                description = f"{rule.reading_name} {value:g}{rule.unit} exceeds limit ({limit})"
+                return self._title(rule), description, rule.severity
+
+        # Repeating group readings (JSON list of instances)
+        elif response_data.json_value and isinstance(response_data.json_value, list):
+            if not group_rules:
+                return None
+            violations = []
+            broken_rules = []
+            for idx, instance in enumerate(response_data.json_value):
+                if not isinstance(instance, dict):
+                    continue
+                value = _number(instance.get(self.reading_key))
+                if value is None:
+                    continue  # Skip missing or invalid readings
+                found = self._violation(group_rules, value)
+                if found:
+                    rule, limit = found
+                    broken_rules.append(rule)
+                    violations.append(f"Item {idx + 1}: {value:g}{rule.unit} exceeds limit ({limit})")
+            if violations:
+                violation_text = "\n".join(violations)
+                rule = broken_rules[0]
+                readings = "temperature readings outside legal limits" if rule.unit == "°C" else "readings out of range"
+                return (
+                    self._title(rule),
+                    f"Multiple {readings}:\n{violation_text}",
+                    max((r.severity for r in broken_rules), key=SEVERITY_ORDER.index)
+                )
+
+        return None
+
+
+def compile_field(field) -> FieldEvaluator:
+    """Compile a TaskField (or cached copy) into an evaluator."""
+    return FieldEvaluator(field)
+
+
+def evaluate_batch(pairs, site_id: Optional[int] = None) -> List[Optional[Violation]]:
+    """Evaluate (response_data, evaluator) pairs for one site in a single pass."""
+    return [evaluator.evaluate(response_data, site_id) for response_data, evaluator in pairs]
@@ -1,7 +1,8 @@
-import { Injectable } from '@angular/core';
+import { Injectable, NgZone } from '@angular/core';
 import { HttpClient } from '@angular/common/http';
-import { Observable, BehaviorSubject, interval } from 'rxjs';
-import { tap } from 'rxjs/operators';
+import { Observable, BehaviorSubject, Subject, Subscription } from 'rxjs';
+import { distinctUntilChanged, map, tap } from 'rxjs/operators';
+import { AuthService } from '../auth/auth.service';
 
 export interface Notification {
   id: number;
@@ -20,6 +21,11 @@ export interface UnreadCountResponse {
   count: number;
 }
 
+export interface PollResponse {
+  notifications: Notification[];
+  unread_count: number | null;
+}
+
 export interface MarkReadRequest {
   notification_ids: number[];
 }
@@ -31,10 +37,129 @@ export class NotificationService {
   private apiUrl = '/api/v1/notifications';
   private unreadCountSubject = new BehaviorSubject<number>(0);
   public unreadCount$ = this.unreadCountSubject.asObservable();
+  private newNotificationSubject = new Subject<Notification>();
+  public newNotification$ = this.newNotificationSubject.asObservable();
+
+  private eventSource: EventSource | null = null;
+  private streamFailures = 0;
+  private reconnectTimer: ReturnType<typeof setTimeout> | null = null;
+  private pollSubscription: Subscription | null = null;
+  private lastSeenId = 0;
+
+  constructor(
+    private http: HttpClient,
+    private authService: AuthService,
+    private zone: NgZone
+  ) {
+    // Pushed over Server-Sent Events; long polling is only the fallback.
+    // Reconnect with each new token and disconnect on logout.
+    this.authService.authState$.pipe(
+      map(state => state.token),
+      distinctUntilChanged()
+    ).subscribe(token => {
+      this.disconnect();
+      this.streamFailures = 0;
+      if (token) {
+        this.connectStream();
+      } else {
+        this.unreadCountSubject.next(0);
+      }
+    });
+  }
+
+  /**
+   * Open the notification event stream, falling back to long polling if
+   * EventSource is unavailable or keeps failing
+   */
+  private connectStream(): void {
+    this.reconnectTimer = null;
+    const token = this.authService.getToken();
+    if (!token) {
+      return;
+    }
+    if (typeof EventSource === 'undefined' || this.streamFailures >= 3) {
+      this.startPolling();
+      return;
+    }
+
+    this.eventSource = new EventSource(`${this.apiUrl}/stream?token=${encodeURIComponent(token)}`);
+
+    this.eventSource.addEventListener('unread_count', (event: MessageEvent) => {
+      const data = JSON.parse(event.data);
+      this.streamFailures = 0;
+      this.zone.run(() => this.unreadCountSubject.next(data.count));
+    });
+
+    this.eventSource.addEventListener('notification', (event: MessageEvent) => {
+      const data = JSON.parse(event.data);
+      this.zone.run(() => {
+        this.newNotificationSubject.next(data.notification);
+        this.unreadCountSubject.next(this.unreadCountSubject.value + 1);
+      });
+    });
+
+    this.eventSource.onerror = () => {
+      // The stream also ends when the token expires; reconnect with the current token
+      this.eventSource?.close();
+      this.eventSource = null;
+      this.streamFailures++;
+      this.reconnectTimer = setTimeout(() => this.connectStream(), 5000 * this.streamFailures);
+    };
+  }
+
+  /**
+   * Close the event stream and stop long polling
+   */
+  private disconnect(): void {
+    this.eventSource?.close();
+    this.eventSource = null;
+    if (this.reconnectTimer) {
+      clearTimeout(this.reconnectTimer);
+      this.reconnectTimer = null;
+    }
+    this.pollSubscription?.unsubscribe();
+    this.pollSubscription = null;
+  }
+
+  /**
+   * Long-poll /poll for notifications newer than the latest one seen
+   */
+  private startPolling(): void {
+    this.refreshUnreadCount();
+    this.pollSubscription = this.getNotifications(false, 1).subscribe({
+      next: notifications => {
+        this.lastSeenId = notifications.length ? notifications[0].id : 0;
+        this.poll();
+      },
+      error: () => this.retryPolling()
+    });
+  }
+
+  private poll(): void {
+    const params = { since_id: this.lastSeenId, timeout: 25 };
+    this.pollSubscription = this.http.get<PollResponse>(`${this.apiUrl}/poll`, { params }).subscribe({
+      next: response => {
+        for (const notification of response.notifications) {
+          this.lastSeenId = Math.max(this.lastSeenId, notification.id);
+          this.newNotificationSubject.next(notification);
+        }
+        if (response.unread_count !== null) {
+          this.unreadCountSubject.next(response.unread_count);
+        }
+        this.poll();
+      },
+      error: () => this.retryPolling()
+    });
+  }
 
-  constructor(private http: HttpClient) {
-    // Poll for unread count every 30 seconds
-    interval(30000).subscribe(() => this.refreshUnreadCount());
+  private retryPolling(): void {
+    this.pollSubscription = null;
+    this.reconnectTimer = setTimeout(() => {
+      this.reconnectTimer = null;
+      if (this.authService.getToken()) {
+        this.startPolling();
+      }
+    }, 5000);
   }
 
   /**
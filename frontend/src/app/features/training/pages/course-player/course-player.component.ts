@@ -166,21 +166,31 @@ export class CoursePlayerComponent implements OnInit, OnDestroy {
     // Skip saving in preview mode
     if (this.isPreviewMode || !this.currentModule) return;
 
-    const currentProgress = this.moduleProgress.get(this.currentModule.id);
-    const lastPosition = this.videoElement?.currentTime || currentProgress?.last_position_seconds || 0;
-
-    this.moduleProgressService.updateProgress(
-      this.enrollmentId,
-      this.currentModule.id,
-      {
-        last_position_seconds: Math.floor(lastPosition),
-        time_spent_seconds: (currentProgress?.time_spent_seconds || 0) + Math.floor((Date.now() - this.startTime) / 1000)
-      }
-    ).subscribe({
-      next: (progress) => {
-        this.moduleProgress.set(this.currentModule!.id, progress);
-        this.startTime = Date.now(); // Reset timer
-      },
+    const moduleId = this.currentModule.id;
+    const currentProgress = this.moduleProgress.get(moduleId);
+    const lastPosition = Math.floor(this.videoElement?.currentTime || currentProgress?.last_position_seconds || 0);
+    const timeSpent = (currentProgress?.time_spent_seconds || 0) + Math.floor((Date.now() - this.startTime) / 1000);
+
+    // The server buffers heartbeats, so keep the local copy current ourselves
+    this.moduleProgress.set(moduleId, {
+      ...(currentProgress ?? {
+        id: 0,
+        enrollment_id: this.enrollmentId,
+        module_id: moduleId,
+        is_completed: false,
+        created_at: new Date().toISOString()
+      }),
+      last_position_seconds: lastPosition,
+      time_spent_seconds: timeSpent
+    });
+    this.startTime = Date.now(); // Reset timer
+
+    this.moduleProgressService.heartbeat([{
+      enrollment_id: this.enrollmentId,
+      module_id: moduleId,
+      last_position_seconds: lastPosition,
+      time_spent_seconds: timeSpent
+    }]).subscribe({
       error: (error) => {
         console.error('Error saving progress:', error);
       }
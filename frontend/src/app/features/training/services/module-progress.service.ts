@@ -9,6 +9,13 @@ export interface ModuleProgressUpdate {
   last_position_seconds?: number;
 }
 
+export interface ProgressHeartbeat {
+  enrollment_id: number;
+  module_id: number;
+  last_position_seconds: number;
+  time_spent_seconds: number;
+}
+
 @Injectable({
   providedIn: 'root'
 })
@@ -32,6 +39,14 @@ export class ModuleProgressService {
     );
   }
 
+  /**
+   * Report playback positions. The server buffers and coalesces them, so the
+   * response only acknowledges receipt.
+   */
+  heartbeat(heartbeats: ProgressHeartbeat[]): Observable<{ accepted: number }> {
+    return this.http.post<{ accepted: number }>(`${this.API_URL}/heartbeat`, { heartbeats });
+  }
+
   completeModule(
     enrollmentId: number,
     moduleId: number,